@@ -0,0 +1,508 @@
+"""
+API HTTP JSON para transcrição, divisão e incorporação de legendas.
+
+Usa a mesma fila de tarefas (jobs.JobQueue) e os mesmos processadores da CLI e
+do daemon, sem dependências além da biblioteca padrão. O envio de uma tarefa
+responde imediatamente; o progresso pode ser consultado ou acompanhado por
+server-sent events, e os arquivos gerados são baixados pela própria API.
+
+Rotas:
+    GET  /health                         Estado do serviço, contagem de tarefas e uso de memória
+    PUT  /uploads/<nome>                 Envia um arquivo (corpo = conteúdo); devolve {"path": ...}
+    POST /jobs                           {"type": "transcribe", "params": {...}} -> 202 {"id": ...}
+    GET  /jobs/<id>                      Estado, progresso, resultado e arquivos gerados
+    GET  /jobs/<id>/events               Eventos de progresso (text/event-stream)
+    GET  /jobs/<id>/artifacts/<caminho>  Baixa um arquivo gerado pela tarefa
+
+Os parâmetros das tarefas são os de jobs.JOB_HANDLERS. Os caminhos de entrada
+('input', 'subtitle') devem ser arquivos enviados por /uploads ou gerados por
+outra tarefa; os caminhos de saída são escolhidos pelo serviço, dentro da
+pasta da tarefa.
+
+Cada envio e cada tarefa tem sua própria pasta, gerenciada por um
+workspace.WorkspaceManager: pastas sem acesso há mais que o TTL são apagadas
+periodicamente, e cotas limitam o tamanho de cada pasta e do total.
+"""
+import os
+import json
+import time
+import uuid
+import shutil
+import tempfile
+import mimetypes
+import threading
+import urllib.request
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from concurrent.futures import ThreadPoolExecutor
+
+from resources import memory_report
+from workspace import WorkspaceManager, QuotaExceededError
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Parâmetros de entrada que precisam estar dentro da pasta do serviço
+INPUT_PARAMS = ('input', 'subtitle')
+
+# Parâmetro de saída de cada tipo de tarefa e o nome do arquivo gerado
+# (None quando a saída é a própria pasta da tarefa)
+OUTPUT_PARAMS = {
+    'transcribe': ('output', 'legendas.srt'),
+    'split': ('output', None),
+    'embed': ('output', 'video_com_legendas.mp4'),
+    'youtube': ('output_dir', None),
+}
+
+# Tamanho dos blocos lidos e escritos ao transferir arquivos
+COPY_CHUNK_BYTES = 1024 * 1024
+
+# Prefixos das pastas de envios e de tarefas dentro da pasta do serviço
+UPLOAD_PREFIX = "upload-"
+JOB_PREFIX = "job-"
+
+
+def default_api_dir():
+    """Get the folder for uploads and job outputs.
+
+    Returns:
+        str: VIDEOTRANSCRICAO_API_DIR from the environment, or a folder in the
+            temporary directory.
+    """
+    return os.getenv("VIDEOTRANSCRICAO_API_DIR", os.path.join(tempfile.gettempdir(), "videotranscricao_api"))
+
+
+def default_storage_manager(root_dir):
+    """Get a WorkspaceManager for the API folder, with its garbage collector running.
+
+    Limits come from the environment: VIDEOTRANSCRICAO_API_ITEM_MB (largest
+    upload or job folder, default 10240), VIDEOTRANSCRICAO_API_QUOTA_MB
+    (default 51200), VIDEOTRANSCRICAO_API_TTL_HOURS (default 24) and
+    VIDEOTRANSCRICAO_API_GC_MINUTES (default 10).
+
+    Args:
+        root_dir (str): The API folder.
+
+    Returns:
+        WorkspaceManager: The manager.
+    """
+    manager = WorkspaceManager(
+        root_dir,
+        session_quota_bytes=int(os.getenv("VIDEOTRANSCRICAO_API_ITEM_MB", "10240")) * 1024 * 1024,
+        total_quota_bytes=int(os.getenv("VIDEOTRANSCRICAO_API_QUOTA_MB", "51200")) * 1024 * 1024,
+        ttl_seconds=float(os.getenv("VIDEOTRANSCRICAO_API_TTL_HOURS", "24")) * 3600
+    )
+    manager.start_collector(float(os.getenv("VIDEOTRANSCRICAO_API_GC_MINUTES", "10")) * 60)
+    return manager
+
+
+class ApiServer(ThreadingHTTPServer):
+    """HTTP server holding the job queue and the storage folders."""
+
+    daemon_threads = True
+
+    def __init__(self, address, queue, root_dir, storage=None):
+        """Initialize the server.
+
+        Args:
+            address (tuple): (host, port) to listen on; port 0 picks a free port.
+            queue (jobs.JobQueue): Queue running the submitted jobs.
+            root_dir (str): Folder for uploads and job outputs.
+            storage (WorkspaceManager, optional): Manages the upload and job
+                folders in root_dir. Defaults to default_storage_manager().
+        """
+        super().__init__(address, _ApiHandler)
+        self.queue = queue
+        self.root_dir = os.path.realpath(root_dir)
+        os.makedirs(self.root_dir, exist_ok=True)
+        self.storage = storage or default_storage_manager(self.root_dir)
+
+    def job_storage_id(self, job_id):
+        """Get the WorkspaceManager id of a job's folder."""
+        return f"{JOB_PREFIX}{job_id}"
+
+    def job_dir(self, job_id):
+        """Get the folder of a job's outputs (which may not exist)."""
+        return self.storage.session_path(self.job_storage_id(job_id))
+
+    def inside_root(self, path):
+        """Check that a path points inside the service folder."""
+        real_path = os.path.realpath(path)
+        return os.path.commonpath([real_path, self.root_dir]) == self.root_dir
+
+    def list_artifacts(self, job_id):
+        """List the files generated by a job, relative to its folder."""
+        job_dir = self.job_dir(job_id)
+        artifacts = []
+        for folder, _, filenames in os.walk(job_dir):
+            for filename in filenames:
+                if filename == WorkspaceManager.ACCESS_MARKER:
+                    continue
+                path = os.path.join(folder, filename)
+                artifacts.append({
+                    'name': os.path.relpath(path, job_dir).replace(os.sep, '/'),
+                    'size': os.path.getsize(path),
+                    'url': f"/jobs/{job_id}/artifacts/{os.path.relpath(path, job_dir).replace(os.sep, '/')}"
+                })
+        return sorted(artifacts, key=lambda artifact: artifact['name'])
+
+
+class _ApiHandler(BaseHTTPRequestHandler):
+    """Route the API requests."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        # Keep the terminal for the service's own messages
+        pass
+
+    def _send_json(self, status, body):
+        data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_error(self, status, message):
+        self._send_json(status, {'error': message})
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length).decode('utf-8') or "{}")
+
+    def _route(self):
+        return [part for part in self.path.split("?")[0].split("/") if part]
+
+    def do_GET(self):
+        parts = self._route()
+        if parts == ['health']:
+            self._send_json(200, {'status': 'ok', 'jobs': self.server.queue.stats(), 'memory': memory_report()})
+        elif len(parts) == 2 and parts[0] == 'jobs':
+            self._get_job(parts[1])
+        elif len(parts) == 3 and parts[0] == 'jobs' and parts[2] == 'events':
+            self._stream_events(parts[1])
+        elif len(parts) >= 4 and parts[0] == 'jobs' and parts[2] == 'artifacts':
+            self._send_artifact(parts[1], "/".join(parts[3:]))
+        else:
+            self._send_error(404, "Rota não encontrada")
+
+    def do_POST(self):
+        if self._route() != ['jobs']:
+            self._send_error(404, "Rota não encontrada")
+            return
+
+        try:
+            request = self._read_json()
+        except ValueError:
+            self._send_error(400, "Corpo da requisição não é um JSON válido")
+            return
+
+        if not isinstance(request, dict) or not isinstance(request.get('params') or {}, dict):
+            self._send_error(400, "O corpo deve ser um objeto JSON, com 'params' também um objeto")
+            return
+
+        job_type = request.get('type')
+        params = dict(request.get('params') or {})
+
+        for name in INPUT_PARAMS:
+            if params.get(name) and not self.server.inside_root(params[name]):
+                self._send_error(400, f"'{name}' deve ser um arquivo enviado por /uploads ou gerado por outra tarefa")
+                return
+
+        try:
+            _check_job_params(job_type, params)
+        except Exception as e:
+            self._send_error(400, str(e))
+            return
+
+        # Outputs always go to the job's own folder; its inputs hint at the output size
+        job_id = uuid.uuid4().hex
+        if job_type in OUTPUT_PARAMS:
+            job_dir = self.server.storage.touch(self.server.job_storage_id(job_id))
+            expected_bytes = sum(
+                os.path.getsize(params[name]) for name in INPUT_PARAMS
+                if params.get(name) and os.path.isfile(params[name])
+            )
+            try:
+                self.server.storage.check_quota(self.server.job_storage_id(job_id), expected_bytes)
+            except QuotaExceededError as e:
+                self.server.storage.remove_session(self.server.job_storage_id(job_id))
+                self._send_error(507, str(e))
+                return
+            name, filename = OUTPUT_PARAMS[job_type]
+            params[name] = os.path.join(job_dir, filename) if filename else job_dir
+
+        try:
+            self.server.queue.submit(job_type, params, job_id=job_id)
+        except Exception as e:
+            self._send_error(400, str(e))
+            return
+
+        self._send_json(202, {
+            'id': job_id,
+            'status_url': f"/jobs/{job_id}",
+            'events_url': f"/jobs/{job_id}/events"
+        })
+
+    def do_PUT(self):
+        parts = self._route()
+        if len(parts) != 2 or parts[0] != 'uploads':
+            self._send_error(404, "Rota não encontrada")
+            return
+
+        length = self.headers.get("Content-Length")
+        if length is None:
+            self._send_error(411, "Content-Length é obrigatório")
+            return
+
+        filename = os.path.basename(parts[1]) or "arquivo"
+        if filename.startswith('.'):
+            filename = "arquivo" + filename
+        upload_id = f"{UPLOAD_PREFIX}{uuid.uuid4().hex}"
+        upload_dir = self.server.storage.touch(upload_id)
+        path = os.path.join(upload_dir, filename)
+
+        try:
+            self.server.storage.check_quota(upload_id, int(length))
+        except QuotaExceededError as e:
+            self.server.storage.remove_session(upload_id)
+            self._send_error(413, str(e))
+            return
+
+        remaining = int(length)
+        with open(path, 'wb') as f:
+            while remaining > 0:
+                chunk = self.rfile.read(min(COPY_CHUNK_BYTES, remaining))
+                if not chunk:
+                    break
+                f.write(chunk)
+                remaining -= len(chunk)
+
+        if remaining > 0:
+            shutil.rmtree(upload_dir, ignore_errors=True)
+            self._send_error(400, "Envio incompleto")
+            return
+
+        self._send_json(201, {'path': path, 'size': int(length)})
+
+    def _get_job(self, job_id):
+        job = self.server.queue.get(job_id)
+        if job is None:
+            self._send_error(404, "Tarefa não encontrada")
+            return
+
+        # A client still following the job keeps its files from expiring
+        if os.path.isdir(self.server.job_dir(job_id)):
+            self.server.storage.touch(self.server.job_storage_id(job_id))
+        job['artifacts'] = self.server.list_artifacts(job_id) if job['finished'] else []
+        self._send_json(200, job)
+
+    def _stream_events(self, job_id):
+        if self.server.queue.get(job_id) is None:
+            self._send_error(404, "Tarefa não encontrada")
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        # Clients reconnecting after a drop resume after the last event they saw
+        # (or from the oldest event still kept, if it was dropped since)
+        last_event_id = self.headers.get("Last-Event-ID")
+        index = int(last_event_id) + 1 if last_event_id and last_event_id.isdigit() else 0
+
+        try:
+            while True:
+                events, finished, index = self.server.queue.wait_events(job_id, start=index)
+                if events is None:
+                    return
+                if not events:
+                    if finished:
+                        return
+                    # Keep proxies from closing an idle connection
+                    self.wfile.write(b": keepalive\n\n")
+                    self.wfile.flush()
+                    continue
+
+                for event in events:
+                    data = json.dumps(event, ensure_ascii=False)
+                    self.wfile.write(f"id: {index}\nevent: {event.get('event', 'message')}\ndata: {data}\n\n".encode('utf-8'))
+                    index += 1
+                self.wfile.flush()
+        except OSError:
+            # The client disconnected
+            pass
+
+    def _send_artifact(self, job_id, name):
+        try:
+            job_dir = self.server.job_dir(job_id)
+        except Exception:
+            self._send_error(404, "Arquivo não encontrado")
+            return
+        path = os.path.realpath(os.path.join(job_dir, name))
+        if (os.path.commonpath([path, os.path.realpath(job_dir)]) != os.path.realpath(job_dir)
+                or not os.path.isfile(path) or os.path.basename(path) == WorkspaceManager.ACCESS_MARKER):
+            self._send_error(404, "Arquivo não encontrado")
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", mimetypes.guess_type(path)[0] or "application/octet-stream")
+        self.send_header("Content-Length", str(os.path.getsize(path)))
+        self.send_header("Content-Disposition", f'attachment; filename="{os.path.basename(path)}"')
+        self.end_headers()
+        with open(path, 'rb') as f:
+            shutil.copyfileobj(f, self.wfile, COPY_CHUNK_BYTES)
+
+
+def _check_job_params(job_type, params):
+    """Reject job parameters a remote client must not control.
+
+    The subtitle style goes into an ffmpeg filter, so it has to pass
+    video_processor.validate_subtitle_style(); the number of parallel encoders
+    is capped to the CPU count.
+
+    Raises:
+        Exception: If a parameter is invalid.
+    """
+    if job_type != 'embed':
+        return
+
+    if params.get('subtitle_style') is not None:
+        from video_processor import validate_subtitle_style
+        validate_subtitle_style(params['subtitle_style'])
+
+    if params.get('workers') is not None:
+        try:
+            workers = int(params['workers'])
+        except (TypeError, ValueError):
+            raise Exception("'workers' deve ser um número inteiro")
+        if workers < 1:
+            raise Exception("'workers' deve ser pelo menos 1")
+        params['workers'] = min(workers, os.cpu_count() or 1)
+
+
+def create_server(host=DEFAULT_HOST, port=DEFAULT_PORT, root_dir=None, max_workers=2, queue=None, storage=None):
+    """Create the API server (call serve_forever() to run it).
+
+    Args:
+        host (str): Address to listen on.
+        port (int): Port to listen on; 0 picks a free port.
+        root_dir (str, optional): Folder for uploads and job outputs. Defaults to default_api_dir().
+        max_workers (int): Jobs executed at the same time.
+        queue (jobs.JobQueue, optional): Queue to use. Defaults to a new one.
+        storage (WorkspaceManager, optional): Manages the files in root_dir.
+            Defaults to default_storage_manager().
+
+    Returns:
+        ApiServer: The server.
+    """
+    if queue is None:
+        from jobs import JobQueue
+        queue = JobQueue(max_workers=max_workers)
+
+    return ApiServer((host, port), queue, root_dir or default_api_dir(), storage=storage)
+
+
+def _request(method, url, body=None, data=None, timeout=60):
+    """Send a request to the API and decode the JSON answer."""
+    headers = {}
+    if body is not None:
+        data = json.dumps(body).encode('utf-8')
+        headers["Content-Type"] = "application/json"
+    request = urllib.request.Request(url, data=data, method=method, headers=headers)
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return json.loads(response.read().decode('utf-8'))
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run_load_test(base_url, input_path, job_type="probe", jobs=20, concurrency=4, params=None):
+    """Submit many jobs to a running API and measure latency and throughput.
+
+    The input file is uploaded once; each client then submits a job and follows
+    its event stream until the result arrives, like a real consumer would.
+
+    Args:
+        base_url (str): API address, e.g. http://127.0.0.1:8765.
+        input_path (str): Local file used as the 'input' of every job.
+        job_type (str): Job type to submit.
+        jobs (int): Total number of jobs.
+        concurrency (int): Clients submitting at the same time.
+        params (dict, optional): Extra job parameters.
+
+    Returns:
+        dict: 'jobs', 'errors', 'seconds', 'jobs_per_second', and 'submit' and
+            'complete' latency statistics ('p50', 'p95', 'max', in seconds).
+    """
+    base_url = base_url.rstrip("/")
+    with open(input_path, 'rb') as f:
+        uploaded = _request("PUT", f"{base_url}/uploads/{os.path.basename(input_path)}", data=f.read())
+
+    def run_one(_):
+        start_time = time.perf_counter()
+        try:
+            submitted = _request("POST", f"{base_url}/jobs", body={
+                'type': job_type,
+                'params': dict(params or {}, input=uploaded['path'])
+            })
+            submit_seconds = time.perf_counter() - start_time
+
+            result_event = None
+            with urllib.request.urlopen(f"{base_url}{submitted['events_url']}", timeout=3600) as stream:
+                for raw_line in stream:
+                    line = raw_line.decode('utf-8').strip()
+                    if line.startswith("event: ") and line[len("event: "):] in ('result', 'error'):
+                        result_event = line[len("event: "):]
+                        break
+
+            return {
+                'submit': submit_seconds,
+                'complete': time.perf_counter() - start_time,
+                'error': result_event != 'result'
+            }
+        except Exception:
+            return {'submit': 0.0, 'complete': time.perf_counter() - start_time, 'error': True}
+
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        results = list(executor.map(run_one, range(jobs)))
+    elapsed = time.perf_counter() - start_time
+
+    def summarize(key):
+        values = [result[key] for result in results if not result['error']]
+        return {
+            'p50': _percentile(values, 0.5),
+            'p95': _percentile(values, 0.95),
+            'max': max(values) if values else 0.0
+        }
+
+    return {
+        'jobs': jobs,
+        'errors': sum(1 for result in results if result['error']),
+        'seconds': elapsed,
+        'jobs_per_second': jobs / elapsed if elapsed > 0 else 0.0,
+        'submit': summarize('submit'),
+        'complete': summarize('complete')
+    }
+
+
+def serve_in_background(**kwargs):
+    """Start an API server in a background thread.
+
+    Accepts the arguments of create_server().
+
+    Returns:
+        tuple: (server, base URL).
+    """
+    server = create_server(**kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address[:2]
+    return server, f"http://{host}:{port}"
@@ -1,10 +1,9 @@
 import streamlit as st
 import os
-import tempfile
-import time
-from video_processor import VideoProcessor
-from subtitle_processor import SubtitleProcessor
-from utils import save_uploaded_file, create_download_link
+from progress import StreamlitReporter
+from resources import get_video_processor, get_subtitle_processor
+from workspace import get_workspace_manager, QuotaExceededError
+from utils import save_uploaded_file, create_download_link, get_subtitle_preview
 from ads import display_ad, display_affiliate_ad, display_support_message, show_video_tools_ads
 
 # Set page configuration
@@ -35,8 +34,24 @@ if 'segments' not in st.session_state:
     st.session_state.segments = []
 if 'processing_complete' not in st.session_state:
     st.session_state.processing_complete = False
-if 'temp_dir' not in st.session_state:
-    st.session_state.temp_dir = tempfile.mkdtemp()
+# Pasta de trabalho da sessão: limitada por cota e apagada depois de um tempo sem uso
+# (os caches de downloads e transcrições são compartilhados e ficam fora dela)
+if 'workspace_id' not in st.session_state:
+    st.session_state.workspace_id, st.session_state.temp_dir = get_workspace_manager().create_session()
+else:
+    st.session_state.temp_dir, session_expired = get_workspace_manager().resume_session(st.session_state.workspace_id)
+    # A pasta foi apagada por inatividade: os arquivos da sessão não existem mais
+    if session_expired:
+        st.session_state.video_path = None
+        st.session_state.subtitle_path = None
+        st.session_state.segments = []
+        st.session_state.processing_complete = False
+        st.session_state.audio_only = False
+        for key in ('transcription_started', 'transcription_complete', 'transcription_tier', 'embedded_video_path'):
+            st.session_state.pop(key, None)
+        st.warning("Sua sessão ficou inativa por muito tempo e os arquivos foram removidos. Envie o vídeo novamente.")
+if 'audio_only' not in st.session_state:
+    st.session_state.audio_only = False
     
 # Configurações padrão de transcrição
 if 'whisper_model' not in st.session_state:
@@ -44,6 +59,13 @@ if 'whisper_model' not in st.session_state:
 if 'quality_preset' not in st.session_state:
     st.session_state.quality_preset = "fast"
 
+# Exibe o player adequado para a mídia carregada (somente áudio ou vídeo)
+def show_media(media_path):
+    if st.session_state.get("audio_only"):
+        st.audio(media_path)
+    else:
+        st.video(media_path)
+
 # Funções para atualizar as configurações de transcrição
 def update_transcription_settings(model, quality):
     st.session_state.whisper_model = model
@@ -58,6 +80,44 @@ def on_quality_change():
     selected_quality = st.session_state.youtube_quality_preset
     st.session_state.quality_preset = selected_quality
 
+# Processadores compartilhados por todas as sessões (caches de metadados e de
+# duração, modelos); cada página só troca o destino das mensagens
+def video_processor_for_page():
+    return get_video_processor().with_reporter(StreamlitReporter())
+
+def check_workspace_quota(extra_bytes=0):
+    get_workspace_manager().check_quota(st.session_state.workspace_id, extra_bytes)
+
+# Tamanho de um arquivo da sessão, usado como estimativa das saídas derivadas dele (0 se não existir)
+def file_size(path):
+    try:
+        return os.path.getsize(path) if path else 0
+    except OSError:
+        return 0
+
+# Progresso da transcrição: só este trecho é re-executado a cada segundo
+# (uma leitura do arquivo de status), e não a página inteira
+@st.fragment(run_every=1)
+def show_transcription_progress(video_path, output_srt_path):
+    status = get_subtitle_processor().read_transcription_status(video_path, output_srt_path) or {}
+    
+    # Ao terminar (ou falhar), re-executa a página uma vez para mostrar o resultado
+    if status.get('complete') or status.get('error'):
+        st.rerun()
+    
+    st.write(f"**Status atual:** {status.get('message') or 'Processando...'}")
+    st.progress(status.get('progress', 0))
+
+# Refinamento do rascunho em segundo plano: re-executa a página quando as legendas refinadas ficam prontas
+@st.fragment(run_every=2)
+def show_refinement_progress(video_path, output_srt_path):
+    status = get_subtitle_processor().read_transcription_status(video_path, output_srt_path) or {}
+    
+    if not status.get('refining'):
+        st.rerun()
+    
+    st.info(f"📝 {status.get('message') or 'Refinando as legendas...'} Você já pode usar o rascunho abaixo.")
+
 # Create a modern header with title and description
 st.markdown("""
 <div style="text-align:center; padding:10px 0 30px 0;">
@@ -141,8 +201,13 @@ with tabs[0]:
         if uploaded_file is not None:
             # Save the uploaded file temporarily
             if st.session_state.video_path is None:
-                st.session_state.video_path = save_uploaded_file(uploaded_file, st.session_state.temp_dir)
-                st.success("✅ Vídeo carregado com sucesso! Pronto para transcrever.")
+                try:
+                    check_workspace_quota(uploaded_file.size)
+                    st.session_state.video_path = save_uploaded_file(uploaded_file, st.session_state.temp_dir)
+                    st.session_state.audio_only = False
+                    st.success("✅ Vídeo carregado com sucesso! Pronto para transcrever.")
+                except QuotaExceededError as e:
+                    st.error(f"❌ {str(e)}")
     
     # Tab for YouTube link
     with upload_tabs[1]:
@@ -187,6 +252,13 @@ with tabs[0]:
                                      value=False,
                                      help="Baixa somente as legendas, sem o vídeo")
                 
+                # Opção para baixar só o áudio quando o objetivo é apenas a transcrição
+                transcription_only = st.checkbox("Apenas transcrição (baixar somente o áudio)",
+                                              value=False,
+                                              disabled=subs_only,
+                                              help="Baixa só o áudio do vídeo, muito menor, para gerar as legendas com o Whisper. "
+                                                   "Não é possível incorporar legendas no vídeo neste modo.")
+                
                 # Qualidade do vídeo para download
                 video_quality_options = {
                     'low': "Baixa - Menor arquivo, download rápido",
@@ -266,18 +338,32 @@ with tabs[0]:
                                type="primary"):  # Botão destacado
                         try:
                             with st.spinner("🔄 Baixando do YouTube..."):
-                                video_processor = VideoProcessor()
+                                video_processor = video_processor_for_page()
+                                check_workspace_quota(video_processor.estimate_youtube_download_size(
+                                    youtube_url, quality=download_quality, audio_only=transcription_only
+                                ))
                                 
-                                # Passar a qualidade selecionada para o download
-                                result = video_processor.download_youtube_video(
-                                    youtube_url, 
-                                    st.session_state.temp_dir, 
-                                    download_with_subs,
-                                    quality=download_quality
-                                )
+                                if transcription_only:
+                                    # Apenas o áudio, que segue direto para a transcrição
+                                    result = video_processor.download_youtube_audio(
+                                        youtube_url,
+                                        st.session_state.temp_dir
+                                    )
+                                else:
+                                    # Passar a qualidade selecionada para o download
+                                    result = video_processor.download_youtube_video(
+                                        youtube_url, 
+                                        st.session_state.temp_dir, 
+                                        download_with_subs,
+                                        quality=download_quality
+                                    )
+                                st.session_state.audio_only = transcription_only
                                 
                                 # Handle subtitle result
-                                if download_with_subs and isinstance(result, dict):
+                                if transcription_only:
+                                    st.session_state.video_path = result
+                                    st.success("✅ Áudio baixado com sucesso! Pronto para transcrever.")
+                                elif download_with_subs and isinstance(result, dict):
                                     st.session_state.video_path = result['video_path']
                                     
                                     # Check if subtitles were found
@@ -316,7 +402,7 @@ with tabs[0]:
                                use_container_width=True):
                         try:
                             with st.spinner("🔄 Verificando e baixando legendas..."):
-                                video_processor = VideoProcessor()
+                                video_processor = video_processor_for_page()
                                 subtitle_path = video_processor.download_youtube_subtitles(youtube_url, st.session_state.temp_dir)
                                 
                                 if subtitle_path:
@@ -377,12 +463,12 @@ with tabs[0]:
         with vid_col1:
             # Display the uploaded video with a styled container
             st.markdown("<div style='padding:5px; border-radius:10px; background-color:#f0f6ff;'>", unsafe_allow_html=True)
-            st.video(st.session_state.video_path)
+            show_media(st.session_state.video_path)
             st.markdown("</div>", unsafe_allow_html=True)
         
         with vid_col2:
             # Display video information
-            video_processor = VideoProcessor()
+            video_processor = video_processor_for_page()
             duration = video_processor.get_video_duration(st.session_state.video_path)
             duration_min = int(duration // 60)
             duration_sec = int(duration % 60)
@@ -514,6 +600,24 @@ with tabs[0]:
             </div>
             """, unsafe_allow_html=True)
             
+            force_asr = st.checkbox(
+                "Transcrever com Whisper mesmo se o vídeo já tiver legendas",
+                key="force_asr",
+                help="Por padrão, legendas em texto embutidas no vídeo (MKV/MP4) são extraídas em segundos, sem transcrição."
+            )
+            use_vad = st.checkbox(
+                "Pular trechos sem fala (música, silêncio, pausas longas)",
+                key="use_vad",
+                help="Detecta a voz antes da transcrição e envia ao Whisper só os trechos com fala: mais rápido e sem texto inventado no silêncio."
+            )
+            progressive = False
+            if whisper_model != "tiny":
+                progressive = st.checkbox(
+                    "Rascunho rápido primeiro (modelo tiny), refinado em segundo plano",
+                    key="progressive",
+                    help=f"O rascunho fica pronto em poucos minutos e já pode ser usado para dividir o vídeo; quando o modelo {whisper_model} terminar, as legendas (inclusive as dos segmentos) são substituídas pela versão refinada."
+                )
+            
             if st.button("🔊 Iniciar Transcrição", 
                         help=f"Utiliza o modelo {whisper_model} do Whisper com configuração de qualidade {quality_preset}. Esta operação leva cerca de {time_multiplier}x a duração do vídeo.",
                         use_container_width=True,
@@ -522,8 +626,8 @@ with tabs[0]:
                 st.session_state.transcription_started = True
             
             # Initialize processors
-            subtitle_processor = SubtitleProcessor()
-            video_processor = VideoProcessor()
+            video_processor = video_processor_for_page()
+            subtitle_processor = video_processor.subtitle_processor
             
             # Define output path
             output_srt_path = os.path.join(st.session_state.temp_dir, "subtitles.srt")
@@ -545,15 +649,23 @@ with tabs[0]:
                         st.session_state.video_path, 
                         output_srt_path,
                         model=whisper_model,
-                        quality_preset=quality_preset
+                        quality_preset=quality_preset,
+                        force_asr=force_asr,
+                        vad=use_vad,
+                        progressive=progressive
                     )
                     
                     # Check if transcription is finished
                     if transcription_status.get('complete', False):
                         st.session_state.subtitle_path = output_srt_path
+                        
+                        # Segmentos já divididos mantêm os vídeos: só as legendas de cada um são refeitas
+                        if st.session_state.segments:
+                            video_processor.resplit_subtitles(st.session_state.segments, output_srt_path)
                         st.session_state.processing_complete = True
                         st.session_state.transcription_complete = True
                         st.session_state.transcription_started = False
+                        st.session_state.transcription_tier = transcription_status.get('tier', 'final')
                         
                         # Show completion status
                         st.markdown("""
@@ -566,13 +678,14 @@ with tabs[0]:
                         st.markdown("</div>", unsafe_allow_html=True)  # Close the container
                         
                         st.success("✅ Transcrição concluída com sucesso! Agora você pode dividir o vídeo ou baixar a legenda.")
+                    elif transcription_status.get('error'):
+                        st.session_state.transcription_started = False
+                        st.markdown("</div>", unsafe_allow_html=True)  # Close the container
+                        st.error(f"Erro ao transcrever o vídeo: {transcription_status['error']}")
                     else:
-                        # Show progress and status in a more attractive way
-                        st.write(f"**Status atual:** {transcription_status.get('message', 'Processando...')}")
-                        
-                        # Show progress if available
-                        progress_value = transcription_status.get('progress', 0)
-                        st.progress(progress_value)
+                        # Status and progress refresh every second inside the fragment;
+                        # the rest of the page is rendered once while waiting
+                        show_transcription_progress(st.session_state.video_path, output_srt_path)
                         
                         # Show estimated time with faster processing
                         duration = video_processor.get_video_duration(st.session_state.video_path)
@@ -597,15 +710,29 @@ with tabs[0]:
                         st.markdown("</div>", unsafe_allow_html=True)
                         
                         st.markdown("</div>", unsafe_allow_html=True)  # Close the container
-                        
-                        # Add a rerun to check progress
-                        time.sleep(1)
-                        st.rerun()
                 
             # If transcription is complete, just update state
             elif st.session_state.transcription_complete:
                 st.session_state.subtitle_path = output_srt_path
                 st.session_state.processing_complete = True
+                
+                # Rascunho: trocar pelas legendas refinadas assim que ficarem prontas
+                if st.session_state.get('transcription_tier') == 'draft':
+                    refinement_status = subtitle_processor.read_transcription_status(
+                        st.session_state.video_path, output_srt_path
+                    ) or {}
+                    if refinement_status.get('refining'):
+                        show_refinement_progress(st.session_state.video_path, output_srt_path)
+                    else:
+                        # Refinado ou não, este é o resultado final da sessão
+                        st.session_state.transcription_tier = 'final'
+                        if refinement_status.get('tier') == 'final':
+                            # O arquivo já foi substituído; os segmentos recebem as legendas novas
+                            if st.session_state.segments:
+                                video_processor.resplit_subtitles(st.session_state.segments, output_srt_path)
+                            st.success(f"✨ {refinement_status['message']}")
+                        elif refinement_status.get('refine_error'):
+                            st.warning(refinement_status['message'])
             
             # Display the subtitles if transcription is complete
             if st.session_state.subtitle_path and os.path.exists(st.session_state.subtitle_path):
@@ -621,8 +748,8 @@ with tabs[0]:
                 """, unsafe_allow_html=True)
                 
                 # Create a better download button
-                with open(st.session_state.subtitle_path, 'r') as f:
-                    subtitle_data = f.read()
+                subtitle_preview_data = get_subtitle_preview(st.session_state.subtitle_path)
+                subtitle_data = subtitle_preview_data['content']
                     
                 download_col1, download_col2 = st.columns([1, 3])
                 with download_col1:
@@ -635,14 +762,8 @@ with tabs[0]:
                         use_container_width=True
                     )
                 
-                # Parse SRT for cleaner preview
-                import re
-                # Remove timing info for preview
-                preview_text = re.sub(r'\d+\s+\d{2}:\d{2}:\d{2},\d{3} --> \d{2}:\d{2}:\d{2},\d{3}\s+', '', subtitle_data)
-                # Remove numbers
-                preview_text = re.sub(r'^\d+$', '', preview_text, flags=re.MULTILINE)
-                # Clean up extra whitespace
-                preview_text = re.sub(r'\n\s*\n', '\n\n', preview_text)
+                # Preview text comes from the cached cue index (no timing info)
+                preview_text = subtitle_preview_data['text']
                 
                 # Show preview in a nice scrollable container
                 st.markdown(f"""
@@ -704,7 +825,7 @@ with tabs[1]:
         
         # Show original video for reference
         st.write("#### Vídeo Original")
-        st.video(st.session_state.video_path)
+        show_media(st.session_state.video_path)
         
         st.write("#### Configurar Divisão")
         st.write("Especifique como você deseja dividir o vídeo:")
@@ -736,7 +857,7 @@ with tabs[1]:
             ["Partes iguais", "Marcadores de tempo personalizados"]
         )
         
-        video_processor = VideoProcessor()
+        video_processor = video_processor_for_page()
         duration = video_processor.get_video_duration(st.session_state.video_path)
         
         # Show video duration
@@ -780,6 +901,7 @@ with tabs[1]:
                     progress_bar.progress(30)
                     
                     # Split the video with the selected quality
+                    check_workspace_quota(file_size(st.session_state.video_path))
                     st.session_state.segments = video_processor.split_video_equal_parts(
                         st.session_state.video_path,
                         st.session_state.subtitle_path,
@@ -874,6 +996,7 @@ with tabs[1]:
                                 progress_bar.progress(30)
                                 
                                 # Split the video with the selected quality
+                                check_workspace_quota(file_size(st.session_state.video_path))
                                 st.session_state.segments = video_processor.split_video_custom_timestamps(
                                     st.session_state.video_path,
                                     st.session_state.subtitle_path,
@@ -967,12 +1090,11 @@ with tabs[1]:
                     st.markdown("</div>", unsafe_allow_html=True)
                 
                 with info_col:
-                    # Read subtitle content for information
-                    with open(segment['subtitle_path'], 'r', encoding='utf-8', errors='replace') as f:
-                        subtitle_content = f.read()
+                    # Read subtitle information from the cached cue index
+                    segment_preview = get_subtitle_preview(segment['subtitle_path'])
                     
                     # Count number of subtitle entries
-                    subtitle_count = subtitle_content.count('\n\n') + 1
+                    subtitle_count = segment_preview['count']
                     
                     # Create an information card
                     st.markdown(f"""
@@ -1018,14 +1140,8 @@ with tabs[1]:
                         )
                 
                 with segment_tabs[1]:
-                    # Parse SRT for cleaner preview
-                    import re
-                    # Remove timing info for preview
-                    preview_text = re.sub(r'\d+\s+\d{2}:\d{2}:\d{2},\d{3} --> \d{2}:\d{2}:\d{2},\d{3}\s+', '', subtitle_content)
-                    # Remove numbers
-                    preview_text = re.sub(r'^\d+$', '', preview_text, flags=re.MULTILINE)
-                    # Clean up extra whitespace
-                    preview_text = re.sub(r'\n\s*\n', '\n\n', preview_text)
+                    # Preview text comes from the cached cue index (no timing info)
+                    preview_text = segment_preview['text']
                     
                     # Show subtitles in a nice container
                     st.markdown(f"""
@@ -1183,15 +1299,14 @@ with tabs[2]:
             
             if subtitle_path and os.path.exists(subtitle_path):
                 try:
-                    with open(subtitle_path, 'r', encoding='utf-8', errors='replace') as f:
-                        subtitle_data = f.read()
-                        st.download_button(
-                            label="💾 Baixar Legendas SRT",
-                            data=subtitle_data,
-                            file_name="legendas_completas.srt",
-                            mime="text/plain",
-                            use_container_width=True
-                        )
+                    subtitle_data = get_subtitle_preview(subtitle_path)['content']
+                    st.download_button(
+                        label="💾 Baixar Legendas SRT",
+                        data=subtitle_data,
+                        file_name="legendas_completas.srt",
+                        mime="text/plain",
+                        use_container_width=True
+                    )
                 except Exception as e:
                     st.error(f"Erro ao carregar legendas: {str(e)}")
                     subtitle_data = ""
@@ -1257,8 +1372,25 @@ with tabs[2]:
             </div>
             """, unsafe_allow_html=True)
             
+            # Tipo de incorporação das legendas (padrão: a gravação em uma única passada)
+            embed_mode = st.radio(
+                "Tipo de legenda:",
+                options=["hard", "parallel", "sparse", "soft"],
+                format_func=lambda x: {
+                    "hard": "Permanente - processamento único",
+                    "parallel": "Permanente - processamento paralelo (mais rápido em vídeos longos)",
+                    "sparse": "Permanente - re-encodar só trechos com legendas (vídeos com pausas longas)",
+                    "soft": "Faixa selecionável no player (sem re-encodar, leva segundos)"
+                }.get(x, x),
+                help="Legendas permanentes ficam gravadas na imagem; a faixa selecionável pode ser ativada ou desativada no player"
+            )
+            
+            if st.session_state.audio_only:
+                st.info("ℹ️ Apenas o áudio foi baixado, então não há vídeo para incorporar legendas.")
+            
             # Add a button to create a video with embedded subtitles
-            if st.button("🔄 Gerar Vídeo com Legendas Embutidas", use_container_width=True):
+            if st.button("🔄 Gerar Vídeo com Legendas Embutidas", use_container_width=True,
+                         disabled=st.session_state.audio_only):
                 # Create a styled container for the processing
                 process_container = st.container()
                 with process_container:
@@ -1280,17 +1412,20 @@ with tabs[2]:
                     output_video_path = os.path.join(st.session_state.temp_dir, "embedded_video.mp4")
                     
                     try:
+                        check_workspace_quota(file_size(st.session_state.video_path))
+                        
                         # Update progress
                         progress_text.write("⚙️ Incorporando legendas no vídeo...")
                         progress_bar.progress(30)
                         
                         # Embed subtitles into the video with the selected quality
-                        video_processor = VideoProcessor()
+                        video_processor = video_processor_for_page()
                         output_path = video_processor.embed_subtitles(
                             st.session_state.video_path,
                             st.session_state.subtitle_path,
                             output_video_path,
-                            quality=subtitle_quality
+                            quality=subtitle_quality,
+                            mode=embed_mode
                         )
                         
                         st.session_state.embedded_video_path = output_path
@@ -1353,6 +1488,39 @@ with tabs[2]:
                 </div>
                 """, unsafe_allow_html=True)
                 
+                # Incorporar legendas em todos os segmentos de uma vez, em paralelo
+                all_segments_cols = st.columns([2, 3])
+                with all_segments_cols[0]:
+                    all_segments_quality = st.select_slider(
+                        "Qualidade - Todos os segmentos:",
+                        options=["low", "medium", "high"],
+                        value="medium",
+                        key="all_segments_quality",
+                        format_func=lambda x: {
+                            "low": "Baixa",
+                            "medium": "Média",
+                            "high": "Alta"
+                        }.get(x, x)
+                    )
+                
+                with all_segments_cols[1]:
+                    st.info("⚡ Os segmentos são processados em paralelo, aproveitando todos os núcleos do processador")
+                
+                if st.button("🔄 Gerar Todos os Segmentos com Legendas Embutidas", key="embed_all_segments", use_container_width=True,
+                             disabled=st.session_state.audio_only):
+                    with st.spinner("⚙️ Incorporando legendas em todos os segmentos..."):
+                        try:
+                            check_workspace_quota(sum(file_size(segment.get('video_path')) for segment in st.session_state.segments))
+                            video_processor = video_processor_for_page()
+                            video_processor.embed_subtitles_segments(
+                                st.session_state.segments,
+                                st.session_state.temp_dir,
+                                quality=all_segments_quality
+                            )
+                            st.success(f"✅ Legendas incorporadas em {len(st.session_state.segments)} segmentos!")
+                        except Exception as e:
+                            st.error(f"Erro ao incorporar legendas nos segmentos: {str(e)}")
+                
                 # Create a list of segments in cards
                 for i, segment in enumerate(st.session_state.segments):
                     st.markdown(f"""
@@ -1391,6 +1559,18 @@ with tabs[2]:
                                 use_container_width=True
                             )
                     
+                    # Segmento já processado (por exemplo, pelo botão de todos os segmentos)
+                    if segment.get('embedded_path') and os.path.exists(segment['embedded_path']):
+                        with open(segment['embedded_path'], 'rb') as f:
+                            st.download_button(
+                                label=f"💾 Baixar Segmento {i+1} com Legendas",
+                                data=f,
+                                file_name=f"segmento_{i+1}_com_legendas.mp4",
+                                mime="video/mp4",
+                                key=f"embedded_download_{i}",
+                                use_container_width=True
+                            )
+                    
                     # Add a button for embedded subtitles but in a more elegant way
                     segment_id = f"segment_{i+1}"
                     segment_button_key = f"embed_button_{segment_id}"
@@ -1420,7 +1600,8 @@ with tabs[2]:
                             "high": "🔍 Alta qualidade, maior arquivo"
                         }.get(segment_quality))
                     
-                    if st.button(f"🔄 Gerar Segmento {i+1} com Legendas Embutidas", key=segment_button_key, use_container_width=True):
+                    if st.button(f"🔄 Gerar Segmento {i+1} com Legendas Embutidas", key=segment_button_key, use_container_width=True,
+                                 disabled=st.session_state.audio_only):
                         segment_process_container = st.container()
                         with segment_process_container:
                             st.markdown(f"""
@@ -1444,7 +1625,7 @@ with tabs[2]:
                                 embedded_segment_path = os.path.join(st.session_state.temp_dir, f"embedded_segment_{i+1}.mp4")
                                 
                                 # Embed subtitles into the segment with selected quality
-                                video_processor = VideoProcessor()
+                                video_processor = video_processor_for_page()
                                 output_segment_path = video_processor.embed_subtitles(
                                     segment['video_path'],
                                     segment['subtitle_path'],
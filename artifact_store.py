@@ -0,0 +1,92 @@
+"""
+Materialização de arquivos gerados sem duplicar bytes.
+
+Vídeos baixados, entradas de cache e saídas pedidas pelo usuário muitas vezes
+têm o mesmo conteúdo com outro nome. Em vez de copiar, materialize() cria o
+destino, em ordem de preferência, com:
+
+    1. reflink (FICLONE): cópia instantânea que compartilha os blocos até que
+       um dos arquivos seja alterado (Btrfs, XFS, bcachefs, ...);
+    2. hardlink: o mesmo arquivo com outro nome (só quando nenhum dos dois
+       será editado, pois uma edição aparece nos dois);
+    3. cópia comum, quando os arquivos estão em sistemas de arquivos diferentes
+       ou nada mais é suportado.
+
+O destino é criado com outro nome e depois renomeado (os.replace), então
+leitores nunca veem um arquivo pela metade.
+"""
+import os
+import shutil
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# ioctl do Linux que clona o conteúdo de um arquivo em outro (_IOW(0x94, 9, int))
+FICLONE = 0x40049409
+
+
+def reflink(src_path, dst_path):
+    """Clone src_path into a new file dst_path, sharing its data blocks.
+
+    Raises:
+        OSError: If the filesystem (or the platform) doesn't support reflinks,
+            or the files are on different filesystems.
+    """
+    if fcntl is None:
+        raise OSError("reflink não suportado nesta plataforma")
+
+    with open(src_path, 'rb') as src, open(dst_path, 'wb') as dst:
+        try:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        except OSError:
+            dst.close()
+            os.remove(dst_path)
+            raise
+    shutil.copystat(src_path, dst_path)
+
+
+def materialize(src_path, dst_path, allow_hardlink=True):
+    """Make dst_path hold the content of src_path, sharing bytes when possible.
+
+    Args:
+        src_path (str): Existing file.
+        dst_path (str): File to create or replace.
+        allow_hardlink (bool): Whether dst_path may be a hardlink to src_path.
+            Pass False when either file may later be modified in place (e.g.
+            a subtitle the user edits), so only reflinks or copies are made.
+
+    Returns:
+        str: dst_path.
+    """
+    if os.path.exists(dst_path) and os.path.samefile(src_path, dst_path):
+        return dst_path
+
+    dst_dir = os.path.dirname(os.path.abspath(dst_path))
+    os.makedirs(dst_dir, exist_ok=True)
+    temp_path = os.path.join(
+        dst_dir, f".{os.path.basename(dst_path)}.{os.getpid()}.{threading.get_ident()}.tmp"
+    )
+
+    try:
+        try:
+            reflink(src_path, temp_path)
+        except OSError:
+            linked = False
+            if allow_hardlink:
+                try:
+                    os.link(src_path, temp_path)
+                    linked = True
+                except OSError:
+                    pass
+            if not linked:
+                shutil.copy2(src_path, temp_path)
+
+        os.replace(temp_path, dst_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+    return dst_path
@@ -10,10 +10,22 @@ a partir da linha de comando, oferecendo as mesmas funcionalidades da interface
 Exemplos de uso:
     # Transcrever um vídeo (gera arquivo SRT)
     python cli.py transcribe --input video.mp4 --output legendas.srt
+    
+    # Rascunho rápido com o modelo tiny, substituído depois pelo resultado do modelo small
+    python cli.py transcribe --input video.mp4 --progressive --model small
 
     # Baixar e transcrever vídeo do YouTube
     python cli.py youtube --url "https://www.youtube.com/watch?v=ID_DO_VIDEO" --output video_baixado.mp4
 
+    # Transcrever vídeo do YouTube baixando apenas o áudio
+    python cli.py youtube --url "https://www.youtube.com/watch?v=ID_DO_VIDEO" --audio-only --transcribe
+
+    # Transcrever vídeo do YouTube enquanto o áudio é baixado
+    python cli.py youtube --url "https://www.youtube.com/watch?v=ID_DO_VIDEO" --stream --output legendas.srt
+
+    # Baixar e transcrever todos os vídeos de uma playlist ou canal
+    python cli.py playlist --url "https://www.youtube.com/playlist?list=ID_DA_PLAYLIST" --audio-only --transcribe --output curso
+
     # Dividir um vídeo em partes iguais
     python cli.py split --input video.mp4 --subtitle legendas.srt --parts 3 --output pasta_saida
 
@@ -22,6 +34,31 @@ Exemplos de uso:
 
     # Incorporar legendas no vídeo
     python cli.py embed --input video.mp4 --subtitle legendas.srt --output video_com_legendas.mp4
+
+    # Incorporar legendas processando blocos do vídeo em paralelo
+    python cli.py embed --input video.mp4 --subtitle legendas.srt --output video_com_legendas.mp4 --mode parallel
+
+    # Adicionar legendas como faixa selecionável (sem re-encodar, leva segundos)
+    python cli.py embed --input video.mp4 --subtitle legendas.srt --output video_com_legendas.mp4 --mode soft
+
+    # Comparar os codificadores de vídeo disponíveis nesta máquina
+    python cli.py benchmark --input video.mp4 --target balanced
+
+    # Comparar arquivos intermediários na RAM (VIDEO_SCRATCH_DIR) e em um disco lento
+    python cli.py benchmark --input video.mp4 --io --io-dir /mnt/rede/tmp
+
+    # Medir o ganho da detecção de voz em uma pasta de vídeos com pausas longas
+    python cli.py benchmark --input pasta_de_videos --vad --model tiny
+
+    # Manter modelos e caches carregados entre comandos (os demais comandos usam o daemon automaticamente)
+    python cli.py daemon start
+
+    # Iniciar a API HTTP JSON e testá-la com tarefas simultâneas
+    python cli.py serve --port 8765
+    python cli.py loadtest --input video.mp4 --jobs 50 --concurrency 8
+
+    # Verificar o tempo de inicialização da CLI
+    python cli.py startup --subcommand split
 """
 
 import os
@@ -33,8 +70,16 @@ import shutil
 from pathlib import Path
 
 # Importar classes do projeto
-from video_processor import VideoProcessor
-from subtitle_processor import SubtitleProcessor
+# VideoProcessor e SubtitleProcessor (e, por meio deles, yt_dlp, srt...) são
+# importados dentro de cada comando, para que --help e comandos simples iniciem rápido.
+from encoder_profiles import ENCODER_PROFILES
+from progress import ConsoleReporter
+
+# Tempo máximo (em segundos) para a CLI iniciar, verificado pelo comando startup
+STARTUP_BUDGET_SECONDS = 0.5
+
+# Módulos que não devem ser carregados só para iniciar a CLI
+HEAVY_MODULES = ['streamlit', 'yt_dlp', 'whisper', 'torch', 'srt']
 
 
 def setup_parser():
@@ -45,6 +90,9 @@ def setup_parser():
         epilog=__doc__
     )
     
+    parser.add_argument('--no-daemon', action='store_true',
+                        help='Não usar o daemon, mesmo que esteja em execução')
+    
     # Criar subparsers para diferentes comandos
     subparsers = parser.add_subparsers(dest='command', help='Comandos disponíveis')
     
@@ -52,8 +100,17 @@ def setup_parser():
     transcribe_parser = subparsers.add_parser('transcribe', help='Transcrever um vídeo para legendas SRT')
     transcribe_parser.add_argument('--input', '-i', required=True, help='Caminho para o arquivo de vídeo')
     transcribe_parser.add_argument('--output', '-o', help='Caminho para salvar o arquivo SRT (opcional)')
-    transcribe_parser.add_argument('--model', '-m', default='tiny', choices=['tiny', 'base', 'small'], 
-                                 help='Modelo Whisper a ser usado (tiny, base, small)')
+    transcribe_parser.add_argument('--model', '-m', choices=['tiny', 'base', 'small'], 
+                                 help='Modelo Whisper a ser usado (tiny, base, small; padrão: tiny, ou small com --progressive)')
+    tier_group = transcribe_parser.add_mutually_exclusive_group()
+    tier_group.add_argument('--progressive', action='store_true',
+                            help='Gravar primeiro um rascunho rápido (modelo tiny) e substituí-lo pelo resultado do --model quando pronto')
+    tier_group.add_argument('--draft-only', action='store_true',
+                            help='Gravar apenas o rascunho rápido (modelo tiny), sem refinamento')
+    transcribe_parser.add_argument('--force-asr', action='store_true',
+                                 help='Transcrever com Whisper mesmo se o vídeo tiver legendas embutidas ou um .srt/.vtt ao lado')
+    transcribe_parser.add_argument('--vad', action='store_true',
+                                 help='Transcrever apenas os trechos com fala (mais rápido em vídeos com música ou pausas longas)')
     
     # Comando: youtube
     youtube_parser = subparsers.add_parser('youtube', help='Baixar vídeo do YouTube')
@@ -61,6 +118,36 @@ def setup_parser():
     youtube_parser.add_argument('--output', '-o', help='Caminho para salvar o vídeo (opcional)')
     youtube_parser.add_argument('--transcribe', '-t', action='store_true', 
                                help='Gerar transcrição depois de baixar')
+    youtube_parser.add_argument('--quality', '-q', default='medium', choices=['low', 'medium', 'high'],
+                               help='Qualidade do vídeo a ser baixado')
+    youtube_parser.add_argument('--fragments', type=int,
+                               help='Número de fragmentos baixados em paralelo (padrão: 4)')
+    youtube_parser.add_argument('--audio-only', '-a', action='store_true',
+                               help='Baixar apenas o áudio (para quem só precisa da transcrição); '
+                                    'o arquivo mantém a extensão do formato baixado (.m4a, .webm)')
+    youtube_parser.add_argument('--stream', action='store_true',
+                               help='Transcrever enquanto o áudio é baixado (gera apenas o SRT; --output é o arquivo SRT)')
+    youtube_parser.add_argument('--model', '-m', default='tiny', choices=['tiny', 'base', 'small'],
+                               help='Modelo Whisper a ser usado na transcrição')
+    
+    # Comando: playlist
+    playlist_parser = subparsers.add_parser('playlist', help='Baixar (e transcrever) todos os vídeos de uma playlist ou canal')
+    playlist_parser.add_argument('--url', '-u', required=True, help='URL da playlist ou do canal do YouTube')
+    playlist_parser.add_argument('--output', '-o', default='playlist', help='Pasta para salvar os arquivos (padrão: ./playlist)')
+    playlist_parser.add_argument('--transcribe', '-t', action='store_true',
+                                 help='Gerar transcrição de cada vídeo baixado')
+    playlist_parser.add_argument('--quality', '-q', default='medium', choices=['low', 'medium', 'high'],
+                                 help='Qualidade dos vídeos a serem baixados')
+    playlist_parser.add_argument('--audio-only', '-a', action='store_true',
+                                 help='Baixar apenas o áudio de cada vídeo')
+    playlist_parser.add_argument('--model', '-m', default='tiny', choices=['tiny', 'base', 'small'],
+                                 help='Modelo Whisper a ser usado na transcrição')
+    playlist_parser.add_argument('--download-workers', type=int,
+                                 help='Número de downloads simultâneos (padrão: 2)')
+    playlist_parser.add_argument('--transcribe-workers', type=int,
+                                 help='Número de transcrições simultâneas (padrão: 1)')
+    playlist_parser.add_argument('--fragments', type=int,
+                                 help='Número de fragmentos baixados em paralelo em cada download (padrão: 4)')
     
     # Comando: split
     split_parser = subparsers.add_parser('split', help='Dividir vídeo em partes')
@@ -69,12 +156,70 @@ def setup_parser():
     split_parser.add_argument('--output', '-o', required=True, help='Pasta para salvar os segmentos')
     split_parser.add_argument('--parts', '-p', type=int, help='Número de partes iguais (2-20)')
     split_parser.add_argument('--timestamps', '-ts', help='Timestamps para divisão (em segundos, separados por vírgula)')
+    split_parser.add_argument('--encoder', choices=list(ENCODER_PROFILES.keys()),
+                              help='Codificador de vídeo usado ao re-encodar (padrão: VIDEO_ENCODER ou libx264)')
     
     # Comando: embed
     embed_parser = subparsers.add_parser('embed', help='Incorporar legendas em um vídeo')
     embed_parser.add_argument('--input', '-i', required=True, help='Caminho para o arquivo de vídeo')
     embed_parser.add_argument('--subtitle', '-s', required=True, help='Caminho para o arquivo de legendas SRT')
     embed_parser.add_argument('--output', '-o', required=True, help='Caminho para salvar o vídeo com legendas')
+    embed_parser.add_argument('--mode', default='hard', choices=['hard', 'parallel', 'sparse', 'soft'],
+                              help='Modo de incorporação (hard: um único processo, parallel: blocos em paralelo, '
+                                   'sparse: re-encoda apenas trechos com legendas, '
+                                   'soft: faixa de legendas selecionável, sem re-encodar)')
+    embed_parser.add_argument('--workers', '-w', type=int,
+                              help='Número máximo de processos ffmpeg em paralelo (padrão: número de CPUs)')
+    embed_parser.add_argument('--encoder', choices=list(ENCODER_PROFILES.keys()),
+                              help='Codificador de vídeo usado ao re-encodar (padrão: VIDEO_ENCODER ou libx264)')
+    
+    # Comando: benchmark
+    benchmark_parser = subparsers.add_parser('benchmark', help='Comparar codificadores de vídeo nesta máquina')
+    benchmark_parser.add_argument('--input', '-i', required=True, help='Caminho para um vídeo de amostra')
+    benchmark_parser.add_argument('--seconds', type=float, default=10, help='Duração da amostra codificada (em segundos)')
+    benchmark_parser.add_argument('--quality', '-q', default='medium', choices=['low', 'medium', 'high'],
+                                  help='Preset de qualidade a ser comparado')
+    benchmark_parser.add_argument('--target', default='balanced', choices=['speed', 'size', 'balanced'],
+                                  help='Critério da recomendação (velocidade, tamanho ou equilíbrio)')
+    benchmark_parser.add_argument('--io', action='store_true',
+                                  help='Comparar a gravação de arquivos intermediários na RAM e no disco, em vez dos codificadores')
+    benchmark_parser.add_argument('--io-dir', help='Pasta no disco usada na comparação --io (padrão: pasta do vídeo)')
+    benchmark_parser.add_argument('--vad', action='store_true',
+                                  help='Medir quanto áudio sem fala a detecção de voz remove (--input pode ser uma pasta de vídeos)')
+    benchmark_parser.add_argument('--model', '-m', choices=['tiny', 'base', 'small'],
+                                  help='Com --vad, também cronometrar a transcrição com e sem detecção de voz usando este modelo')
+    
+    # Comando: daemon
+    daemon_parser = subparsers.add_parser('daemon', help='Iniciar, parar ou consultar o daemon local')
+    daemon_parser.add_argument('action', nargs='?', default='start', choices=['start', 'stop', 'status'],
+                               help='start: roda o daemon em primeiro plano; stop: encerra; status: mostra o estado')
+    daemon_parser.add_argument('--socket', help='Caminho do socket Unix (padrão: VIDEOTRANSCRICAO_SOCKET, $XDG_RUNTIME_DIR ou uma pasta 0700 em /tmp)')
+    daemon_parser.add_argument('--max-jobs', type=int, default=2, help='Número de tarefas executadas ao mesmo tempo')
+    
+    # Comando: serve
+    serve_parser = subparsers.add_parser('serve', help='Iniciar a API HTTP JSON')
+    serve_parser.add_argument('--host', default='127.0.0.1', help='Endereço de escuta (padrão: 127.0.0.1)')
+    serve_parser.add_argument('--port', '-p', type=int, default=8765, help='Porta de escuta (padrão: 8765)')
+    serve_parser.add_argument('--workers', '-w', type=int, default=2, help='Número de tarefas executadas ao mesmo tempo')
+    serve_parser.add_argument('--dir', help='Pasta para arquivos enviados e gerados (padrão: VIDEOTRANSCRICAO_API_DIR)')
+    
+    # Comando: loadtest
+    loadtest_parser = subparsers.add_parser('loadtest', help='Teste de carga da API HTTP')
+    loadtest_parser.add_argument('--input', '-i', required=True, help='Arquivo de vídeo usado em todas as tarefas')
+    loadtest_parser.add_argument('--url', help='Endereço de uma API em execução (padrão: inicia uma API local temporária)')
+    loadtest_parser.add_argument('--type', default='probe', choices=['probe', 'transcribe'],
+                                 help='Tipo de tarefa enviada')
+    loadtest_parser.add_argument('--jobs', '-n', type=int, default=20, help='Número total de tarefas')
+    loadtest_parser.add_argument('--concurrency', '-c', type=int, default=4, help='Clientes enviando ao mesmo tempo')
+    loadtest_parser.add_argument('--workers', '-w', type=int, default=2,
+                                 help='Tarefas executadas ao mesmo tempo pela API local')
+    
+    # Comando: startup
+    startup_parser = subparsers.add_parser('startup', help='Medir o tempo de inicialização da CLI')
+    startup_parser.add_argument('--subcommand', '-c', help='Comando cuja ajuda (--help) é medida (padrão: ajuda geral)')
+    startup_parser.add_argument('--runs', '-r', type=int, default=5, help='Número de execuções medidas')
+    startup_parser.add_argument('--budget', '-b', type=float, default=STARTUP_BUDGET_SECONDS,
+                                help='Tempo máximo aceitável, em segundos')
     
     return parser
 
@@ -93,6 +238,26 @@ def print_progress(message, progress=None):
     sys.stdout.flush()
 
 
+def run_job(args, job_type, params):
+    """Executar uma tarefa no daemon, se estiver rodando, ou neste processo.
+    
+    Args:
+        args: Argumentos da linha de comando (--no-daemon desativa o daemon).
+        job_type (str): Tipo de tarefa (ver jobs.JOB_HANDLERS).
+        params (dict): Parâmetros da tarefa, com caminhos absolutos.
+        
+    Returns:
+        dict: Resultado da tarefa.
+    """
+    import daemon_server
+    
+    if not getattr(args, 'no_daemon', False) and daemon_server.is_running():
+        return daemon_server.send_request(job_type, params, reporter=ConsoleReporter())
+    
+    from jobs import JobRunner
+    return JobRunner(reporter=ConsoleReporter()).run(job_type, params)
+
+
 def transcribe_video(args):
     """Transcrever um vídeo para legendas SRT."""
     input_path = os.path.abspath(args.input)
@@ -112,19 +277,36 @@ def transcribe_video(args):
     # Garantir que o diretório de saída existe
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
     
+    from subtitle_processor import SubtitleProcessor
+    
+    draft_model = SubtitleProcessor.DRAFT_MODEL
+    if args.draft_only:
+        model = draft_model
+    else:
+        model = args.model or ('small' if args.progressive else draft_model)
+    
     try:
-        # Inicializar o processador de legendas
-        subtitle_processor = SubtitleProcessor()
-        
         print(f"Iniciando transcrição do vídeo: {os.path.basename(input_path)}")
-        print(f"Usando modelo Whisper: {args.model}")
+        if args.progressive and model != draft_model:
+            print(f"Usando modelo Whisper: {draft_model} (rascunho), depois {model}")
+            print(f"O rascunho fica disponível em {output_path} enquanto o refinamento é feito.")
+        else:
+            print(f"Usando modelo Whisper: {model}")
         print(f"Este processo pode levar vários minutos dependendo do tamanho do vídeo...")
         
         # Iniciar temporizador
         start_time = time.time()
         
-        # Chamar o método de transcrição (versão sem thread)
-        result = subtitle_processor.transcribe_video(input_path, output_path)
+        # Executar a transcrição (no daemon, se estiver rodando)
+        run_job(args, 'transcribe', {
+            'input': input_path,
+            'output': output_path,
+            'model': model,
+            'force_asr': args.force_asr,
+            'sidecar': True,
+            'vad': args.vad,
+            'progressive': args.progressive
+        })
         
         # Mostrar tempo decorrido
         elapsed_time = time.time() - start_time
@@ -141,9 +323,52 @@ def transcribe_video(args):
         return False
 
 
+def stream_youtube_transcription(args):
+    """Transcrever um vídeo do YouTube enquanto o áudio é baixado."""
+    from video_processor import VideoProcessor
+    
+    video_processor = VideoProcessor(reporter=ConsoleReporter())
+    
+    # Configurar o caminho de saída (arquivo SRT)
+    if args.output:
+        output_path = os.path.abspath(args.output)
+    else:
+        output_path = os.path.abspath(f"youtube_transcricao_{int(time.time())}.srt")
+    
+    def on_update(cue_count, seconds_done):
+        minutes = int(seconds_done // 60)
+        seconds = int(seconds_done % 60)
+        print_progress(f"Legendas prontas até {minutes}m {seconds}s ({cue_count} frases)")
+    
+    try:
+        print(f"Transcrevendo enquanto baixa o áudio do YouTube: {args.url}")
+        print(f"Usando modelo Whisper: {args.model}")
+        print(f"As legendas parciais são gravadas em: {output_path}")
+        
+        start_time = time.time()
+        
+        video_processor.stream_youtube_transcription(
+            args.url, output_path, model=args.model,
+            concurrent_fragments=args.fragments, on_update=on_update
+        )
+        
+        elapsed_time = time.time() - start_time
+        minutes = int(elapsed_time // 60)
+        seconds = int(elapsed_time % 60)
+        
+        print(f"\nTranscrição concluída em {minutes}m {seconds}s!")
+        print(f"Arquivo de legendas salvo em: {output_path}")
+        return True
+    
+    except Exception as e:
+        print(f"\nErro ao transcrever vídeo do YouTube: {str(e)}")
+        return False
+
+
 def download_youtube(args):
     """Baixar vídeo do YouTube."""
-    video_processor = VideoProcessor()
+    if args.stream:
+        return stream_youtube_transcription(args)
     
     # Configurar o caminho de saída
     if args.output:
@@ -158,17 +383,34 @@ def download_youtube(args):
     os.makedirs(output_dir, exist_ok=True)
     
     try:
-        print(f"Baixando vídeo do YouTube: {args.url}")
+        if args.audio_only:
+            print(f"Baixando apenas o áudio do YouTube: {args.url}")
+        else:
+            print(f"Baixando vídeo do YouTube: {args.url}")
+        
+        # Baixar o vídeo (ou apenas o melhor fluxo de áudio, sem o vídeo)
+        downloaded_path = run_job(args, 'youtube', {
+            'url': args.url,
+            'output_dir': output_dir,
+            'quality': args.quality,
+            'audio_only': args.audio_only,
+            'fragments': args.fragments
+        })['media_path']
         
-        # Baixar o vídeo
-        downloaded_path = video_processor.download_youtube_video(args.url, output_dir)
+        # O áudio mantém o formato do fluxo baixado (m4a, webm...): de --output vale só o nome
+        if args.output and args.audio_only:
+            extension = os.path.splitext(downloaded_path)[1]
+            if os.path.splitext(output_path)[1].lower() != extension.lower():
+                output_path = os.path.splitext(output_path)[0] + extension
+                print(f"O áudio foi baixado em formato {extension.lstrip('.')}; a extensão de --output foi trocada: {output_path}")
         
-        # Se um caminho de saída específico foi fornecido, copie o arquivo
+        # Se um caminho de saída específico foi fornecido, crie-o sem copiar os bytes
+        # quando o sistema de arquivos permitir (reflink; veja artifact_store.py)
         if args.output and downloaded_path != output_path:
-            shutil.copy2(downloaded_path, output_path)
-            downloaded_path = output_path
+            from artifact_store import materialize
+            downloaded_path = materialize(downloaded_path, output_path, allow_hardlink=False)
         
-        print(f"\nVídeo baixado com sucesso: {downloaded_path}")
+        print(f"\n{'Áudio' if args.audio_only else 'Vídeo'} baixado com sucesso: {downloaded_path}")
         
         # Transcrever o vídeo se solicitado
         if args.transcribe:
@@ -178,7 +420,12 @@ def download_youtube(args):
             transcribe_args = argparse.Namespace()
             transcribe_args.input = downloaded_path
             transcribe_args.output = os.path.splitext(downloaded_path)[0] + ".srt"
-            transcribe_args.model = "tiny"
+            transcribe_args.model = args.model
+            transcribe_args.force_asr = False
+            transcribe_args.vad = False
+            transcribe_args.progressive = False
+            transcribe_args.draft_only = False
+            transcribe_args.no_daemon = args.no_daemon
             
             # Chamar a função de transcrição
             transcribe_video(transcribe_args)
@@ -190,6 +437,66 @@ def download_youtube(args):
         return False
 
 
+def process_playlist(args):
+    """Baixar (e transcrever) todos os vídeos de uma playlist ou canal."""
+    from video_processor import VideoProcessor
+    
+    output_dir = os.path.abspath(args.output)
+    os.makedirs(output_dir, exist_ok=True)
+    
+    # Itens rodam em paralelo: em vez das mensagens de cada download, um resumo por item
+    video_processor = VideoProcessor()
+    status_labels = {
+        'cached': 'cache',
+        'downloaded': 'baixado',
+        'transcribed': 'transcrito',
+        'failed': 'falhou',
+        None: '-'
+    }
+    
+    def on_item_done(item):
+        state = 'ERRO' if item['error'] else 'OK'
+        print(f"  [{state}] {item['index']:>3}. {item['title']} ({item['seconds']:.0f}s)")
+    
+    try:
+        print(f"Listando vídeos de: {args.url}")
+        start_time = time.time()
+        
+        items = video_processor.process_youtube_playlist(
+            args.url, output_dir,
+            quality=args.quality,
+            audio_only=args.audio_only,
+            transcribe=args.transcribe,
+            model=args.model,
+            download_workers=args.download_workers,
+            transcribe_workers=args.transcribe_workers,
+            concurrent_fragments=args.fragments,
+            on_item_done=on_item_done
+        )
+        
+        elapsed_time = time.time() - start_time
+        minutes = int(elapsed_time // 60)
+        seconds = int(elapsed_time % 60)
+        
+        # Resumo por item
+        print(f"\n{'#':>4}  {'Download':<10}{'Transcrição':<13}Título")
+        for item in items:
+            print(f"{item['index']:>4}  {status_labels[item['downloaded']]:<10}"
+                  f"{status_labels[item['transcribed']]:<13}{item['title']}")
+            if item['error']:
+                print(f"      Erro: {item['error']}")
+        
+        failed = [item for item in items if item['error']]
+        print(f"\n{len(items) - len(failed)} de {len(items)} itens concluídos em {minutes}m {seconds}s")
+        print(f"Arquivos salvos em: {output_dir}")
+        
+        return not failed
+    
+    except Exception as e:
+        print(f"\nErro ao processar playlist: {str(e)}")
+        return False
+
+
 def split_video(args):
     """Dividir vídeo em partes."""
     input_path = os.path.abspath(args.input)
@@ -209,10 +516,8 @@ def split_video(args):
     os.makedirs(output_dir, exist_ok=True)
     
     try:
-        video_processor = VideoProcessor()
-        
         # Obter a duração do vídeo
-        duration = video_processor.get_video_duration(input_path)
+        duration = run_job(args, 'probe', {'input': input_path})['duration']
         min_duration = int(duration // 60)
         sec_duration = int(duration % 60)
         
@@ -235,9 +540,10 @@ def split_video(args):
             print(f"Cada parte terá aproximadamente {part_min}m {part_sec}s")
             
             # Dividir o vídeo
-            segments = video_processor.split_video_equal_parts(
-                input_path, subtitle_path, num_parts, output_dir
-            )
+            segments = run_job(args, 'split', {
+                'input': input_path, 'subtitle': subtitle_path, 'output': output_dir,
+                'parts': num_parts, 'encoder': args.encoder
+            })['segments']
             
         elif args.timestamps:
             # Modo: timestamps personalizados
@@ -256,9 +562,10 @@ def split_video(args):
             print(f"Dividindo vídeo em {len(timestamps) + 1} segmentos nos pontos: {', '.join([str(ts) for ts in timestamps])} segundos...")
             
             # Dividir o vídeo
-            segments = video_processor.split_video_custom_timestamps(
-                input_path, subtitle_path, timestamps, output_dir
-            )
+            segments = run_job(args, 'split', {
+                'input': input_path, 'subtitle': subtitle_path, 'output': output_dir,
+                'timestamps': timestamps, 'encoder': args.encoder
+            })['segments']
             
         else:
             print("Erro: Você deve especificar --parts OU --timestamps")
@@ -310,18 +617,20 @@ def embed_subtitles(args):
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
     
     try:
-        video_processor = VideoProcessor()
-        
         print(f"Incorporando legendas no vídeo...")
         print(f"  Vídeo: {os.path.basename(input_path)}")
         print(f"  Legendas: {os.path.basename(subtitle_path)}")
+        print(f"  Modo: {args.mode}")
         print(f"Este processo pode levar alguns minutos...")
         
         # Iniciar temporizador
         start_time = time.time()
         
         # Incorporar as legendas
-        result_path = video_processor.embed_subtitles(input_path, subtitle_path, output_path)
+        result_path = run_job(args, 'embed', {
+            'input': input_path, 'subtitle': subtitle_path, 'output': output_path,
+            'mode': args.mode, 'workers': args.workers, 'encoder': args.encoder
+        })['output_path']
         
         # Mostrar tempo decorrido
         elapsed_time = time.time() - start_time
@@ -338,6 +647,348 @@ def embed_subtitles(args):
         return False
 
 
+def benchmark(args):
+    """Comparar velocidade e tamanho de saída dos codificadores de vídeo."""
+    from encoder_profiles import benchmark_encoders, recommend_encoder
+    
+    input_path = os.path.abspath(args.input)
+    
+    if not os.path.exists(input_path):
+        print(f"Erro: Arquivo de vídeo '{input_path}' não encontrado.")
+        return False
+    
+    if args.io:
+        return benchmark_io(args, input_path)
+    if args.vad:
+        return benchmark_vad(args, input_path)
+    
+    try:
+        print(f"Codificando {args.seconds:g}s de {os.path.basename(input_path)} com cada codificador (qualidade {args.quality})...")
+        
+        results = benchmark_encoders(input_path, quality=args.quality, sample_seconds=args.seconds)
+        
+        if not results:
+            print("Nenhum codificador suportado encontrado no ffmpeg.")
+            return False
+        
+        print(f"\n{'Codificador':<14}{'FPS':>10}{'Tempo':>10}{'Tamanho':>14}")
+        for result in results:
+            if result['error']:
+                print(f"{result['encoder']:<14}{'falhou':>10}  {result['error']}")
+                continue
+            size_mb = result['size_bytes'] / (1024 * 1024)
+            print(f"{result['encoder']:<14}{result['fps']:>10.1f}{result['seconds']:>9.1f}s{size_mb:>11.2f} MB")
+        
+        best = recommend_encoder(results, target=args.target)
+        if best is None:
+            print("\nNenhum codificador concluiu o teste.")
+            return False
+        
+        print(f"\nRecomendado para '{args.target}': {best['encoder']}")
+        print(f"Para usá-lo por padrão, adicione ao arquivo .env: VIDEO_ENCODER={best['encoder']}")
+        return True
+    
+    except Exception as e:
+        print(f"\nErro ao executar benchmark: {str(e)}")
+        return False
+
+
+def benchmark_io(args, input_path):
+    """Comparar arquivos intermediários no rascunho em RAM e no disco."""
+    from scratch import benchmark_scratch, default_scratch_root
+    from subtitle_processor import SubtitleProcessor
+    
+    disk_dir = os.path.abspath(args.io_dir or os.path.dirname(input_path))
+    
+    try:
+        if not default_scratch_root():
+            print("Nenhum rascunho em RAM disponível (defina VIDEO_SCRATCH_DIR, por exemplo /dev/shm); medindo só o disco.")
+        
+        print(f"Extraindo o áudio de {args.seconds:g}s de {os.path.basename(input_path)} em cada local...")
+        results = benchmark_scratch(
+            input_path, disk_dir, SubtitleProcessor.AUDIO_EXTRACTION_ARGS, sample_seconds=args.seconds
+        )
+        
+        print(f"\n{'Local':<8}{'Extração':>10}{'Gravação':>10}{'Leitura':>10}{'Tamanho':>12}  Pasta")
+        for result in results:
+            if result['error']:
+                print(f"{result['location']:<8}{'falhou':>10}  {result['error']}")
+                continue
+            size_mb = result['size_bytes'] / (1024 * 1024)
+            print(f"{result['location']:<8}{result['extract_seconds']:>9.2f}s{result['write_seconds']:>9.2f}s"
+                  f"{result['read_seconds']:>9.2f}s{size_mb:>9.1f} MB  {result['path']}")
+        
+        timings = {
+            result['location']: result['extract_seconds'] + result['write_seconds'] + result['read_seconds']
+            for result in results if not result['error']
+        }
+        if 'ram' in timings and 'disco' in timings:
+            print(f"\nEconomia com o rascunho em RAM: {timings['disco'] - timings['ram']:.2f}s "
+                  f"por {args.seconds:g}s de vídeo")
+        return bool(timings)
+    
+    except Exception as e:
+        print(f"\nErro ao executar benchmark: {str(e)}")
+        return False
+
+
+def benchmark_vad(args, input_path):
+    """Medir o áudio sem fala removido pela detecção de voz (e o tempo de transcrição poupado)."""
+    import vad
+    from subtitle_processor import SubtitleProcessor
+    
+    if os.path.isdir(input_path):
+        video_paths = [
+            os.path.join(input_path, name) for name in sorted(os.listdir(input_path))
+            if os.path.splitext(name)[1].lower() in ('.mp4', '.mkv', '.mov', '.avi', '.webm', '.m4a', '.mp3', '.wav')
+        ]
+    else:
+        video_paths = [input_path]
+    
+    transcribe = None
+    if args.model:
+        # Sem cache de transcrições, para medir o Whisper de verdade nas duas rodadas
+        subtitle_processor = SubtitleProcessor(transcription_cache=False)
+        work_dir = tempfile.mkdtemp(prefix="vad_benchmark_output_")
+        
+        def transcribe(video_path, use_vad):
+            subtitle_processor.transcribe_video(
+                video_path, os.path.join(work_dir, "legendas.srt"), model=args.model,
+                raise_on_error=True, force_asr=True, vad=use_vad
+            )
+    
+    try:
+        print(f"Analisando {len(video_paths)} arquivo(s)" + (f", transcrevendo com o modelo {args.model}" if args.model else "") + "...")
+        results = vad.benchmark_vad(video_paths, SubtitleProcessor.AUDIO_EXTRACTION_ARGS, transcribe=transcribe)
+        
+        print(f"\n{'Arquivo':<30}{'Duração':>10}{'Fala':>10}{'Sem fala':>10}{'Detecção':>10}{'Whisper':>10}{'Com VAD':>10}")
+        total_duration = total_speech = 0.0
+        for result in results:
+            name = os.path.basename(result['path'])[:29]
+            if result['error']:
+                print(f"{name:<30}{'falhou':>10}  {result['error']}")
+                continue
+            total_duration += result['duration']
+            total_speech += result['speech_seconds']
+            silent_percent = 100 * (1 - result['speech_seconds'] / result['duration']) if result['duration'] else 0
+            asr = f"{result['asr_seconds']:.1f}s" if result['asr_seconds'] is not None else "-"
+            vad_asr = f"{result['vad_asr_seconds']:.1f}s" if result['vad_asr_seconds'] is not None else "-"
+            print(f"{name:<30}{result['duration']:>9.0f}s{result['speech_seconds']:>9.0f}s{silent_percent:>9.0f}%"
+                  f"{result['detect_seconds']:>9.2f}s{asr:>10}{vad_asr:>10}")
+        
+        if total_duration:
+            print(f"\nÁudio enviado ao Whisper: {total_speech:.0f}s de {total_duration:.0f}s "
+                  f"({100 * (1 - total_speech / total_duration):.0f}% a menos)")
+        return total_duration > 0
+    
+    except Exception as e:
+        print(f"\nErro ao executar benchmark: {str(e)}")
+        return False
+    finally:
+        if args.model:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def run_daemon(args):
+    """Iniciar, parar ou consultar o daemon local."""
+    import daemon_server
+    
+    socket_path = args.socket or daemon_server.default_socket_path()
+    
+    try:
+        if args.action == 'start':
+            print(f"Daemon escutando em: {socket_path}")
+            print("Os comandos transcribe, youtube, split e embed passam a usar o daemon. Ctrl+C para encerrar.")
+            try:
+                daemon_server.serve(socket_path, max_jobs=args.max_jobs)
+            except KeyboardInterrupt:
+                pass
+            print("\nDaemon encerrado.")
+            return True
+        
+        if not daemon_server.is_running(socket_path):
+            print(f"Nenhum daemon em execução em: {socket_path}")
+            return args.action == 'stop'
+        
+        if args.action == 'stop':
+            daemon_server.send_request('shutdown', socket_path=socket_path)
+            print("Daemon encerrado.")
+            return True
+        
+        state = daemon_server.send_request('ping', socket_path=socket_path)
+        uptime = int(state['uptime'])
+        print(f"Daemon em execução (PID {state['pid']}) há {uptime // 60}m {uptime % 60}s")
+        print(f"  Tarefas em execução: {state['running_jobs']} (máximo {state['max_jobs']})")
+        print(f"  Tarefas concluídas: {state['completed_jobs']}")
+        print(f"  Modelos Whisper carregados: {', '.join(state['whisper_models']) or 'nenhum'}")
+        
+        memory = state.get('memory') or {}
+        if memory.get('process_bytes'):
+            print(f"  Memória do processo: {memory['process_bytes'] / (1024 * 1024):.1f} MB")
+        for name, cache in sorted((memory.get('caches') or {}).items()):
+            size = f", {cache['bytes'] / (1024 * 1024):.1f} MB" if cache.get('bytes') is not None else ""
+            print(f"  Cache {name}: {cache['entries']} itens{size}")
+        return True
+    
+    except Exception as e:
+        print(f"\nErro no daemon: {str(e)}")
+        return False
+
+
+def serve_api(args):
+    """Iniciar a API HTTP JSON."""
+    import api_server
+    
+    try:
+        server = api_server.create_server(args.host, args.port, root_dir=args.dir, max_workers=args.workers)
+    except Exception as e:
+        print(f"\nErro ao iniciar a API: {str(e)}")
+        return False
+    
+    host, port = server.server_address[:2]
+    print(f"API escutando em http://{host}:{port} (arquivos em {server.root_dir}). Ctrl+C para encerrar.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.queue.shutdown()
+    
+    print("\nAPI encerrada.")
+    return True
+
+
+def load_test(args):
+    """Medir latência e vazão da API HTTP com várias tarefas simultâneas."""
+    import api_server
+    
+    input_path = os.path.abspath(args.input)
+    if not os.path.exists(input_path):
+        print(f"Erro: Arquivo de entrada '{input_path}' não encontrado.")
+        return False
+    
+    server = None
+    try:
+        base_url = args.url
+        if not base_url:
+            # API local temporária, em uma porta livre
+            server, base_url = api_server.serve_in_background(
+                port=0, root_dir=tempfile.mkdtemp(prefix="videotranscricao_loadtest_"), max_workers=args.workers
+            )
+        
+        print(f"Enviando {args.jobs} tarefas '{args.type}' para {base_url} ({args.concurrency} clientes)...")
+        report = api_server.run_load_test(
+            base_url, input_path, job_type=args.type, jobs=args.jobs, concurrency=args.concurrency
+        )
+        
+        print(f"\nTarefas: {report['jobs']} ({report['errors']} com erro) em {report['seconds']:.2f}s "
+              f"({report['jobs_per_second']:.2f} tarefas/s)")
+        print(f"{'Latência':<12}{'p50':>10}{'p95':>10}{'máx':>10}")
+        for key, label in (('submit', 'envio'), ('complete', 'conclusão')):
+            stats = report[key]
+            print(f"{label:<12}{stats['p50'] * 1000:>8.0f}ms{stats['p95'] * 1000:>8.0f}ms{stats['max'] * 1000:>8.0f}ms")
+        
+        return report['errors'] == 0
+    
+    except Exception as e:
+        print(f"\nErro no teste de carga: {str(e)}")
+        return False
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+            server.queue.shutdown()
+            shutil.rmtree(server.root_dir, ignore_errors=True)
+
+
+def measure_startup(cli_args, runs=5):
+    """Medir o tempo de inicialização da CLI com python -X importtime.
+    
+    Args:
+        cli_args (list): Argumentos passados para a CLI (ex.: ['split', '--help']).
+        runs (int): Número de execuções; a mediana é usada.
+        
+    Returns:
+        dict: 'seconds' (mediana do tempo total), 'runs' (tempos de cada execução),
+            'imports' (módulos de primeiro nível como (segundos acumulados, nome),
+            do mais lento ao mais rápido) e 'heavy' (módulos pesados carregados).
+            
+    Raises:
+        Exception: Se a CLI terminar com erro.
+    """
+    import subprocess
+    
+    cmd = [sys.executable, "-X", "importtime", os.path.abspath(__file__)] + list(cli_args)
+    timings = []
+    stderr = ""
+    for _ in range(max(1, runs)):
+        start_time = time.perf_counter()
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        timings.append(time.perf_counter() - start_time)
+        stderr = result.stderr
+        
+        # Uma CLI que quebra ao importar também "inicia rápido": isso é uma falha
+        if result.returncode != 0:
+            errors = [line for line in stderr.splitlines() if not line.startswith("import time:")]
+            raise Exception(
+                f"'cli.py {' '.join(cli_args)}' terminou com código {result.returncode}: "
+                + "\n".join(errors[-10:])
+            )
+    
+    # Linhas no formato "import time: self [us] | cumulative | imported package";
+    # módulos importados por outros aparecem indentados
+    imports = []
+    loaded = set()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name = parts[2].rstrip()
+        module = name.strip()
+        loaded.add(module.split(".")[0])
+        if len(name) - len(name.lstrip()) == 1:
+            imports.append((int(parts[1]) / 1e6, module))
+    
+    imports.sort(reverse=True)
+    ordered = sorted(timings)
+    return {
+        'seconds': ordered[len(ordered) // 2],
+        'runs': timings,
+        'imports': imports,
+        'heavy': [module for module in HEAVY_MODULES if module in loaded]
+    }
+
+
+def startup(args):
+    """Verificar se a CLI inicia dentro do tempo máximo."""
+    cli_args = [args.subcommand, '--help'] if args.subcommand else ['--help']
+    print(f"Medindo 'cli.py {' '.join(cli_args)}' ({args.runs} execuções)...")
+    
+    try:
+        report = measure_startup(cli_args, runs=args.runs)
+    except Exception as e:
+        print(f"\nErro ao medir a inicialização: {str(e)}")
+        return False
+    
+    print(f"\nMódulos mais lentos:")
+    for seconds, module in report['imports'][:10]:
+        print(f"  {seconds * 1000:>8.1f} ms  {module}")
+    
+    print(f"\nTempo de inicialização (mediana): {report['seconds'] * 1000:.0f} ms "
+          f"(limite: {args.budget * 1000:.0f} ms)")
+    
+    success = report['seconds'] <= args.budget
+    if report['heavy']:
+        print(f"Módulos pesados carregados na inicialização: {', '.join(report['heavy'])}")
+        success = False
+    
+    print("✅ Dentro do limite" if success else "❌ Acima do limite")
+    return success
+
+
 def main():
     """Função principal da CLI."""
     parser = setup_parser()
@@ -354,10 +1005,22 @@ def main():
         success = transcribe_video(args)
     elif args.command == 'youtube':
         success = download_youtube(args)
+    elif args.command == 'playlist':
+        success = process_playlist(args)
     elif args.command == 'split':
         success = split_video(args)
     elif args.command == 'embed':
         success = embed_subtitles(args)
+    elif args.command == 'benchmark':
+        success = benchmark(args)
+    elif args.command == 'daemon':
+        success = run_daemon(args)
+    elif args.command == 'serve':
+        success = serve_api(args)
+    elif args.command == 'loadtest':
+        success = load_test(args)
+    elif args.command == 'startup':
+        success = startup(args)
     
     return 0 if success else 1
 
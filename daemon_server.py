@@ -0,0 +1,280 @@
+"""
+Daemon local que executa tarefas recebidas por um socket Unix.
+
+Mantém o Python, os módulos importados, os modelos Whisper, os caches de
+metadados e de duração e os processadores compartilhados carregados entre
+execuções, de modo que comandos repetidos da CLI pagam apenas pelo
+processamento e não pela inicialização. Não há um conjunto de workers à
+espera: cada conexão é atendida em uma thread própria (ThreadingMixIn), e um
+semáforo limita quantas tarefas rodam ao mesmo tempo (max_jobs); o trabalho do
+ffmpeg e do yt-dlp é feito por subprocessos iniciados a cada tarefa.
+
+Protocolo (uma linha JSON por mensagem):
+    cliente -> daemon: {"type": "transcribe", "params": {...}}
+    daemon -> cliente: zero ou mais eventos de progresso, por exemplo
+        {"event": "message", "level": "info", "message": "..."}
+        {"event": "status", "id": 1, "message": "..."}
+        {"event": "progress", "id": 2, "value": 40}
+    seguidos de {"event": "result", "result": {...}} ou {"event": "error", "error": "..."}
+
+Além dos tipos de jobs.JOB_HANDLERS, o daemon aceita "ping" (estado do daemon)
+e "shutdown".
+"""
+import os
+import json
+import stat
+import time
+import socket
+import tempfile
+import threading
+import socketserver
+
+from progress import ProgressReporter, EventReporter, replay_event
+
+# Tarefas executadas ao mesmo tempo pelo daemon
+DEFAULT_MAX_JOBS = 2
+
+
+def default_socket_dir():
+    """Get the per-user directory for the daemon socket.
+
+    Returns:
+        str: XDG_RUNTIME_DIR when set (a 0700 directory owned by the user),
+            or a videotranscricao-<uid> directory in the temporary directory,
+            which serve() creates with mode 0700.
+    """
+    runtime_dir = os.getenv("XDG_RUNTIME_DIR")
+    if runtime_dir and os.path.isdir(runtime_dir):
+        return runtime_dir
+    return os.path.join(tempfile.gettempdir(), f"videotranscricao-{os.getuid()}")
+
+
+def default_socket_path():
+    """Get the daemon socket path.
+
+    Returns:
+        str: VIDEOTRANSCRICAO_SOCKET from the environment, or
+            videotranscricao.sock in default_socket_dir().
+    """
+    return os.getenv(
+        "VIDEOTRANSCRICAO_SOCKET",
+        os.path.join(default_socket_dir(), "videotranscricao.sock")
+    )
+
+
+def _trusted_directory(directory):
+    """Check that only this user (or root) can create or replace files in a directory."""
+    try:
+        dir_stat = os.stat(directory)
+    except OSError:
+        return False
+    if dir_stat.st_uid not in (os.getuid(), 0):
+        return False
+    # Others may write to it only if the sticky bit keeps them from replacing our files
+    return not (dir_stat.st_mode & 0o022) or bool(dir_stat.st_mode & stat.S_ISVTX)
+
+
+def is_trusted_socket(socket_path):
+    """Check that a socket was created by this user in a directory others can't tamper with.
+
+    Another local user could otherwise create the socket first and receive
+    (or answer with forged results) every job sent by the CLI.
+    """
+    try:
+        socket_stat = os.lstat(socket_path)
+    except OSError:
+        return False
+    return (
+        stat.S_ISSOCK(socket_stat.st_mode)
+        and socket_stat.st_uid == os.getuid()
+        and _trusted_directory(os.path.dirname(os.path.abspath(socket_path)))
+    )
+
+
+def _send(wfile, lock, message):
+    """Write one JSON message line."""
+    data = (json.dumps(message, ensure_ascii=False) + "\n").encode('utf-8')
+    with lock:
+        wfile.write(data)
+        wfile.flush()
+
+
+def _socket_reporter(wfile, lock):
+    """Get a reporter that forwards a job's progress events to the client."""
+    def send(event):
+        try:
+            _send(wfile, lock, event)
+        except OSError:
+            # The client went away; the job still runs to completion
+            pass
+
+    return EventReporter(send)
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Handle one request: read it, run it, stream events and the result."""
+
+    def handle(self):
+        reporter = _socket_reporter(self.wfile, threading.Lock())
+        try:
+            request = json.loads(self.rfile.readline().decode('utf-8'))
+            request_type = request.get('type')
+            params = request.get('params') or {}
+
+            if request_type == 'ping':
+                result = self.server.describe()
+            elif request_type == 'shutdown':
+                result = {'stopping': True}
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+            else:
+                with self.server.job_slots:
+                    self.server.count_job(1)
+                    try:
+                        result = self.server.runner.run(request_type, params, reporter=reporter)
+                    finally:
+                        self.server.count_job(-1)
+
+            reporter.emit({'event': 'result', 'result': result})
+        except Exception as e:
+            reporter.emit({'event': 'error', 'error': str(e)})
+
+
+class DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Unix socket server running jobs with a long-lived JobRunner.
+
+    Each connection gets its own thread; job_slots limits how many of them
+    run a job at the same time.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, socket_path, runner, max_jobs=DEFAULT_MAX_JOBS):
+        """Initialize the server.
+
+        Args:
+            socket_path (str): Path of the Unix socket.
+            runner (jobs.JobRunner): Runner shared by every request.
+            max_jobs (int): Jobs executed at the same time; others wait.
+        """
+        super().__init__(socket_path, _RequestHandler)
+        self.runner = runner
+        self.job_slots = threading.BoundedSemaphore(max(1, max_jobs))
+        self.max_jobs = max(1, max_jobs)
+        self.started = time.time()
+        self._jobs_lock = threading.Lock()
+        self.running_jobs = 0
+        self.completed_jobs = 0
+
+    def count_job(self, delta):
+        """Track running and completed jobs."""
+        with self._jobs_lock:
+            self.running_jobs += delta
+            if delta < 0:
+                self.completed_jobs += 1
+
+    def describe(self):
+        """Get the daemon state, as returned by the 'ping' request."""
+        from subtitle_processor import loaded_whisper_models
+        from resources import memory_report
+
+        with self._jobs_lock:
+            return {
+                'pid': os.getpid(),
+                'uptime': time.time() - self.started,
+                'max_jobs': self.max_jobs,
+                'running_jobs': self.running_jobs,
+                'completed_jobs': self.completed_jobs,
+                'whisper_models': loaded_whisper_models(),
+                'memory': memory_report()
+            }
+
+
+def serve(socket_path=None, max_jobs=DEFAULT_MAX_JOBS, persistent_models=True):
+    """Run the daemon in the foreground until a 'shutdown' request arrives.
+
+    Args:
+        socket_path (str, optional): Path of the Unix socket. Defaults to default_socket_path().
+        max_jobs (int): Jobs executed at the same time.
+        persistent_models (bool): Keep Whisper models loaded between jobs.
+    """
+    from jobs import JobRunner
+
+    socket_path = socket_path or default_socket_path()
+    socket_dir = os.path.dirname(os.path.abspath(socket_path))
+    os.makedirs(socket_dir, mode=0o700, exist_ok=True)
+    if not _trusted_directory(socket_dir):
+        raise Exception(f"A pasta do socket não é segura (pertence a outro usuário ou pode ser alterada por outros): {socket_dir}")
+
+    if os.path.lexists(socket_path):
+        if not is_trusted_socket(socket_path):
+            raise Exception(f"{socket_path} já existe e não é um socket deste usuário; remova-o manualmente")
+        if is_running(socket_path):
+            raise Exception(f"O daemon já está em execução em {socket_path}")
+        # Left behind by a daemon that didn't shut down cleanly
+        os.remove(socket_path)
+
+    server = DaemonServer(socket_path, JobRunner(persistent_models=persistent_models), max_jobs=max_jobs)
+    try:
+        # Only the owner may submit jobs
+        os.chmod(socket_path, 0o600)
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+
+
+def is_running(socket_path=None):
+    """Check whether a daemon of this user is accepting connections on the socket.
+
+    Sockets that fail is_trusted_socket() are never connected to.
+    """
+    socket_path = socket_path or default_socket_path()
+    if not is_trusted_socket(socket_path):
+        return False
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.settimeout(1)
+            client.connect(socket_path)
+        return True
+    except OSError:
+        return False
+
+
+def send_request(request_type, params=None, reporter=None, socket_path=None):
+    """Send a request to the daemon and wait for its result.
+
+    Args:
+        request_type (str): Job type, 'ping' or 'shutdown'.
+        params (dict, optional): Job parameters.
+        reporter (ProgressReporter, optional): Receives the job's progress events.
+        socket_path (str, optional): Path of the Unix socket. Defaults to default_socket_path().
+
+    Returns:
+        dict: The result.
+    """
+    reporter = reporter or ProgressReporter()
+    handles = {}
+
+    socket_path = socket_path or default_socket_path()
+    if not is_trusted_socket(socket_path):
+        raise Exception(f"O socket {socket_path} não pertence a este usuário; a tarefa não foi enviada")
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(socket_path)
+        request = json.dumps({'type': request_type, 'params': params or {}}) + "\n"
+        client.sendall(request.encode('utf-8'))
+
+        with client.makefile('r', encoding='utf-8') as responses:
+            for line in responses:
+                message = json.loads(line)
+                event = message.get('event')
+
+                if event == 'result':
+                    return message.get('result')
+                if event == 'error':
+                    raise Exception(message.get('error'))
+                replay_event(message, reporter, handles)
+
+    raise Exception("A conexão com o daemon foi encerrada antes do resultado")
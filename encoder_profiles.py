@@ -0,0 +1,204 @@
+"""
+Perfis de codificação de vídeo usados pelo ffmpeg.
+
+Centraliza os argumentos de cada codificador (libx264, libx265, libsvtav1,
+libvpx-vp9) para os presets de qualidade 'low', 'medium' e 'high', e oferece
+um benchmark para medir velocidade e tamanho de arquivo de cada perfil na
+máquina atual.
+"""
+import os
+import re
+import time
+import shutil
+import tempfile
+import functools
+import subprocess
+
+# Argumentos de vídeo por codificador e preset de qualidade
+ENCODER_PROFILES = {
+    'libx264': {
+        'low': ["-preset", "ultrafast", "-crf", "28"],
+        'medium': ["-preset", "medium", "-crf", "23"],
+        'high': ["-preset", "slow", "-crf", "18", "-profile:v", "high"],
+    },
+    'libx265': {
+        'low': ["-preset", "ultrafast", "-crf", "30", "-tag:v", "hvc1"],
+        'medium': ["-preset", "medium", "-crf", "28", "-tag:v", "hvc1"],
+        'high': ["-preset", "slow", "-crf", "22", "-tag:v", "hvc1"],
+    },
+    'libsvtav1': {
+        'low': ["-preset", "12", "-crf", "40"],
+        'medium': ["-preset", "8", "-crf", "35"],
+        'high': ["-preset", "5", "-crf", "30"],
+    },
+    'libvpx-vp9': {
+        'low': ["-deadline", "realtime", "-cpu-used", "8", "-crf", "40", "-b:v", "0", "-row-mt", "1"],
+        'medium': ["-deadline", "good", "-cpu-used", "4", "-crf", "33", "-b:v", "0", "-row-mt", "1"],
+        'high': ["-deadline", "good", "-cpu-used", "1", "-crf", "28", "-b:v", "0", "-row-mt", "1"],
+    },
+}
+
+# Argumentos de áudio por preset de qualidade (iguais para todos os codificadores)
+AUDIO_PROFILES = {
+    'low': ["-c:a", "aac", "-b:a", "128k"],
+    'medium': ["-c:a", "aac", "-b:a", "160k"],
+    'high': ["-c:a", "aac", "-b:a", "192k"],
+}
+
+DEFAULT_ENCODER = 'libx264'
+
+
+def get_default_encoder():
+    """Get the encoder configured in the VIDEO_ENCODER environment variable.
+
+    Returns:
+        str: Encoder name, falling back to libx264 for unknown values.
+    """
+    encoder = os.getenv("VIDEO_ENCODER", DEFAULT_ENCODER)
+    return encoder if encoder in ENCODER_PROFILES else DEFAULT_ENCODER
+
+
+def _thread_args(encoder, threads):
+    """Get the arguments that limit the number of threads of an encoder."""
+    if not threads:
+        return []
+    if encoder == 'libsvtav1':
+        # SVT-AV1 ignores -threads; the logical processor count is set via its own params
+        return ["-svtav1-params", f"lp={threads}"]
+    return ["-threads", str(threads)]
+
+
+def get_encoder_args(quality="medium", encoder=None, threads=None):
+    """Get the ffmpeg codec arguments for an encoder and quality preset.
+
+    Args:
+        quality (str): Quality preset ('low', 'medium', 'high').
+        encoder (str, optional): Encoder name. Defaults to get_default_encoder().
+        threads (int, optional): Number of encoder threads. Defaults to ffmpeg's choice.
+
+    Returns:
+        tuple: (video_codec, audio_codec) argument lists.
+    """
+    encoder = encoder or get_default_encoder()
+    if encoder not in ENCODER_PROFILES:
+        raise Exception(f"Codificador desconhecido: {encoder}")
+
+    presets = ENCODER_PROFILES[encoder]
+    if quality not in presets:
+        quality = 'medium'
+
+    video_codec = ["-c:v", encoder] + presets[quality] + _thread_args(encoder, threads)
+    audio_codec = list(AUDIO_PROFILES[quality])
+
+    return video_codec, audio_codec
+
+
+@functools.lru_cache(maxsize=1)
+def list_available_encoders():
+    """Get the registered encoders supported by the local ffmpeg build.
+
+    Returns:
+        list: Encoder names, in registry order.
+    """
+    result = subprocess.run(["ffmpeg", "-hide_banner", "-encoders"], capture_output=True, text=True)
+
+    if result.returncode != 0:
+        raise Exception(f"Erro ao listar codificadores do ffmpeg: {result.stderr}")
+
+    available = set()
+    for line in result.stdout.splitlines():
+        parts = line.split()
+        if len(parts) >= 2 and parts[0].startswith('V'):
+            available.add(parts[1])
+
+    return [encoder for encoder in ENCODER_PROFILES if encoder in available]
+
+
+def benchmark_encoders(video_path, encoders=None, quality="medium", sample_seconds=10, threads=None):
+    """Measure encoding speed and output size of each encoder profile.
+
+    The first sample_seconds of the video are encoded (without audio) once per
+    encoder, so results are comparable across encoders.
+
+    Args:
+        video_path (str): Path to the sample video.
+        encoders (list, optional): Encoders to test. Defaults to all available ones.
+        quality (str): Quality preset to benchmark ('low', 'medium', 'high').
+        sample_seconds (float): Length of the sample to encode.
+        threads (int, optional): Number of encoder threads.
+
+    Returns:
+        list: Dictionaries with 'encoder', 'quality', 'fps', 'seconds',
+            'size_bytes' and 'error' (None on success) for each encoder.
+    """
+    if encoders is None:
+        encoders = list_available_encoders()
+
+    work_dir = tempfile.mkdtemp(prefix="encoder_benchmark_")
+    results = []
+    try:
+        for encoder in encoders:
+            video_codec, _ = get_encoder_args(quality, encoder, threads=threads)
+            output_path = os.path.join(work_dir, f"{encoder}.mp4")
+            ffmpeg_cmd = ["ffmpeg", "-t", str(sample_seconds), "-i", video_path, "-an"]
+            ffmpeg_cmd.extend(video_codec)
+            ffmpeg_cmd.extend(["-y", output_path])
+
+            start_time = time.time()
+            result = subprocess.run(ffmpeg_cmd, capture_output=True, text=True)
+            elapsed = time.time() - start_time
+
+            if result.returncode != 0:
+                results.append({
+                    'encoder': encoder,
+                    'quality': quality,
+                    'fps': 0.0,
+                    'seconds': elapsed,
+                    'size_bytes': 0,
+                    'error': result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "erro desconhecido"
+                })
+                continue
+
+            # ffmpeg reports the number of encoded frames in its progress lines
+            frames = re.findall(r"frame=\s*(\d+)", result.stderr)
+            frame_count = int(frames[-1]) if frames else 0
+
+            results.append({
+                'encoder': encoder,
+                'quality': quality,
+                'fps': frame_count / elapsed if elapsed > 0 else 0.0,
+                'seconds': elapsed,
+                'size_bytes': os.path.getsize(output_path),
+                'error': None
+            })
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return results
+
+
+def recommend_encoder(results, target="balanced"):
+    """Pick the best encoder from benchmark results.
+
+    Args:
+        results (list): Results returned by benchmark_encoders().
+        target (str): Trade-off to optimize ('speed', 'size', 'balanced').
+            - speed: Maior velocidade de codificação (fps)
+            - size: Menor arquivo de saída
+            - balanced: Melhor soma de velocidade e tamanho, ambos normalizados
+
+    Returns:
+        dict: The winning result, or None if no encoder succeeded.
+    """
+    valid = [r for r in results if not r['error'] and r['fps'] > 0 and r['size_bytes'] > 0]
+    if not valid:
+        return None
+
+    if target == "speed":
+        return max(valid, key=lambda r: r['fps'])
+    if target == "size":
+        return min(valid, key=lambda r: r['size_bytes'])
+
+    max_fps = max(r['fps'] for r in valid)
+    min_size = min(r['size_bytes'] for r in valid)
+    return max(valid, key=lambda r: r['fps'] / max_fps + min_size / r['size_bytes'])
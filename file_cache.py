@@ -0,0 +1,232 @@
+"""
+Cache persistente de arquivos em disco, limitado por tamanho (LRU).
+
+Usado para guardar vídeos baixados do YouTube entre execuções, de modo que
+pedidos repetidos para o mesmo vídeo e formato não precisem de um novo download.
+"""
+import os
+import json
+import time
+import hashlib
+import functools
+import threading
+import contextlib
+
+from artifact_store import materialize
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+def default_cache_root():
+    """Get the root directory for persistent caches.
+
+    Returns:
+        str: VIDEO_CACHE_DIR from the environment, or ~/.cache/transcricao_video.
+    """
+    return os.getenv(
+        "VIDEO_CACHE_DIR",
+        os.path.join(os.path.expanduser("~"), ".cache", "transcricao_video")
+    )
+
+
+class FileCache:
+    """Size-bounded LRU cache of files, persisted with a JSON index."""
+
+    INDEX_FILENAME = "index.json"
+    # Travado (flock) durante cada leitura-modificação-escrita do índice, pois a CLI,
+    # o daemon, a API e o Streamlit podem usar a mesma pasta ao mesmo tempo
+    LOCK_FILENAME = ".index.lock"
+
+    def __init__(self, cache_dir, max_bytes):
+        """Initialize the cache.
+
+        Args:
+            cache_dir (str): Directory holding the cached files and the index.
+            max_bytes (int): Total size above which least recently used entries are evicted.
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(cache_dir, self.INDEX_FILENAME)
+        self.lock_path = os.path.join(cache_dir, self.LOCK_FILENAME)
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(*parts):
+        """Build a cache key from any number of values (e.g. extractor, id, format)."""
+        return hashlib.sha256("\0".join(str(part) for part in parts).encode('utf-8')).hexdigest()
+
+    @contextlib.contextmanager
+    def _locked(self):
+        """Hold the index lock, both across threads and across processes."""
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            with open(self.lock_path, 'a') as lock_file:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _load_index(self):
+        """Read the index from disk (empty if missing or unreadable)."""
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self, index):
+        """Write the index atomically, so readers never see a partial file."""
+        temp_path = f"{self.index_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f)
+        os.replace(temp_path, self.index_path)
+
+    def get(self, key):
+        """Get the cached file for a key and mark it as recently used.
+
+        An entry whose file changed since put() (e.g. written through a
+        hardlink) is dropped and counts as a miss.
+
+        Args:
+            key (str): Cache key.
+
+        Returns:
+            str: Path to the cached file, or None on a miss.
+        """
+        with self._locked():
+            index = self._load_index()
+            entry = index.get(key)
+            if not entry:
+                return None
+
+            path = os.path.join(self.cache_dir, entry['filename'])
+            try:
+                stat = os.stat(path)
+            except OSError:
+                stat = None
+            changed = stat is not None and (
+                stat.st_size != entry['size']
+                or stat.st_mtime_ns != entry.get('mtime_ns', stat.st_mtime_ns)
+            )
+            if stat is None or changed:
+                if changed:
+                    os.remove(path)
+                del index[key]
+                self._save_index(index)
+                return None
+
+            entry['last_access'] = time.time()
+            self._save_index(index)
+            return path
+
+    def put(self, key, src_path, metadata=None, allow_hardlink=False):
+        """Store a file in the cache, evicting old entries if needed.
+
+        The file is reflinked into the cache when possible (see
+        artifact_store.materialize()), so caching a download doesn't duplicate
+        its bytes on filesystems that support it.
+
+        Args:
+            key (str): Cache key.
+            src_path (str): File to store.
+            metadata (dict, optional): Extra JSON-serializable information kept in the index.
+            allow_hardlink (bool): Allow a hardlink to src_path. Only safe when
+                src_path is replaced rather than modified in place: an edit
+                would change the cached file too (get() then drops the entry).
+
+        Returns:
+            str: Path to the cached file.
+        """
+        extension = os.path.splitext(src_path)[1]
+        filename = f"{key[:32]}{extension}"
+        cached_path = os.path.join(self.cache_dir, filename)
+
+        with self._locked():
+            materialize(src_path, cached_path, allow_hardlink=allow_hardlink)
+
+            index = self._load_index()
+            now = time.time()
+            stat = os.stat(cached_path)
+            index[key] = {
+                'filename': filename,
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+                'created': now,
+                'last_access': now,
+                'metadata': metadata or {}
+            }
+            self._evict(index, keep_key=key)
+            self._save_index(index)
+
+        return cached_path
+
+    def _evict(self, index, keep_key=None):
+        """Remove least recently used entries until the cache fits in max_bytes."""
+        total = sum(entry['size'] for entry in index.values())
+        for key, entry in sorted(index.items(), key=lambda item: item[1]['last_access']):
+            if total <= self.max_bytes:
+                break
+            if key == keep_key:
+                continue
+            try:
+                os.remove(os.path.join(self.cache_dir, entry['filename']))
+            except OSError:
+                pass
+            total -= entry['size']
+            del index[key]
+
+    def total_bytes(self):
+        """Get the total size of the cached files, in bytes."""
+        with self._locked():
+            return sum(entry['size'] for entry in self._load_index().values())
+
+
+@functools.lru_cache(maxsize=1)
+def get_download_cache():
+    """Get the shared cache for downloaded videos.
+
+    The size limit comes from VIDEO_DOWNLOAD_CACHE_MB (default 10240 MB).
+
+    Returns:
+        FileCache: The download cache.
+    """
+    max_mb = int(os.getenv("VIDEO_DOWNLOAD_CACHE_MB", "10240"))
+    return FileCache(os.path.join(default_cache_root(), "downloads"), max_mb * 1024 * 1024)
+
+
+@functools.lru_cache(maxsize=1)
+def get_segment_cache():
+    """Get the shared cache for video segments cut by the split commands.
+
+    Entries are keyed by the source video's content hash, the segment bounds,
+    the quality and the encoder, so re-splitting with some boundaries moved
+    only re-extracts the segments that changed. The size limit comes from
+    VIDEO_SEGMENT_CACHE_MB (default 4096 MB).
+
+    Returns:
+        FileCache: The segment cache.
+    """
+    max_mb = int(os.getenv("VIDEO_SEGMENT_CACHE_MB", "4096"))
+    return FileCache(os.path.join(default_cache_root(), "segments"), max_mb * 1024 * 1024)
+
+
+@functools.lru_cache(maxsize=1)
+def get_transcription_cache():
+    """Get the shared cache for transcriptions (SRT files).
+
+    Entries are keyed by the video's content hash, the Whisper model and the
+    quality preset, so they are reused across sessions and file names. The
+    size limit comes from VIDEO_TRANSCRIPTION_CACHE_MB (default 512 MB).
+
+    Returns:
+        FileCache: The transcription cache.
+    """
+    max_mb = int(os.getenv("VIDEO_TRANSCRIPTION_CACHE_MB", "512"))
+    return FileCache(os.path.join(default_cache_root(), "transcriptions"), max_mb * 1024 * 1024)
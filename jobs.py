@@ -0,0 +1,320 @@
+"""
+Tarefas (jobs) de processamento descritas por dicionários JSON.
+
+Cada tipo de tarefa (transcribe, split, embed, youtube, probe) recebe um
+dicionário de parâmetros e devolve um dicionário de resultado, ambos
+serializáveis em JSON. A CLI executa as tarefas diretamente ou as envia ao
+daemon (daemon_server.py), que mantém um JobRunner vivo com os modelos e
+caches já carregados. A API HTTP (api_server.py) usa a JobQueue, que executa
+as tarefas em segundo plano e guarda o estado e os eventos de cada uma.
+"""
+import copy
+import time
+import uuid
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+from progress import EventReporter
+from resources import get_video_processor
+
+
+def _require(params, name):
+    """Get a required parameter, failing with a clear message."""
+    value = params.get(name)
+    if value is None or value == "":
+        raise Exception(f"Parâmetro obrigatório ausente: {name}")
+    return value
+
+
+def _with_encoder(video_processor, encoder):
+    """Get a processor using another encoder, leaving the shared one untouched."""
+    if not encoder:
+        return video_processor
+    processor = copy.copy(video_processor)
+    processor.encoder = encoder
+    return processor
+
+
+def _transcribe_job(video_processor, params):
+    """Transcribe 'input' into the SRT file 'output'.
+
+    Subtitles embedded in 'input' (or, with 'sidecar', files next to it) are
+    used instead of Whisper unless 'force_asr' is set. With 'vad', only the
+    stretches with speech are transcribed. With 'progressive', a draft from
+    the tiny model is written to 'output' first and then replaced by the
+    result of 'model'.
+    """
+    subtitle_processor = video_processor.subtitle_processor
+    options = {
+        'model': params.get('model', 'tiny'),
+        'quality_preset': params.get('quality_preset', 'fast'),
+        'force_asr': bool(params.get('force_asr')),
+        'use_sidecar': bool(params.get('sidecar')),
+        'vad': bool(params.get('vad'))
+    }
+    if params.get('progressive'):
+        output_path = subtitle_processor.transcribe_progressive(
+            _require(params, 'input'), _require(params, 'output'), **options
+        )
+    else:
+        output_path = subtitle_processor.transcribe_video(
+            _require(params, 'input'), _require(params, 'output'), raise_on_error=True, **options
+        )
+    return {'subtitle_path': output_path}
+
+
+def _split_job(video_processor, params):
+    """Split 'input' (with 'subtitle') into 'parts' equal parts or at 'timestamps'."""
+    video_processor = _with_encoder(video_processor, params.get('encoder'))
+    video_path = _require(params, 'input')
+    subtitle_path = _require(params, 'subtitle')
+    output_dir = _require(params, 'output')
+    quality = params.get('quality', 'medium')
+
+    if params.get('parts'):
+        segments = video_processor.split_video_equal_parts(
+            video_path, subtitle_path, int(params['parts']), output_dir, quality=quality
+        )
+    elif params.get('timestamps'):
+        segments = video_processor.split_video_custom_timestamps(
+            video_path, subtitle_path, [float(ts) for ts in params['timestamps']], output_dir, quality=quality
+        )
+    else:
+        raise Exception("Informe 'parts' ou 'timestamps' para dividir o vídeo")
+
+    return {'segments': segments}
+
+
+def _embed_job(video_processor, params):
+    """Embed 'subtitle' into 'input', saving to 'output'."""
+    video_processor = _with_encoder(video_processor, params.get('encoder'))
+    output_path = video_processor.embed_subtitles(
+        _require(params, 'input'),
+        _require(params, 'subtitle'),
+        _require(params, 'output'),
+        quality=params.get('quality', 'medium'),
+        subtitle_style=params.get('subtitle_style'),
+        mode=params.get('mode', 'hard'),
+        max_workers=params.get('workers')
+    )
+    return {'output_path': output_path}
+
+
+def _youtube_job(video_processor, params):
+    """Download the video (or only the audio) at 'url' into 'output_dir'."""
+    url = _require(params, 'url')
+    output_dir = _require(params, 'output_dir')
+
+    if params.get('audio_only'):
+        media_path = video_processor.download_youtube_audio(
+            url, output_dir, concurrent_fragments=params.get('fragments')
+        )
+    else:
+        media_path = video_processor.download_youtube_video(
+            url, output_dir, quality=params.get('quality', 'medium'),
+            concurrent_fragments=params.get('fragments')
+        )
+    return {'media_path': media_path}
+
+
+def _probe_job(video_processor, params):
+    """Get the duration of 'input'."""
+    return {'duration': video_processor.get_video_duration(_require(params, 'input'))}
+
+
+# Tipos de tarefa disponíveis
+JOB_HANDLERS = {
+    'transcribe': _transcribe_job,
+    'split': _split_job,
+    'embed': _embed_job,
+    'youtube': _youtube_job,
+    'probe': _probe_job,
+}
+
+
+class JobRunner:
+    """Run jobs with the process-wide processors, reused between jobs."""
+
+    def __init__(self, reporter=None, persistent_models=False):
+        """Initialize the runner.
+
+        Args:
+            reporter (ProgressReporter, optional): Default reporter for jobs.
+            persistent_models (bool): Keep Whisper models loaded in memory
+                between jobs (see SubtitleProcessor).
+        """
+        # The processors (and their caches and models) are shared by the whole process
+        self.video_processor = get_video_processor(persistent_models)
+        if reporter is not None:
+            self.video_processor = self.video_processor.with_reporter(reporter)
+        self.subtitle_processor = self.video_processor.subtitle_processor
+
+    def run(self, job_type, params, reporter=None):
+        """Run a job.
+
+        Args:
+            job_type (str): One of JOB_HANDLERS.
+            params (dict): Job parameters.
+            reporter (ProgressReporter, optional): Reporter for this job only.
+
+        Returns:
+            dict: The job result.
+        """
+        handler = JOB_HANDLERS.get(job_type)
+        if handler is None:
+            raise Exception(f"Tipo de tarefa desconhecido: {job_type}")
+
+        video_processor = self.video_processor
+        if reporter is not None:
+            video_processor = video_processor.with_reporter(reporter)
+
+        return handler(video_processor, params or {})
+
+
+class JobQueue:
+    """Run jobs in the background and keep their state and progress events."""
+
+    def __init__(self, runner=None, max_workers=2, max_finished=500, max_events=1000):
+        """Initialize the queue.
+
+        Args:
+            runner (JobRunner, optional): Runner for the jobs. Defaults to a new one.
+            max_workers (int): Jobs executed at the same time; others wait queued.
+            max_finished (int): Finished jobs kept for status queries; the oldest
+                are forgotten first.
+            max_events (int): Events kept per job; the oldest are dropped first,
+                so a long job's progress doesn't grow without bound.
+        """
+        self.runner = runner or JobRunner()
+        self.max_finished = max_finished
+        self.max_events = max(1, max_events)
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers))
+        self._jobs = OrderedDict()
+        self._changed = threading.Condition()
+
+    def submit(self, job_type, params, job_id=None):
+        """Queue a job.
+
+        Args:
+            job_type (str): One of JOB_HANDLERS.
+            params (dict): Job parameters.
+            job_id (str, optional): Id for the job. Defaults to a random one.
+
+        Returns:
+            str: The job id.
+        """
+        if job_type not in JOB_HANDLERS:
+            raise Exception(f"Tipo de tarefa desconhecido: {job_type}")
+
+        job_id = job_id or uuid.uuid4().hex
+        job = {
+            'id': job_id,
+            'type': job_type,
+            'params': params,
+            'status': 'queued',       # queued, running, complete, error
+            'created': time.time(),
+            'started': None,
+            'finished': None,
+            'progress': 0,
+            'message': '',
+            'result': None,
+            'error': None,
+            'events': deque(maxlen=self.max_events),
+            'event_count': 0          # Events ever recorded, including the dropped ones
+        }
+        with self._changed:
+            self._jobs[job_id] = job
+            self._forget_finished()
+
+        self._executor.submit(self._run, job)
+        return job_id
+
+    def _forget_finished(self):
+        """Drop the oldest finished jobs beyond max_finished (lock held)."""
+        finished = [job_id for job_id, job in self._jobs.items() if job['finished']]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
+
+    def _record(self, job, event):
+        with self._changed:
+            job['events'].append(event)
+            job['event_count'] += 1
+            if event.get('event') == 'progress':
+                job['progress'] = event.get('value', 0)
+            elif event.get('message'):
+                job['message'] = event['message']
+            self._changed.notify_all()
+
+    def _run(self, job):
+        with self._changed:
+            job['status'] = 'running'
+            job['started'] = time.time()
+            self._changed.notify_all()
+
+        reporter = EventReporter(lambda event: self._record(job, event))
+        try:
+            result = self.runner.run(job['type'], job['params'], reporter=reporter)
+            final = {'event': 'result', 'result': result}
+            update = {'status': 'complete', 'result': result, 'progress': 100}
+        except Exception as e:
+            final = {'event': 'error', 'error': str(e)}
+            update = {'status': 'error', 'error': str(e)}
+
+        with self._changed:
+            job.update(update)
+            job['finished'] = time.time()
+            job['events'].append(final)
+            job['event_count'] += 1
+            self._changed.notify_all()
+
+    def get(self, job_id):
+        """Get the state of a job, without its events.
+
+        Returns:
+            dict: A copy of the job state, or None for unknown ids.
+        """
+        with self._changed:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            return {key: value for key, value in job.items() if key not in ('events', 'event_count')}
+
+    def wait_events(self, job_id, start=0, timeout=15):
+        """Get the events of a job from index start, waiting for new ones.
+
+        Event indexes count every event of the job, so they stay the same after
+        the oldest events are dropped (see max_events).
+
+        Args:
+            job_id (str): The job id.
+            start (int): Index of the first event wanted.
+            timeout (float): Seconds to wait when there are no new events.
+
+        Returns:
+            tuple: (events, finished, first_index) - events is None for unknown
+                ids; first_index is the index of events[0], later than start
+                when the events in between were dropped.
+        """
+        with self._changed:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None, True, start
+            if job['event_count'] <= start and not job['finished']:
+                self._changed.wait(timeout)
+            dropped = job['event_count'] - len(job['events'])
+            first_index = max(start, dropped)
+            events = list(job['events'])[first_index - dropped:]
+            return events, job['finished'] is not None, first_index
+
+    def stats(self):
+        """Count the jobs by status."""
+        with self._changed:
+            counts = {'queued': 0, 'running': 0, 'complete': 0, 'error': 0}
+            for job in self._jobs.values():
+                counts[job['status']] += 1
+            return counts
+
+    def shutdown(self):
+        """Stop accepting jobs and wait for the running ones."""
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,239 @@
+"""
+Relatórios de progresso dos processadores de vídeo e legendas.
+
+VideoProcessor e SubtitleProcessor não dependem de nenhuma interface: eles
+enviam mensagens e progresso para um ProgressReporter. A interface web usa o
+StreamlitReporter, a CLI usa o ConsoleReporter, o daemon e a API HTTP usam o
+EventReporter (eventos serializáveis em JSON), e processos sem interface
+(workers) usam o ProgressReporter padrão, que ignora tudo.
+"""
+import sys
+import threading
+
+
+class _NullHandle:
+    """Status line or progress bar that ignores every update."""
+
+    def write(self, message):
+        pass
+
+    def progress(self, value):
+        pass
+
+
+class ProgressReporter:
+    """Receives progress events from the processors and ignores them.
+
+    Subclasses override the methods they can display. status_line() and
+    progress_bar() return handles that are updated in place: status lines
+    have write(message), progress bars have progress(value) with 0-100.
+    """
+
+    def write(self, message):
+        """Report a plain message."""
+
+    def info(self, message):
+        """Report an informational message."""
+
+    def success(self, message):
+        """Report a successful step."""
+
+    def warning(self, message):
+        """Report a recoverable problem."""
+
+    def error(self, message):
+        """Report an error."""
+
+    def status_line(self):
+        """Create a single status line, replaced on every write()."""
+        return _NullHandle()
+
+    def progress_bar(self):
+        """Create a progress bar, starting at 0."""
+        return _NullHandle()
+
+
+class _ConsoleStatusLine:
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, message):
+        print(message, file=self.stream, flush=True)
+
+
+class _ConsoleProgressBar:
+    BAR_LENGTH = 30
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def progress(self, value):
+        value = max(0, min(100, int(value)))
+        filled_length = int(self.BAR_LENGTH * value / 100)
+        bar = '█' * filled_length + '-' * (self.BAR_LENGTH - filled_length)
+        end = "\n" if value >= 100 else ""
+        self.stream.write(f"\r[{bar}] {value}%{end}")
+        self.stream.flush()
+
+
+class ConsoleReporter(ProgressReporter):
+    """Print progress to the terminal (errors go to stderr)."""
+
+    def __init__(self, stream=None, error_stream=None):
+        """Initialize the reporter.
+
+        Args:
+            stream (file, optional): Stream for messages. Defaults to sys.stdout.
+            error_stream (file, optional): Stream for warnings and errors.
+                Defaults to sys.stderr.
+        """
+        self.stream = stream or sys.stdout
+        self.error_stream = error_stream or sys.stderr
+
+    def write(self, message):
+        print(message, file=self.stream, flush=True)
+
+    def info(self, message):
+        print(message, file=self.stream, flush=True)
+
+    def success(self, message):
+        print(message, file=self.stream, flush=True)
+
+    def warning(self, message):
+        print(message, file=self.error_stream, flush=True)
+
+    def error(self, message):
+        print(message, file=self.error_stream, flush=True)
+
+    def status_line(self):
+        return _ConsoleStatusLine(self.stream)
+
+    def progress_bar(self):
+        return _ConsoleProgressBar(self.stream)
+
+
+class StreamlitReporter(ProgressReporter):
+    """Show progress with Streamlit elements in the current page.
+
+    Streamlit is only imported when this reporter is created, so headless
+    users of the processors never load it.
+    """
+
+    def __init__(self):
+        import streamlit as st
+        self.st = st
+
+    def write(self, message):
+        self.st.write(message)
+
+    def info(self, message):
+        self.st.info(message)
+
+    def success(self, message):
+        self.st.success(message)
+
+    def warning(self, message):
+        self.st.warning(message)
+
+    def error(self, message):
+        self.st.error(message)
+
+    def status_line(self):
+        return self.st.empty()
+
+    def progress_bar(self):
+        return self.st.progress(0)
+
+
+class _EventHandle:
+    """Status line or progress bar whose updates become events."""
+
+    def __init__(self, reporter, handle_id):
+        self.reporter = reporter
+        self.handle_id = handle_id
+
+    def write(self, message):
+        self.reporter.emit({'event': 'status', 'id': self.handle_id, 'message': str(message)})
+
+    def progress(self, value):
+        self.reporter.emit({'event': 'progress', 'id': self.handle_id, 'value': value})
+
+
+class EventReporter(ProgressReporter):
+    """Turn progress into JSON-serializable event dictionaries.
+
+    Events have one of these shapes:
+        {'event': 'message', 'level': 'info', 'message': '...'}
+        {'event': 'status', 'id': 1, 'message': '...'}
+        {'event': 'progress', 'id': 2, 'value': 40}
+    Status lines and progress bars get ids, so the receiver can update the
+    right element (see replay_event()).
+    """
+
+    LEVELS = ('write', 'info', 'success', 'warning', 'error')
+
+    def __init__(self, callback):
+        """Initialize the reporter.
+
+        Args:
+            callback (callable): Called with each event dictionary.
+        """
+        self.callback = callback
+        self._lock = threading.Lock()
+        self._next_id = 0
+
+    def emit(self, event):
+        self.callback(event)
+
+    def _message(self, level, message):
+        self.emit({'event': 'message', 'level': level, 'message': str(message)})
+
+    def write(self, message):
+        self._message('write', message)
+
+    def info(self, message):
+        self._message('info', message)
+
+    def success(self, message):
+        self._message('success', message)
+
+    def warning(self, message):
+        self._message('warning', message)
+
+    def error(self, message):
+        self._message('error', message)
+
+    def _new_handle(self):
+        with self._lock:
+            self._next_id += 1
+            return _EventHandle(self, self._next_id)
+
+    def status_line(self):
+        return self._new_handle()
+
+    def progress_bar(self):
+        return self._new_handle()
+
+
+def replay_event(event, reporter, handles):
+    """Show an event produced by an EventReporter on another reporter.
+
+    Args:
+        event (dict): The event.
+        reporter (ProgressReporter): Reporter that displays it.
+        handles (dict): Status lines and progress bars created so far, by id;
+            keep the same dictionary for all events of a job.
+    """
+    kind = event.get('event')
+    if kind == 'message':
+        level = event.get('level')
+        method = getattr(reporter, level) if level in EventReporter.LEVELS else reporter.write
+        method(event.get('message', ''))
+    elif kind == 'status':
+        if event['id'] not in handles:
+            handles[event['id']] = reporter.status_line()
+        handles[event['id']].write(event.get('message', ''))
+    elif kind == 'progress':
+        if event['id'] not in handles:
+            handles[event['id']] = reporter.progress_bar()
+        handles[event['id']].progress(event.get('value', 0))
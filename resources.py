@@ -0,0 +1,191 @@
+"""
+Recursos compartilhados por todo o processo.
+
+Processadores, caches e modelos são criados uma vez por processo e reutilizados
+por todas as sessões do Streamlit, pelo daemon e pela API, em vez de serem
+reconstruídos a cada uso. O registro controla a criação (thread-safe), o
+encerramento (explícito ou na saída do processo) e informa quanta memória os
+recursos e caches ocupam.
+"""
+import os
+import time
+import atexit
+import threading
+
+
+class ResourceRegistry:
+    """Thread-safe registry of named, lazily created, process-wide resources."""
+
+    def __init__(self):
+        self._resources = {}   # nome -> {'resource', 'close', 'size', 'created'}
+        self._lock = threading.RLock()
+
+    def get_or_create(self, name, factory, close=None, size=None):
+        """Get a resource, creating it on first use.
+
+        Args:
+            name (str): Resource name, unique in the registry.
+            factory (callable): Creates the resource (called at most once per name
+                until the resource is closed).
+            close (callable, optional): Called with the resource when it is closed.
+            size (callable, optional): Called with the resource to get its
+                approximate memory use, in bytes.
+
+        Returns:
+            object: The resource.
+        """
+        with self._lock:
+            entry = self._resources.get(name)
+            if entry is None:
+                entry = {
+                    'resource': factory(),
+                    'close': close,
+                    'size': size,
+                    'created': time.time()
+                }
+                self._resources[name] = entry
+            return entry['resource']
+
+    def close(self, name=None):
+        """Close one resource, or all of them (newest first) when name is None."""
+        with self._lock:
+            if name is None:
+                names = list(reversed(list(self._resources)))
+            else:
+                names = [name] if name in self._resources else []
+            entries = [(item, self._resources.pop(item)) for item in names]
+
+        for _, entry in entries:
+            if entry['close']:
+                try:
+                    entry['close'](entry['resource'])
+                except Exception:
+                    # Closing must go on for the other resources
+                    pass
+
+    def stats(self):
+        """Get the registered resources and their memory use.
+
+        Returns:
+            list: Dictionaries with 'name', 'type', 'age' (seconds) and
+                'bytes' (None when unknown).
+        """
+        with self._lock:
+            entries = list(self._resources.items())
+
+        now = time.time()
+        stats = []
+        for name, entry in entries:
+            size = None
+            if entry['size']:
+                try:
+                    size = entry['size'](entry['resource'])
+                except Exception:
+                    size = None
+            stats.append({
+                'name': name,
+                'type': type(entry['resource']).__name__,
+                'age': now - entry['created'],
+                'bytes': size
+            })
+        return stats
+
+
+_registry = ResourceRegistry()
+atexit.register(_registry.close)
+
+
+def get_registry():
+    """Get the registry shared by the whole process."""
+    return _registry
+
+
+def get_subtitle_processor(persistent_models=False):
+    """Get the shared SubtitleProcessor.
+
+    Use with_reporter() on the result to report progress somewhere; the shared
+    instance itself reports nothing.
+
+    Args:
+        persistent_models (bool): Whether the processor keeps Whisper models
+            loaded in this process (see SubtitleProcessor).
+
+    Returns:
+        SubtitleProcessor: The shared processor.
+    """
+    import subtitle_processor
+
+    return _registry.get_or_create(
+        f"subtitle_processor:{'persistent' if persistent_models else 'cli'}",
+        lambda: subtitle_processor.SubtitleProcessor(persistent_models=persistent_models),
+        close=lambda _: subtitle_processor.clear_caches(),
+        size=lambda _: subtitle_processor.cache_stats()['whisper_models']['bytes']
+    )
+
+
+def get_video_processor(persistent_models=False):
+    """Get the shared VideoProcessor (using the shared SubtitleProcessor).
+
+    Use with_reporter() on the result to report progress somewhere; the shared
+    instance itself reports nothing.
+
+    Args:
+        persistent_models (bool): Passed to get_subtitle_processor().
+
+    Returns:
+        VideoProcessor: The shared processor.
+    """
+    import video_processor
+
+    def size(_):
+        stats = video_processor.cache_stats()
+        return stats['info_cache']['bytes'] + stats['probe_cache']['bytes']
+
+    return _registry.get_or_create(
+        f"video_processor:{'persistent' if persistent_models else 'cli'}",
+        lambda: video_processor.VideoProcessor(subtitle_processor=get_subtitle_processor(persistent_models)),
+        close=lambda _: video_processor.clear_caches(),
+        size=size
+    )
+
+
+def process_memory_bytes():
+    """Get the resident memory of this process, in bytes (None if unknown)."""
+    try:
+        with open("/proc/self/statm", 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+
+    try:
+        import resource
+        usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is the peak, in kilobytes on Linux and bytes on macOS
+        return usage if usage > 1 << 32 else usage * 1024
+    except (ImportError, OSError):
+        return None
+
+
+def memory_report():
+    """Summarize the memory used by shared resources and caches.
+
+    Only caches of modules that were already imported are reported, so this
+    never loads anything.
+
+    Returns:
+        dict: 'process_bytes' (resident memory), 'resources' (see
+            ResourceRegistry.stats()) and 'caches' (per module cache sizes).
+    """
+    import sys
+
+    caches = {}
+    for module_name in ('video_processor', 'subtitle_processor'):
+        module = sys.modules.get(module_name)
+        if module is not None:
+            caches.update(module.cache_stats())
+
+    return {
+        'process_bytes': process_memory_bytes(),
+        'resources': _registry.stats(),
+        'caches': caches
+    }
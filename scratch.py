@@ -0,0 +1,212 @@
+"""
+Espaço de rascunho para arquivos intermediários, de preferência na memória.
+
+Áudio extraído para o Whisper, saída do Whisper e pedaços de vídeo usados ao
+incorporar legendas são lidos uma ou duas vezes e apagados em seguida. Gravá-los
+em um sistema de arquivos em RAM (como /dev/shm) evita o disco, o que faz
+diferença em volumes lentos (discos de rede, HDs, contêineres com overlayfs).
+
+A RAM é limitada: cada uso reserva uma estimativa do espaço necessário, e
+quando a reserva não cabe no orçamento (ou no espaço livre), o rascunho vai
+para o disco, na pasta indicada pelo chamador.
+"""
+import os
+import time
+import shutil
+import tempfile
+import functools
+import threading
+import contextlib
+import subprocess
+
+# Usado quando VIDEO_SCRATCH_DIR não está definido
+DEFAULT_RAM_DIR = "/dev/shm"
+
+
+def default_scratch_root():
+    """Get the directory for RAM-backed scratch files.
+
+    Returns:
+        str: VIDEO_SCRATCH_DIR from the environment ('' disables the RAM
+            scratch), or /dev/shm when it exists and is writable, or None.
+    """
+    root = os.getenv("VIDEO_SCRATCH_DIR")
+    if root is not None:
+        return root or None
+    if os.path.isdir(DEFAULT_RAM_DIR) and os.access(DEFAULT_RAM_DIR, os.W_OK):
+        return DEFAULT_RAM_DIR
+    return None
+
+
+def free_bytes(path):
+    """Get the free space of the filesystem holding path, in bytes."""
+    stat = os.statvfs(path)
+    return stat.f_bavail * stat.f_frsize
+
+
+class ScratchSpace:
+    """Temporary directories in a RAM-backed root, within a size budget."""
+
+    # Fração do espaço livre da RAM que pode ser reservada
+    MAX_FREE_FRACTION = 0.5
+
+    def __init__(self, root_dir, max_bytes):
+        """Initialize the scratch space.
+
+        Args:
+            root_dir (str): RAM-backed directory (e.g. /dev/shm), or None to
+                always use the disk.
+            max_bytes (int): Total size that may be reserved at the same time.
+        """
+        self.root_dir = root_dir
+        self.max_bytes = max_bytes
+        self.reserved_bytes = 0
+        self._lock = threading.Lock()
+
+    def _reserve(self, expected_bytes):
+        """Reserve RAM for expected_bytes, returning False when it doesn't fit."""
+        if not self.root_dir or not os.path.isdir(self.root_dir):
+            return False
+
+        with self._lock:
+            if self.reserved_bytes + expected_bytes > self.max_bytes:
+                return False
+            try:
+                available = free_bytes(self.root_dir) * self.MAX_FREE_FRACTION
+            except OSError:
+                return False
+            if expected_bytes > available:
+                return False
+            self.reserved_bytes += expected_bytes
+            return True
+
+    def _release(self, expected_bytes):
+        with self._lock:
+            self.reserved_bytes = max(0, self.reserved_bytes - expected_bytes)
+
+    @contextlib.contextmanager
+    def directory(self, prefix, expected_bytes, fallback_dir=None):
+        """Create a temporary directory, in RAM when the budget allows.
+
+        The directory and everything in it are deleted on exit.
+
+        Args:
+            prefix (str): Prefix of the directory name.
+            expected_bytes (int): Estimated size of the files that will be written.
+            fallback_dir (str, optional): Where to create the directory when it
+                doesn't fit in RAM. Defaults to the system temporary directory.
+
+        Yields:
+            str: Path to the directory.
+        """
+        in_ram = self._reserve(expected_bytes)
+        parent = self.root_dir if in_ram else fallback_dir
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+
+        work_dir = tempfile.mkdtemp(prefix=prefix, dir=parent)
+        try:
+            yield work_dir
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+            if in_ram:
+                self._release(expected_bytes)
+
+    def stats(self):
+        """Get the RAM root, the budget and how much of it is reserved."""
+        with self._lock:
+            return {
+                'root_dir': self.root_dir,
+                'max_bytes': self.max_bytes,
+                'reserved_bytes': self.reserved_bytes
+            }
+
+
+@functools.lru_cache(maxsize=1)
+def get_scratch_space():
+    """Get the shared scratch space.
+
+    The budget comes from VIDEO_SCRATCH_MB (default 2048 MB).
+
+    Returns:
+        ScratchSpace: The scratch space.
+    """
+    max_mb = int(os.getenv("VIDEO_SCRATCH_MB", "2048"))
+    return ScratchSpace(default_scratch_root(), max_mb * 1024 * 1024)
+
+
+def _timed_write_read(path, data):
+    """Write data to path (flushed to the device) and read it back.
+
+    Returns:
+        tuple: (write_seconds, read_seconds)
+    """
+    start_time = time.time()
+    with open(path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    write_seconds = time.time() - start_time
+
+    start_time = time.time()
+    with open(path, 'rb') as f:
+        while f.read(1024 * 1024):
+            pass
+    return write_seconds, time.time() - start_time
+
+
+def benchmark_scratch(video_path, disk_dir, audio_args, sample_seconds=60):
+    """Compare intermediate file I/O in the RAM scratch and on disk.
+
+    For each location, the audio of the first sample_seconds of the video is
+    extracted as for a transcription, and the resulting WAV is then written
+    (with fsync) and read back, as the later stages do.
+
+    Args:
+        video_path (str): Path to the sample video.
+        disk_dir (str): Directory on the disk to compare against.
+        audio_args (list): ffmpeg arguments of the audio extraction
+            (SubtitleProcessor.AUDIO_EXTRACTION_ARGS).
+        sample_seconds (float): Length of the sample.
+
+    Returns:
+        list: Dictionaries with 'location', 'path', 'extract_seconds',
+            'write_seconds', 'read_seconds' and 'size_bytes', or 'error'.
+    """
+    locations = [('disco', disk_dir)]
+    root = default_scratch_root()
+    if root and os.path.isdir(root):
+        locations.insert(0, ('ram', root))
+
+    results = []
+    for location, parent in locations:
+        work_dir = tempfile.mkdtemp(prefix="scratch_benchmark_", dir=parent)
+        try:
+            audio_path = os.path.join(work_dir, "audio.wav")
+            ffmpeg_cmd = ["ffmpeg", "-t", str(sample_seconds), "-i", video_path] + audio_args + ["-y", audio_path]
+
+            start_time = time.time()
+            result = subprocess.run(ffmpeg_cmd, capture_output=True, text=True)
+            extract_seconds = time.time() - start_time
+            if result.returncode != 0:
+                error = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "erro desconhecido"
+                results.append({'location': location, 'path': parent, 'error': error})
+                continue
+
+            with open(audio_path, 'rb') as f:
+                data = f.read()
+            write_seconds, read_seconds = _timed_write_read(os.path.join(work_dir, "copy.wav"), data)
+
+            results.append({
+                'location': location,
+                'path': parent,
+                'extract_seconds': extract_seconds,
+                'write_seconds': write_seconds,
+                'read_seconds': read_seconds,
+                'size_bytes': len(data),
+                'error': None
+            })
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    return results
@@ -6,11 +6,168 @@ import tempfile
 import time
 import json
 import threading
-import streamlit as st
+import functools
+import wave
+import copy
+from progress import ProgressReporter
+from file_cache import FileCache, get_transcription_cache
+from artifact_store import materialize
+from workspace import content_hash
+from scratch import get_scratch_space
+import vad as vad_prepass
+
+
+@functools.lru_cache(maxsize=128)
+def _load_cue_index_cached(subtitle_path, mtime_ns, size):
+    """Parse an SRT file once per (path, mtime, size) combination."""
+    with open(subtitle_path, 'r', encoding='utf-8', errors='replace') as f:
+        content = f.read()
+    
+    return tuple(srt.parse(content))
+
+
+def load_cue_index(subtitle_path):
+    """Load the parsed cues of an SRT file, reusing earlier parses.
+    
+    The result is memoized on the file's modification time and size, so a file
+    is only re-parsed after it changes on disk. The returned cues are shared
+    between callers and must not be modified.
+    
+    Args:
+        subtitle_path (str): Path to the SRT file.
+        
+    Returns:
+        tuple: Tuple of srt.Subtitle objects.
+    """
+    subtitle_path = os.path.abspath(subtitle_path)
+    stat = os.stat(subtitle_path)
+    return _load_cue_index_cached(subtitle_path, stat.st_mtime_ns, stat.st_size)
+
+
+# Modelos Whisper carregados em memória, usados com persistent_models=True.
+# Cada modelo tem sua própria trava: uma transcrição por modelo de cada vez.
+_whisper_models = {}          # nome -> (modelo, trava)
+_whisper_models_lock = threading.Lock()
+
+
+def _get_whisper_model(name):
+    """Load a Whisper model once per process.
+    
+    Returns:
+        tuple: (model, lock) - hold the lock while transcribing with the model.
+    """
+    with _whisper_models_lock:
+        if name not in _whisper_models:
+            import whisper
+            _whisper_models[name] = (whisper.load_model(name), threading.Lock())
+        return _whisper_models[name]
+
+
+def loaded_whisper_models():
+    """Get the names of the Whisper models loaded in this process."""
+    with _whisper_models_lock:
+        return sorted(_whisper_models)
+
+
+def cache_stats():
+    """Get the size of the module-level cue index and Whisper model caches.
+    
+    Returns:
+        dict: 'cue_index' with 'entries', and 'whisper_models' with 'entries',
+            'names' and the 'bytes' taken by the model parameters.
+    """
+    with _whisper_models_lock:
+        models = dict(_whisper_models)
+    
+    model_bytes = 0
+    for model, _ in models.values():
+        model_bytes += sum(p.numel() * p.element_size() for p in model.parameters())
+    
+    return {
+        'cue_index': {'entries': _load_cue_index_cached.cache_info().currsize},
+        'whisper_models': {'entries': len(models), 'names': sorted(models), 'bytes': model_bytes}
+    }
+
+
+def clear_caches():
+    """Empty the cue index and unload the Whisper models."""
+    _load_cue_index_cached.cache_clear()
+    with _whisper_models_lock:
+        _whisper_models.clear()
+
 
 class SubtitleProcessor:
-    def __init__(self):
-        """Initialize the SubtitleProcessor class."""
+    # Argumentos do ffmpeg para extrair o áudio que vai para o Whisper
+    AUDIO_EXTRACTION_ARGS = [
+        "-vn", "-acodec", "pcm_s16le", "-ar", "24000", "-ac", "1",
+        "-af", "highpass=f=200,lowpass=f=3000,volume=1.5",  # Filtro de áudio para melhorar a voz
+    ]
+    # Tamanho do WAV gerado com esses argumentos (24 kHz, mono, 16 bits)
+    AUDIO_BYTES_PER_SECOND = 24000 * 2
+    
+    # Faixas de legenda em texto que o ffmpeg converte para SRT (legendas em imagem,
+    # como PGS e DVD, precisariam de OCR e ficam de fora)
+    TEXT_SUBTITLE_CODECS = ('subrip', 'mov_text', 'ass', 'ssa', 'webvtt', 'text')
+    # Extensões de legendas externas procuradas ao lado do vídeo
+    SIDECAR_EXTENSIONS = ('.srt', '.vtt')
+    # Idiomas preferidos, em ordem (códigos ISO 639-1 e 639-2)
+    PREFERRED_LANGUAGES = (('pt', 'por'), ('en', 'eng'))
+    
+    # Modelo do rascunho rápido na transcrição progressiva
+    DRAFT_MODEL = "tiny"
+    
+    # Transcrição em fluxo: o áudio recebido é cortado no último silêncio (pausa de
+    # pelo menos STREAM_CUT_SILENCE_SECONDS), em trechos de pelo menos
+    # STREAM_MIN_PIECE_SECONDS; sem pausa até STREAM_MAX_PIECE_SECONDS, corta ali mesmo
+    STREAM_CUT_SILENCE_SECONDS = 0.3
+    STREAM_MIN_PIECE_SECONDS = 10
+    STREAM_MAX_PIECE_SECONDS = 90
+    
+    # Opções do Whisper por preset de qualidade, e a descrição de cada modo
+    WHISPER_PRESETS = {
+        # Fastest: Minimalistic settings for speed
+        'fast': ({
+            'beam_size': 1,                       # Smaller beam size = faster
+            'best_of': 1,                         # Fewer samples = faster
+            'condition_on_previous_text': False,  # Less context = faster
+            'temperature': 0,                     # No randomness = faster
+        }, "modo rápido"),
+        # Balanced: Good quality with reasonable speed
+        'balanced': ({
+            'beam_size': 3,                       # Medium beam size
+            'best_of': 2,                         # Consider a few alternatives
+            'temperature': 0,                     # Still deterministic
+        }, "modo balanceado"),
+        # High quality: Best settings for accuracy
+        'high': ({
+            'beam_size': 5,                       # Larger beam size = better quality
+            'best_of': 5,                         # Consider more alternatives
+            'condition_on_previous_text': True,   # Better context handling
+            'temperature': 0.2,                   # Slight variability for better results
+        }, "modo alta qualidade"),
+    }
+    
+    def __init__(self, reporter=None, persistent_models=False, transcription_cache=None):
+        """Initialize the SubtitleProcessor class.
+        
+        Args:
+            reporter (ProgressReporter, optional): Receives progress messages
+                (see progress.py). Defaults to a reporter that ignores them.
+            persistent_models (bool): Run Whisper in this process and keep the
+                loaded models in memory between transcriptions, instead of
+                starting the whisper CLI (which reloads the model) every time.
+                Meant for long-running processes such as the daemon.
+            transcription_cache (FileCache, optional): Cache for finished
+                transcriptions, keyed by video content, model and preset.
+                Defaults to the shared cache from file_cache.get_transcription_cache();
+                pass False to disable caching.
+        """
+        self.reporter = reporter or ProgressReporter()
+        self.persistent_models = persistent_models
+        if transcription_cache is None:
+            transcription_cache = get_transcription_cache()
+        self.transcription_cache = transcription_cache or None
+        
         # Status file to track transcription progress
         self.status_file = None
         
@@ -21,10 +178,26 @@ class SubtitleProcessor:
             'message': '',
             'complete': False,
             'error': None,
-            'result_path': None
+            'result_path': None,
+            'tier': 'final',         # draft while result_path holds the fast draft of a progressive run
+            'refining': False        # True while a larger model refines the draft in the background
         }
     
-    def transcribe_video(self, video_path, output_path, model="tiny", quality_preset="fast"):
+    def with_reporter(self, reporter):
+        """Get a copy of this processor that reports progress to another reporter.
+        
+        Args:
+            reporter (ProgressReporter): Reporter for the copy.
+            
+        Returns:
+            SubtitleProcessor: The copy.
+        """
+        processor = copy.copy(self)
+        processor.reporter = reporter
+        return processor
+    
+    def transcribe_video(self, video_path, output_path, model="tiny", quality_preset="fast", raise_on_error=False,
+                         force_asr=False, use_sidecar=False, vad=False):
         """Transcribe a video file using Whisper CLI and save as SRT.
         
         Args:
@@ -39,139 +212,92 @@ class SubtitleProcessor:
                 - fast: Otimizado para velocidade, pode ter mais erros
                 - balanced: Bom equilíbrio de velocidade/qualidade
                 - high: Máxima qualidade, processamento mais lento
+            raise_on_error (bool): Raise on failure instead of writing a placeholder
+                SRT with the error message.
+            force_asr (bool): Always run Whisper, even when the video already
+                has subtitles (see use_existing_subtitles()).
+            use_sidecar (bool): Also accept .srt/.vtt files next to the video.
+            vad (bool): Transcribe only the stretches with speech (see vad.py);
+                faster on videos with music or long pauses.
             
         Returns:
             str: Path to the generated SRT file.
         """
-        # Create a simple cache file name based on video file name
-        video_filename = os.path.basename(video_path)
-        
-        # Create cache directory if it doesn't exist
-        cache_dir = os.path.join(os.path.dirname(output_path), "cache")
-        os.makedirs(cache_dir, exist_ok=True)
+        # Subtitles already in the file (or next to it) make Whisper unnecessary
+        if not force_asr:
+            source = self.use_existing_subtitles(video_path, output_path, use_sidecar=use_sidecar)
+            if source:
+                self.reporter.success(f"Legendas encontradas {source}. Transcrição com Whisper dispensada.")
+                return output_path
         
-        # Define cache file path
-        cache_path = os.path.join(cache_dir, f"{video_filename}.srt")
-        
-        # Check if we have a cached transcription
-        if os.path.exists(cache_path):
-            st.success("Encontrada transcrição em cache. Usando versão previamente gerada.")
-            # Copy cache to output
-            with open(cache_path, 'r', encoding='utf-8', errors='replace') as f:
-                content = f.read()
-            
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(content)
-                
+        # Check if we have a cached transcription of this content
+        if self._load_cached_transcription(video_path, output_path, model, quality_preset, vad):
+            self.reporter.success("Encontrada transcrição em cache. Usando versão previamente gerada.")
             return output_path
         
         # Create progress indicators
-        progress_text = st.empty()
-        progress_bar = st.progress(0)
+        progress_text = self.reporter.status_line()
+        progress_bar = self.reporter.progress_bar()
         
         try:
             # STEP 1: Extract audio
             progress_text.write("⏳ Etapa 1/3: Extraindo áudio do vídeo...")
             progress_bar.progress(10)
             
-            # Extract audio from video to temporary file
-            temp_audio_file = os.path.join(os.path.dirname(output_path), f"temp_audio.wav")
-            
-            # Use ffmpeg command to extract audio with qualidade melhorada
-            ffmpeg_cmd = [
-                "ffmpeg", "-i", video_path, 
-                "-vn", "-acodec", "pcm_s16le", "-ar", "24000", "-ac", "1",
-                "-af", "highpass=f=200,lowpass=f=3000,volume=1.5",  # Filtro de áudio para melhorar a voz
-                "-y", temp_audio_file
-            ]
-            
-            result = subprocess.run(ffmpeg_cmd, capture_output=True, text=True)
-            progress_bar.progress(30)
-            
-            if result.returncode != 0:
-                raise Exception(f"Erro ao extrair áudio: {result.stderr}")
-            
-            # STEP 2: Transcribe audio
-            progress_text.write("⏳ Etapa 2/3: Transcrevendo o áudio (isso pode levar alguns minutos)...")
-            progress_bar.progress(40)
-            
-            # Create directory for Whisper output
-            whisper_output_dir = os.path.join(os.path.dirname(output_path), "whisper_output")
-            os.makedirs(whisper_output_dir, exist_ok=True)
-            
-            # Configure Whisper parameters based on model and quality preset
-            whisper_cmd = ["whisper", temp_audio_file, "--output_format", "srt", "--output_dir", whisper_output_dir]
-            
-            # Add model parameter
-            whisper_cmd.extend(["--model", model])
-            
-            # Configure quality settings based on preset
-            if quality_preset == "fast":
-                # Fastest: Minimalistic settings for speed
-                whisper_cmd.extend([
-                    "--beam_size", "1",             # Smaller beam size = faster
-                    "--best_of", "1",               # Fewer samples = faster
-                    "--condition_on_previous_text", "False",  # Less context = faster
-                    "--temperature", "0"            # No randomness = faster
-                ])
-                mode_info = f"modo rápido (modelo {model})"
-            elif quality_preset == "balanced":
-                # Balanced: Good quality with reasonable speed
-                whisper_cmd.extend([
-                    "--beam_size", "3",             # Medium beam size
-                    "--best_of", "2",               # Consider a few alternatives
-                    "--temperature", "0"            # Still deterministic
-                ])
-                mode_info = f"modo balanceado (modelo {model})"
-            else:  # "high"
-                # High quality: Best settings for accuracy
-                whisper_cmd.extend([
-                    "--beam_size", "5",             # Larger beam size = better quality
-                    "--best_of", "5",               # Consider more alternatives
-                    "--condition_on_previous_text", "True",  # Better context handling
-                    "--temperature", "0.2"          # Slight variability for better results
-                ])
-                mode_info = f"modo alta qualidade (modelo {model})"
-                
-            st.info(f"Iniciando transcrição com Whisper em {mode_info}.")
-            
-            # Run whisper - this will block until complete
-            result = subprocess.run(whisper_cmd, capture_output=True, text=True)
-            
-            if result.returncode != 0:
-                raise Exception(f"Erro do Whisper: {result.stderr}")
-            
-            progress_bar.progress(80)
-            
-            # STEP 3: Process results
-            progress_text.write("⏳ Etapa 3/3: Finalizando e salvando as legendas...")
-            
-            # The output file will be named like the input audio file but with .srt extension
-            output_filename = os.path.splitext(os.path.basename(temp_audio_file))[0] + ".srt"
-            generated_srt = os.path.join(whisper_output_dir, output_filename)
-            
-            # Check if output file exists
-            if not os.path.exists(generated_srt):
-                raise Exception("Arquivo SRT não foi gerado pelo Whisper.")
-            
-            # Read the file to fix possible encoding issues
-            with open(generated_srt, 'r', encoding='utf-8', errors='replace') as f:
-                content = f.read()
-            
-            # Save to cache
-            with open(cache_path, 'w', encoding='utf-8') as f:
-                f.write(content)
-            
-            # Write to the requested output path
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(content)
+            with self._scratch_dir(video_path, output_path, vad) as scratch_dir:
+                # Extract audio from video to a temporary file in the scratch space
+                temp_audio_file = os.path.join(scratch_dir, "audio.wav")
+                
+                # Use ffmpeg command to extract audio with qualidade melhorada
+                ffmpeg_cmd = ["ffmpeg", "-i", video_path] + self.AUDIO_EXTRACTION_ARGS + ["-y", temp_audio_file]
+                
+                result = subprocess.run(ffmpeg_cmd, capture_output=True, text=True)
+                progress_bar.progress(30)
+                
+                if result.returncode != 0:
+                    raise Exception(f"Erro ao extrair áudio: {result.stderr}")
+                
+                # STEP 2: Transcribe audio
+                progress_text.write("⏳ Etapa 2/3: Transcrevendo o áudio (isso pode levar alguns minutos)...")
+                progress_bar.progress(40)
+                
+                # Create directory for Whisper output
+                whisper_output_dir = os.path.join(scratch_dir, "whisper_output")
+                os.makedirs(whisper_output_dir, exist_ok=True)
+                
+                # Configure Whisper parameters based on model and quality preset
+                _, mode_info = self._build_whisper_cmd(temp_audio_file, whisper_output_dir, model, quality_preset)
+                    
+                self.reporter.info(f"Iniciando transcrição com Whisper em {mode_info}.")
+                
+                # Run whisper - this will block until complete
+                # The output file will be named like the input audio file but with .srt extension
+                generated_srt = self._run_whisper_on_speech(
+                    temp_audio_file, whisper_output_dir, model, quality_preset, vad
+                )
+                
+                progress_bar.progress(80)
+                
+                # STEP 3: Process results
+                progress_text.write("⏳ Etapa 3/3: Finalizando e salvando as legendas...")
+                
+                # Check if output file exists
+                if not os.path.exists(generated_srt):
+                    raise Exception("Arquivo SRT não foi gerado pelo Whisper.")
+                
+                # Read the file to fix possible encoding issues
+                with open(generated_srt, 'r', encoding='utf-8', errors='replace') as f:
+                    content = f.read()
+                
+                # Write to the requested output path
+                with open(output_path, 'w', encoding='utf-8') as f:
+                    f.write(content)
+                
+                # Save to cache
+                self._save_cached_transcription(video_path, output_path, model, quality_preset, vad)
             
             progress_bar.progress(90)
             
-            # Clean up temp files
-            if os.path.exists(temp_audio_file):
-                os.remove(temp_audio_file)
-            
             # Complete progress
             progress_bar.progress(100)
             progress_text.write("✅ Transcrição concluída com sucesso!")
@@ -180,55 +306,649 @@ class SubtitleProcessor:
                 
         except Exception as e:
             error_msg = str(e)
-            st.error(f"Erro ao transcrever o vídeo: {error_msg}")
+            self.reporter.error(f"Erro ao transcrever o vídeo: {error_msg}")
+            
+            # Clear progress
+            progress_bar.progress(0)
+            progress_text.write("❌ Ocorreu um erro durante a transcrição.")
+            
+            if raise_on_error:
+                raise Exception(f"Erro ao transcrever o vídeo: {error_msg}")
             
             # Create a dummy SRT if transcription fails
             with open(output_path, 'w', encoding='utf-8') as f:
                 f.write("1\n00:00:00,000 --> 00:00:05,000\nErro na transcrição: " + error_msg)
             
-            # Clear progress
-            progress_bar.progress(0)
-            progress_text.write("❌ Ocorreu um erro durante a transcrição.")
+            return output_path
+    
+    def transcribe_progressive(self, video_path, output_path, model="small", quality_preset="fast",
+                               draft_model=None, force_asr=False, use_sidecar=False, vad=False):
+        """Transcribe with a fast draft model first, then refine with a larger one.
+        
+        The draft is written to output_path as soon as it is ready, so it can
+        already be used (e.g. to split the video) while the refinement runs;
+        the refined subtitles then replace it atomically.
+        
+        Args:
+            video_path (str): Path to the video file.
+            output_path (str): Path to save the SRT file.
+            model (str): Whisper model of the refined subtitles.
+            quality_preset (str): Preset de qualidade ('fast', 'balanced', 'high').
+            draft_model (str, optional): Whisper model of the draft. Defaults
+                to DRAFT_MODEL.
+            force_asr (bool): Always run Whisper, even when the video already
+                has subtitles.
+            use_sidecar (bool): Also accept .srt/.vtt files next to the video.
+            vad (bool): Transcribe only the stretches with speech (see vad.py).
             
+        Returns:
+            str: Path to the generated SRT file.
+        """
+        draft_model = draft_model or self.DRAFT_MODEL
+        
+        if not force_asr:
+            source = self.use_existing_subtitles(video_path, output_path, use_sidecar=use_sidecar)
+            if source:
+                self.reporter.success(f"Legendas encontradas {source}. Transcrição com Whisper dispensada.")
+                return output_path
+        
+        # Without a smaller model there is nothing to draft
+        if model == draft_model:
+            return self.transcribe_video(video_path, output_path, model, quality_preset,
+                                         raise_on_error=True, force_asr=True, vad=vad)
+        
+        # Neither when the refined transcription is already cached
+        if self._load_cached_transcription(video_path, output_path, model, quality_preset, vad):
+            self.reporter.success("Encontrada transcrição em cache. Usando versão previamente gerada.")
             return output_path
+        
+        self.transcribe_video(video_path, output_path, draft_model, quality_preset,
+                              raise_on_error=True, force_asr=True, vad=vad)
+        self.reporter.success(f"Rascunho pronto (modelo {draft_model}). Refinando com o modelo {model}...")
+        
+        self._refine_transcription(video_path, output_path, model, quality_preset, vad)
+        self.reporter.success(f"Legendas refinadas com o modelo {model}.")
+        return output_path
     
-    def transcribe_video_async(self, video_path, output_path, model="tiny", quality_preset="fast"):
-        """Transcribe a video file using Whisper in a non-blocking way.
+    def _refine_transcription(self, video_path, output_path, model, quality_preset="fast", vad=False):
+        """Transcribe again with model and atomically replace output_path with the result.
+        
+        Readers of output_path see either the whole draft or the whole refined
+        file; if the refinement fails, the draft is left untouched.
+        """
+        # Same directory as output_path, so os.replace() is a rename
+        refined_path = f"{output_path}.{model}.tmp"
+        try:
+            self.transcribe_video(video_path, refined_path, model, quality_preset,
+                                  raise_on_error=True, force_asr=True, vad=vad)
+            os.replace(refined_path, output_path)
+        finally:
+            if os.path.exists(refined_path):
+                os.remove(refined_path)
+    
+    def use_existing_subtitles(self, video_path, output_path, use_sidecar=False):
+        """Save subtitles the video already has to output_path, if any.
+        
+        Looks for a sidecar file first (when use_sidecar is set), then for a
+        text subtitle stream in the video; Portuguese is preferred, then
+        English. The chosen subtitles are converted to SRT with ffmpeg.
+        
+        Args:
+            video_path (str): Path to the video file.
+            output_path (str): Path to save the SRT file.
+            use_sidecar (bool): Also accept .srt/.vtt files next to the video
+                (named like the video, e.g. video.srt or video.pt.vtt).
+            
+        Returns:
+            str: Description of where the subtitles came from, or None when
+                the video has none (output_path is left untouched).
+        """
+        if use_sidecar:
+            for sidecar_path in self.find_sidecar_subtitles(video_path, exclude=output_path):
+                if self._convert_to_srt(["-i", sidecar_path], output_path):
+                    return f"no arquivo {os.path.basename(sidecar_path)}"
+        
+        for stream in self.find_subtitle_streams(video_path):
+            if self._convert_to_srt(["-i", video_path, "-map", f"0:{stream['index']}"], output_path):
+                language = stream.get('language') or 'idioma não informado'
+                return f"na faixa {stream['index']} do vídeo ({stream['codec_name']}, {language})"
+        
+        return None
+    
+    def _language_rank(self, language):
+        """Rank a language code by PREFERRED_LANGUAGES (lower is better)."""
+        language = (language or '').lower().replace('_', '-').split('-')[0]
+        for rank, codes in enumerate(self.PREFERRED_LANGUAGES):
+            if language in codes:
+                return rank
+        return len(self.PREFERRED_LANGUAGES)
+    
+    def find_subtitle_streams(self, video_path):
+        """List the text subtitle streams of a video, preferred languages first.
+        
+        Forced tracks (disposition.forced, or titled "forced" or "signs",
+        as in signs-and-songs tracks) only cover foreign-language lines and
+        signs, so they are left out: the video is transcribed instead.
+        
+        Args:
+            video_path (str): Path to the video file.
+            
+        Returns:
+            list: Dictionaries with 'index', 'codec_name' and 'language' (None
+                when untagged), in order of preference.
+        """
+        ffprobe_cmd = [
+            "ffprobe", "-v", "error", "-select_streams", "s",
+            "-show_entries", "stream=index,codec_name:stream_tags=language,title:stream_disposition=forced",
+            "-of", "json", video_path
+        ]
+        result = subprocess.run(ffprobe_cmd, capture_output=True, text=True)
+        if result.returncode != 0:
+            return []
+        
+        try:
+            streams = json.loads(result.stdout).get('streams', [])
+        except ValueError:
+            return []
+        
+        text_streams = [
+            {
+                'index': stream['index'],
+                'codec_name': stream.get('codec_name'),
+                'language': (stream.get('tags') or {}).get('language')
+            }
+            for stream in streams
+            if stream.get('codec_name') in self.TEXT_SUBTITLE_CODECS and not self._is_forced_stream(stream)
+        ]
+        # sorted() is stable, so streams of the same rank keep the file's order
+        return sorted(text_streams, key=lambda stream: self._language_rank(stream['language']))
+    
+    def _is_forced_stream(self, stream):
+        """Check whether an ffprobe subtitle stream only holds forced subtitles."""
+        if (stream.get('disposition') or {}).get('forced'):
+            return True
+        title = ((stream.get('tags') or {}).get('title') or '').lower()
+        return 'forced' in title or 'signs' in title
+    
+    def find_sidecar_subtitles(self, video_path, exclude=None):
+        """List subtitle files next to a video, preferred languages first.
+        
+        Matches files named like the video with a subtitle extension, with or
+        without a language code (video.srt, video.pt.srt, video.en-US.vtt).
+        Untagged files rank after Portuguese and before English.
         
         Args:
             video_path (str): Path to the video file.
+            exclude (str, optional): File to ignore, e.g. the output being written.
+            
+        Returns:
+            list: Paths to the subtitle files, in order of preference.
+        """
+        video_dir = os.path.dirname(os.path.abspath(video_path))
+        stem = os.path.splitext(os.path.basename(video_path))[0]
+        exclude = os.path.abspath(exclude) if exclude else None
+        
+        candidates = []
+        try:
+            filenames = sorted(os.listdir(video_dir))
+        except OSError:
+            return []
+        
+        for filename in filenames:
+            name, extension = os.path.splitext(filename)
+            if extension.lower() not in self.SIDECAR_EXTENSIONS:
+                continue
+            if name == stem:
+                rank = 0.5
+            elif name.startswith(stem + ".") and "." not in name[len(stem) + 1:]:
+                rank = self._language_rank(name[len(stem) + 1:])
+            else:
+                continue
+            
+            path = os.path.join(video_dir, filename)
+            if path != exclude:
+                candidates.append((rank, path))
+        
+        return [path for _, path in sorted(candidates)]
+    
+    def _convert_to_srt(self, input_args, output_path):
+        """Convert subtitles to SRT with ffmpeg, keeping the result only if it has cues.
+        
+        Args:
+            input_args (list): ffmpeg input arguments (-i, and -map for a stream).
             output_path (str): Path to save the SRT file.
+            
+        Returns:
+            bool: True if output_path now holds subtitles.
+        """
+        temp_output = f"{output_path}.{os.getpid()}.{threading.get_ident()}.tmp.srt"
+        try:
+            ffmpeg_cmd = ["ffmpeg", "-v", "error"] + input_args + ["-c:s", "srt", "-f", "srt", "-y", temp_output]
+            result = subprocess.run(ffmpeg_cmd, capture_output=True, text=True)
+            if result.returncode != 0:
+                return False
+            
+            # Parse directly: the temporary name is unique, so load_cue_index() would only fill its cache
+            with open(temp_output, 'r', encoding='utf-8', errors='replace') as f:
+                if not list(srt.parse(f.read())):
+                    return False
+            
+            os.replace(temp_output, output_path)
+            return True
+        except Exception:
+            return False
+        finally:
+            if os.path.exists(temp_output):
+                os.remove(temp_output)
+    
+    def _estimate_audio_bytes(self, video_path):
+        """Estimate the size of the WAV extracted from a video for Whisper."""
+        ffprobe_cmd = [
+            "ffprobe", "-v", "error", "-show_entries", "format=duration",
+            "-of", "default=noprint_wrappers=1:nokey=1", video_path
+        ]
+        result = subprocess.run(ffprobe_cmd, capture_output=True, text=True)
+        try:
+            duration = float(result.stdout.strip())
+        except ValueError:
+            # Unknown duration: assume the audio is as large as the video
+            return os.path.getsize(video_path)
+        return int(duration * self.AUDIO_BYTES_PER_SECOND * 1.1)
+    
+    def _scratch_dir(self, video_path, output_path, vad=False):
+        """Get a temporary directory for the audio and Whisper output of a transcription.
+        
+        It is in the RAM scratch space when the audio fits (see scratch.py), and
+        next to output_path otherwise; it is deleted when the context exits.
+        """
+        # With VAD, the speech-only copy of the audio may be almost as large
+        copies = 2 if vad else 1
+        return get_scratch_space().directory(
+            "transcription_",
+            copies * self._estimate_audio_bytes(video_path),
+            fallback_dir=os.path.dirname(os.path.abspath(output_path))
+        )
+    
+    def _transcription_cache_key(self, video_path, model, quality_preset, vad=False):
+        """Get the cache key of a transcription: video content, model, preset and VAD."""
+        parts = ['transcription', content_hash(video_path), model, quality_preset]
+        if vad:
+            parts.append('vad')
+        return FileCache.make_key(*parts)
+    
+    def _load_cached_transcription(self, video_path, output_path, model, quality_preset, vad=False):
+        """Copy a cached transcription of video_path to output_path.
+        
+        Returns:
+            bool: True if a cached transcription was found.
+        """
+        if not self.transcription_cache:
+            return False
+        
+        cached_path = self.transcription_cache.get(
+            self._transcription_cache_key(video_path, model, quality_preset, vad)
+        )
+        if not cached_path:
+            return False
+        
+        # Never a hardlink: the output may be edited later
+        materialize(cached_path, output_path, allow_hardlink=False)
+        return True
+    
+    def _save_cached_transcription(self, video_path, srt_path, model, quality_preset, vad=False):
+        """Store a copy of a finished transcription in the cache."""
+        if not self.transcription_cache:
+            return
+        
+        # Not hard-linked, so later edits to srt_path don't reach the cache
+        self.transcription_cache.put(
+            self._transcription_cache_key(video_path, model, quality_preset, vad),
+            srt_path,
+            metadata={'model': model, 'quality_preset': quality_preset, 'vad': vad},
+            allow_hardlink=False
+        )
+    
+    def _run_whisper_on_speech(self, audio_path, output_dir, model="tiny", quality_preset="fast", vad=False):
+        """Run Whisper, skipping the stretches without speech when vad is set.
+        
+        The speech stretches are joined into a shorter WAV next to audio_path,
+        and the cue times of the result are mapped back to the original audio.
+        
+        Returns:
+            str: Path to the generated SRT file.
+        """
+        if not vad:
+            return self._run_whisper(audio_path, output_dir, model, quality_preset)
+        
+        duration = vad_prepass.wav_duration(audio_path)
+        intervals = vad_prepass.speech_intervals(vad_prepass.detect_silences(audio_path), duration)
+        speech_seconds = sum(end - start for start, end in intervals)
+        saved_seconds = duration - speech_seconds
+        
+        if speech_seconds >= duration * vad_prepass.MAX_SPEECH_FRACTION:
+            self.reporter.info("Detecção de voz: quase todo o áudio tem fala; transcrevendo o áudio completo.")
+            return self._run_whisper(audio_path, output_dir, model, quality_preset)
+        
+        percent = 100 * saved_seconds / duration if duration else 0
+        self.reporter.info(f"Detecção de voz: {saved_seconds:.0f}s sem fala ignorados ({percent:.0f}% do áudio).")
+        
+        if not intervals:
+            # Nothing to transcribe: an empty subtitle file
+            generated_srt = os.path.join(output_dir, os.path.splitext(os.path.basename(audio_path))[0] + ".srt")
+            with open(generated_srt, 'w', encoding='utf-8') as f:
+                f.write("")
+            return generated_srt
+        
+        speech_path = os.path.join(os.path.dirname(audio_path), "speech.wav")
+        timeline = vad_prepass.build_speech_audio(audio_path, intervals, speech_path)
+        generated_srt = self._run_whisper(speech_path, output_dir, model, quality_preset)
+        if os.path.exists(generated_srt):
+            vad_prepass.remap_srt(generated_srt, timeline)
+        return generated_srt
+    
+    def _build_whisper_cmd(self, audio_path, output_dir, model="tiny", quality_preset="fast"):
+        """Build the Whisper CLI command for a model and quality preset.
+        
+        Args:
+            audio_path (str): Path to the audio file to transcribe.
+            output_dir (str): Directory where Whisper writes the SRT file.
             model (str): Whisper model to use ('tiny', 'base', 'small', 'medium').
             quality_preset (str): Preset de qualidade ('fast', 'balanced', 'high').
             
         Returns:
-            dict: Status information about the transcription process.
+            tuple: (command list, human-readable description of the mode).
         """
-        # Create status file path
-        status_dir = os.path.dirname(output_path)
-        status_filename = f"transcription_status_{os.path.basename(video_path)}.json"
-        self.status_file = os.path.join(status_dir, status_filename)
+        whisper_cmd = ["whisper", audio_path, "--output_format", "srt", "--output_dir", output_dir]
         
-        # Check for cached transcription
-        video_filename = os.path.basename(video_path)
-        cache_dir = os.path.join(os.path.dirname(output_path), "cache")
-        os.makedirs(cache_dir, exist_ok=True)
-        cache_path = os.path.join(cache_dir, f"{video_filename}.srt")
+        # Add model parameter
+        whisper_cmd.extend(["--model", model])
         
-        # If cached version exists, just return it
-        if os.path.exists(cache_path):
-            with open(cache_path, 'r', encoding='utf-8', errors='replace') as f:
-                content = f.read()
+        # Configure quality settings based on preset
+        options, label = self.WHISPER_PRESETS.get(quality_preset, self.WHISPER_PRESETS['high'])
+        for name, value in options.items():
+            whisper_cmd.extend([f"--{name}", str(value)])
+        
+        return whisper_cmd, f"{label} (modelo {model})"
+    
+    def _run_whisper(self, audio_path, output_dir, model="tiny", quality_preset="fast", in_process=None):
+        """Transcribe an audio file with Whisper into output_dir.
+        
+        Uses the whisper CLI, or the in-memory model when persistent_models is set.
+        
+        Args:
+            audio_path (str): Path to the audio file to transcribe.
+            output_dir (str): Directory where the SRT file is written.
+            model (str): Whisper model to use ('tiny', 'base', 'small', 'medium').
+            quality_preset (str): Preset de qualidade ('fast', 'balanced', 'high').
+            in_process (bool, optional): Use the in-memory model even without
+                persistent_models (it stays loaded until the process exits).
+                Defaults to persistent_models.
+            
+        Returns:
+            str: Path to the generated SRT file (named like the audio file).
+        """
+        generated_srt = os.path.join(output_dir, os.path.splitext(os.path.basename(audio_path))[0] + ".srt")
+        
+        if not (self.persistent_models if in_process is None else in_process):
+            whisper_cmd, _ = self._build_whisper_cmd(audio_path, output_dir, model, quality_preset)
+            result = subprocess.run(whisper_cmd, capture_output=True, text=True)
+            
+            if result.returncode != 0:
+                raise Exception(f"Erro do Whisper: {result.stderr}")
+            
+            return generated_srt
+        
+        options, _ = self.WHISPER_PRESETS.get(quality_preset, self.WHISPER_PRESETS['high'])
+        options = dict(options)
+        
+        # Same temperature fallback as the whisper CLI (+0.2 up to 1.0)
+        temperature = options.pop('temperature')
+        temperatures = []
+        while temperature <= 1.0 + 1e-6:
+            temperatures.append(round(temperature, 1))
+            temperature += 0.2
+        options['temperature'] = tuple(temperatures)
+        
+        whisper_model, model_lock = _get_whisper_model(model)
+        with model_lock:
+            result = whisper_model.transcribe(
+                audio_path, fp16=whisper_model.device.type == "cuda", **options
+            )
+        
+        cues = [
+            srt.Subtitle(
+                index=i + 1,
+                start=datetime.timedelta(seconds=segment['start']),
+                end=datetime.timedelta(seconds=segment['end']),
+                content=segment['text'].strip()
+            )
+            for i, segment in enumerate(result.get('segments', []))
+        ]
+        
+        with open(generated_srt, 'w', encoding='utf-8') as f:
+            f.write(srt.compose(cues))
+        
+        return generated_srt
+    
+    def transcribe_chunk_stream(self, chunk_dir, segment_list_path, output_path, producer,
+                                model="tiny", quality_preset="fast", on_update=None, producer_log=None):
+        """Transcribe audio chunks while another process is still producing them.
+        
+        The producer is an ffmpeg segment muxer writing WAV chunks to chunk_dir and
+        appending each finished chunk to a CSV segment list. Finished chunks are
+        joined into a pending buffer, which is cut at its last silence (see
+        _find_stream_cut()) so no word is split between two transcriptions. Each
+        piece is transcribed right away with the in-memory Whisper model, loaded
+        once for the whole stream, its cues are shifted to the piece's start, and
+        output_path is rewritten (atomically) with all cues so far, so partial
+        subtitles are available long before the download ends.
+        
+        Args:
+            chunk_dir (str): Directory with the audio chunks.
+            segment_list_path (str): CSV segment list written by ffmpeg (filename,start,end).
+            output_path (str): Path to save the SRT file.
+            producer (subprocess.Popen): The process writing the chunks.
+            model (str): Whisper model to use ('tiny', 'base', 'small', 'medium').
+            quality_preset (str): Preset de qualidade ('fast', 'balanced', 'high').
+            on_update (callable, optional): Called as on_update(cue_count, seconds_done)
+                after each transcribed piece.
+            producer_log (str, optional): File with the producer's stderr, quoted
+                in the error when it fails.
             
+        Returns:
+            str: Path to the generated SRT file.
+            
+        Raises:
+            Exception: If the producer exits with an error, even after some
+                pieces were transcribed (output_path would be truncated).
+        """
+        whisper_output_dir = os.path.join(chunk_dir, "whisper_output")
+        os.makedirs(whisper_output_dir, exist_ok=True)
+        
+        all_cues = []
+        done = 0
+        pieces = 0
+        # Áudio recebido e ainda não transcrito, a partir de pending_start segundos
+        pending = bytearray()
+        pending_start = 0.0
+        params = None
+        
+        def transcribe_piece(frame_count):
+            nonlocal pending, pending_start, pieces
+            piece_path = os.path.join(chunk_dir, f"piece_{pieces:05d}.wav")
+            with wave.open(piece_path, 'wb') as piece:
+                piece.setparams(params)
+                piece.writeframes(bytes(pending[:frame_count * params.sampwidth * params.nchannels]))
+            
+            piece_srt = self._run_whisper(piece_path, whisper_output_dir, model, quality_preset, in_process=True)
+            offset = datetime.timedelta(seconds=pending_start)
+            for cue in self._parse_srt_file(piece_srt):
+                all_cues.append(srt.Subtitle(
+                    index=len(all_cues) + 1,
+                    start=cue.start + offset,
+                    end=cue.end + offset,
+                    content=cue.content
+                ))
+            
+            # Write to a temporary file first so readers never see a partial SRT
+            temp_output = f"{output_path}.partial"
+            with open(temp_output, 'w', encoding='utf-8') as f:
+                f.write(srt.compose(all_cues, reindex=False))
+            os.replace(temp_output, output_path)
+            os.remove(piece_path)
+            
+            del pending[:frame_count * params.sampwidth * params.nchannels]
+            pending_start += frame_count / params.framerate
+            pieces += 1
+            if on_update:
+                on_update(len(all_cues), pending_start)
+        
+        while True:
+            producer_finished = producer.poll() is not None
+            entries = self._read_segment_list(segment_list_path)
+            
+            if done >= len(entries):
+                if producer_finished:
+                    break
+                time.sleep(0.5)
+                continue
+            
+            for chunk_filename, _, _ in entries[done:]:
+                chunk_path = os.path.join(chunk_dir, chunk_filename)
+                with wave.open(chunk_path, 'rb') as chunk:
+                    params = params or chunk.getparams()
+                    pending.extend(chunk.readframes(chunk.getnframes()))
+                os.remove(chunk_path)
+                done += 1
+            
+            # Transcription may lag behind the download: catch up piece by piece
+            cut_frame = self._find_stream_cut(chunk_dir, pending, params)
+            while cut_frame:
+                transcribe_piece(cut_frame)
+                cut_frame = self._find_stream_cut(chunk_dir, pending, params)
+        
+        if producer.returncode != 0:
+            details = ""
+            if producer_log and os.path.exists(producer_log):
+                with open(producer_log, 'r', encoding='utf-8', errors='replace') as f:
+                    details = f.read().strip()
+            raise Exception(
+                f"Falha ao receber o áudio para transcrição (código {producer.returncode}, "
+                f"{pieces} trecho(s) transcrito(s)): {details}"
+            )
+        
+        # O restante do áudio, depois do último corte
+        if params and pending:
+            transcribe_piece(len(pending) // (params.sampwidth * params.nchannels))
+        
+        if not os.path.exists(output_path):
+            # Nothing was spoken (or the input was empty): still produce a valid file
             with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(content)
-                
+                f.write("")
+        
+        return output_path
+    
+    def _find_stream_cut(self, work_dir, pending, params):
+        """Find where to cut the pending audio of a streaming transcription.
+        
+        Args:
+            work_dir (str): Directory for the temporary WAV analysed by ffmpeg.
+            pending (bytearray): PCM frames received and not yet transcribed.
+            params (wave._wave_params): Format of the frames.
+            
+        Returns:
+            int: Number of frames to transcribe now (the middle of the last
+                silence after STREAM_MIN_PIECE_SECONDS, or STREAM_MAX_PIECE_SECONDS
+                when there is no pause until then), or 0 to wait for more audio.
+        """
+        if not params:
+            return 0
+        frame_count = len(pending) // (params.sampwidth * params.nchannels)
+        duration = frame_count / params.framerate
+        if duration < self.STREAM_MIN_PIECE_SECONDS:
+            return 0
+        
+        pending_path = os.path.join(work_dir, "pending.wav")
+        with wave.open(pending_path, 'wb') as pending_wav:
+            pending_wav.setparams(params)
+            pending_wav.writeframes(bytes(pending))
+        try:
+            silences = vad_prepass.detect_silences(pending_path, min_silence=self.STREAM_CUT_SILENCE_SECONDS)
+        finally:
+            os.remove(pending_path)
+        
+        # A silence still running at the end may continue in the next chunk: cut at its start plus a margin
+        cuts = [
+            (start + end) / 2 if end is not None else min(duration, start + self.STREAM_CUT_SILENCE_SECONDS)
+            for start, end in silences
+        ]
+        cuts = [
+            cut for cut in cuts
+            if self.STREAM_MIN_PIECE_SECONDS <= cut <= min(duration, self.STREAM_MAX_PIECE_SECONDS)
+        ]
+        if cuts:
+            return int(max(cuts) * params.framerate)
+        if duration >= self.STREAM_MAX_PIECE_SECONDS:
+            return int(self.STREAM_MAX_PIECE_SECONDS * params.framerate)
+        return 0
+    
+    def _read_segment_list(self, segment_list_path):
+        """Read the finished chunks from an ffmpeg CSV segment list.
+        
+        Returns:
+            list: (filename, start, end) tuples, in order.
+        """
+        if not os.path.exists(segment_list_path):
+            return []
+        
+        with open(segment_list_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        
+        # Drop the last line if ffmpeg hasn't finished writing it yet
+        lines = content.split('\n')[:-1]
+        
+        entries = []
+        for line in lines:
+            parts = line.strip().split(',')
+            if len(parts) >= 3:
+                entries.append((parts[0], float(parts[1]), float(parts[2])))
+        
+        return entries
+    
+    def transcribe_video_async(self, video_path, output_path, model="tiny", quality_preset="fast", force_asr=False,
+                               vad=False, progressive=False):
+        """Transcribe a video file using Whisper in a non-blocking way.
+        
+        Args:
+            video_path (str): Path to the video file.
+            output_path (str): Path to save the SRT file.
+            model (str): Whisper model to use ('tiny', 'base', 'small', 'medium').
+            quality_preset (str): Preset de qualidade ('fast', 'balanced', 'high').
+            force_asr (bool): Always run Whisper, even when the video has
+                embedded subtitles.
+            vad (bool): Transcribe only the stretches with speech (see vad.py).
+            progressive (bool): Transcribe a draft with DRAFT_MODEL first. The
+                status is complete (with tier 'draft') as soon as the draft is
+                in output_path; model then refines it in the background, and
+                the status changes to tier 'final' when the refined subtitles
+                have replaced the draft.
+            
+        Returns:
+            dict: Status information about the transcription process.
+        """
+        # Create status file path
+        self.status_file = self._get_status_file(video_path, output_path)
+        
+        # If a cached transcription of this content exists, just return it
+        if self._load_cached_transcription(video_path, output_path, model, quality_preset, vad):
             return {
                 'stage': 'complete',
                 'progress': 100,
                 'message': "✅ Transcrição encontrada em cache!",
                 'complete': True,
-                'result_path': output_path
+                'result_path': output_path,
+                'tier': 'final',
+                'refining': False
             }
         
         # Check if there's an existing status file - this means transcription is in progress
@@ -257,16 +977,37 @@ class SubtitleProcessor:
                 # If there's an error reading the status file, start over
                 pass
         
+        # Embedded subtitles are extracted in milliseconds, no background work needed
+        if not force_asr:
+            source = self.use_existing_subtitles(video_path, output_path)
+            if source:
+                return {
+                    'stage': 'complete',
+                    'progress': 100,
+                    'message': f"✅ Legendas encontradas {source}!",
+                    'complete': True,
+                    'result_path': output_path,
+                    'tier': 'final',
+                    'refining': False
+                }
+        
+        # In progressive mode the thread transcribes the draft first, then refines it
+        refine_model = None
+        if progressive and model != self.DRAFT_MODEL:
+            model, refine_model = self.DRAFT_MODEL, model
+        
         # Initialize status
         status = self.default_status.copy()
         status['stage'] = 'starting'
         status['message'] = "Iniciando processo de transcrição..."
+        if refine_model:
+            status['tier'] = 'draft'
         self._save_status(status)
         
         # Start transcription in a background thread
         thread = threading.Thread(
             target=self._run_transcription_process, 
-            args=(video_path, output_path, model, quality_preset)
+            args=(video_path, output_path, model, quality_preset, vad, refine_model)
         )
         thread.daemon = True  # Thread will exit when main program exits
         thread.start()
@@ -274,15 +1015,51 @@ class SubtitleProcessor:
         # Return initial status
         return status
     
+    def _get_status_file(self, video_path, output_path):
+        """Get the status file of the transcription of video_path into output_path."""
+        status_filename = f"transcription_status_{os.path.basename(video_path)}.json"
+        return os.path.join(os.path.dirname(output_path), status_filename)
+    
+    def read_transcription_status(self, video_path, output_path):
+        """Read the status of a transcription started by transcribe_video_async().
+        
+        Unlike transcribe_video_async(), this never starts a transcription or
+        touches the cache: it is a single small file read, cheap enough to
+        poll every second.
+        
+        Args:
+            video_path (str): Path to the video file.
+            output_path (str): Path of the SRT file being generated.
+            
+        Returns:
+            dict: The status (see default_status), or None if no transcription
+                was started.
+        """
+        try:
+            with open(self._get_status_file(video_path, output_path), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
     def _save_status(self, status):
         """Save transcription status to file."""
         if self.status_file:
-            with open(self.status_file, 'w') as f:
+            # Replace atomically, so pollers never read a half-written file
+            temp_file = f"{self.status_file}.tmp"
+            with open(temp_file, 'w') as f:
                 json.dump(status, f)
+            os.replace(temp_file, self.status_file)
     
-    def _run_transcription_process(self, video_path, output_path, model="tiny", quality_preset="fast"):
-        """Run the transcription process in a background thread with specified model and quality."""
+    def _run_transcription_process(self, video_path, output_path, model="tiny", quality_preset="fast", vad=False,
+                                   refine_model=None):
+        """Run the transcription process in a background thread with specified model and quality.
+        
+        With refine_model, the result is a draft: the status is completed with
+        tier 'draft' and the draft is then refined (see _run_refinement()).
+        """
         status = self.default_status.copy()
+        if refine_model:
+            status['tier'] = 'draft'
         
         try:
             # STEP 1: Extract audio
@@ -291,124 +1068,80 @@ class SubtitleProcessor:
             status['progress'] = 10
             self._save_status(status)
             
-            # Extract audio from video to temporary file
-            temp_audio_file = os.path.join(os.path.dirname(output_path), f"temp_audio_{int(time.time())}.wav")
-            
-            # Use ffmpeg command to extract audio with qualidade melhorada
-            ffmpeg_cmd = [
-                "ffmpeg", "-i", video_path, 
-                "-vn", "-acodec", "pcm_s16le", "-ar", "24000", "-ac", "1",
-                "-af", "highpass=f=200,lowpass=f=3000,volume=1.5",  # Filtro de áudio para melhorar a voz
-                "-y", temp_audio_file
-            ]
-            
-            result = subprocess.run(ffmpeg_cmd, capture_output=True, text=True)
-            
-            if result.returncode != 0:
-                raise Exception(f"Erro ao extrair áudio: {result.stderr}")
-            
-            status['progress'] = 30
-            self._save_status(status)
-            
-            # STEP 2: Transcribe audio
-            status['stage'] = 'transcribing'
-            status['message'] = "⏳ Etapa 2/3: Transcrevendo o áudio (isso pode levar alguns minutos)..."
-            status['progress'] = 40
-            self._save_status(status)
-            
-            # Create directory for Whisper output
-            whisper_output_dir = os.path.join(os.path.dirname(output_path), "whisper_output")
-            os.makedirs(whisper_output_dir, exist_ok=True)
-            
-            # Configure Whisper parameters based on model and quality preset
-            whisper_cmd = ["whisper", temp_audio_file, "--output_format", "srt", "--output_dir", whisper_output_dir]
-            
-            # Add model parameter
-            whisper_cmd.extend(["--model", model])
-            
-            # Configure quality settings based on preset
-            if quality_preset == "fast":
-                # Fastest: Minimalistic settings for speed
-                whisper_cmd.extend([
-                    "--beam_size", "1",             # Smaller beam size = faster
-                    "--best_of", "1",               # Fewer samples = faster
-                    "--condition_on_previous_text", "False",  # Less context = faster
-                    "--temperature", "0"            # No randomness = faster
-                ])
-                mode_info = f"modo rápido (modelo {model})"
-            elif quality_preset == "balanced":
-                # Balanced: Good quality with reasonable speed
-                whisper_cmd.extend([
-                    "--beam_size", "3",             # Medium beam size
-                    "--best_of", "2",               # Consider a few alternatives
-                    "--temperature", "0"            # Still deterministic
-                ])
-                mode_info = f"modo balanceado (modelo {model})"
-            else:  # "high"
-                # High quality: Best settings for accuracy
-                whisper_cmd.extend([
-                    "--beam_size", "5",             # Larger beam size = better quality
-                    "--best_of", "5",               # Consider more alternatives
-                    "--condition_on_previous_text", "True",  # Better context handling
-                    "--temperature", "0.2"          # Slight variability for better results
-                ])
-                mode_info = f"modo alta qualidade (modelo {model})"
-            
-            # Update message to reflect processing mode
-            status['message'] = f"⏳ Etapa 2/3: Transcrevendo o áudio em {mode_info}..."
-            self._save_status(status)
-            
-            # Run whisper
-            result = subprocess.run(whisper_cmd, capture_output=True, text=True)
-            
-            if result.returncode != 0:
-                raise Exception(f"Erro do Whisper: {result.stderr}")
-            
-            status['progress'] = 80
-            self._save_status(status)
-            
-            # STEP 3: Process results
-            status['stage'] = 'finishing'
-            status['message'] = "⏳ Etapa 3/3: Finalizando e salvando as legendas..."
-            self._save_status(status)
-            
-            # The output file will be named like the input audio file but with .srt extension
-            output_filename = os.path.splitext(os.path.basename(temp_audio_file))[0] + ".srt"
-            generated_srt = os.path.join(whisper_output_dir, output_filename)
-            
-            # Check if output file exists
-            if not os.path.exists(generated_srt):
-                raise Exception("Arquivo SRT não foi gerado pelo Whisper.")
-            
-            # Read the file to fix possible encoding issues
-            with open(generated_srt, 'r', encoding='utf-8', errors='replace') as f:
-                content = f.read()
-            
-            # Save to cache
-            cache_dir = os.path.join(os.path.dirname(output_path), "cache")
-            os.makedirs(cache_dir, exist_ok=True)
-            cache_path = os.path.join(cache_dir, f"{os.path.basename(video_path)}.srt")
-            
-            with open(cache_path, 'w', encoding='utf-8') as f:
-                f.write(content)
-            
-            # Write to the requested output path
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(content)
+            with self._scratch_dir(video_path, output_path, vad) as scratch_dir:
+                # Extract audio from video to a temporary file in the scratch space
+                temp_audio_file = os.path.join(scratch_dir, "audio.wav")
+                
+                # Use ffmpeg command to extract audio with qualidade melhorada
+                ffmpeg_cmd = ["ffmpeg", "-i", video_path] + self.AUDIO_EXTRACTION_ARGS + ["-y", temp_audio_file]
+                
+                result = subprocess.run(ffmpeg_cmd, capture_output=True, text=True)
+                
+                if result.returncode != 0:
+                    raise Exception(f"Erro ao extrair áudio: {result.stderr}")
+                
+                status['progress'] = 30
+                self._save_status(status)
+                
+                # STEP 2: Transcribe audio
+                status['stage'] = 'transcribing'
+                status['message'] = "⏳ Etapa 2/3: Transcrevendo o áudio (isso pode levar alguns minutos)..."
+                status['progress'] = 40
+                self._save_status(status)
+                
+                # Create directory for Whisper output
+                whisper_output_dir = os.path.join(scratch_dir, "whisper_output")
+                os.makedirs(whisper_output_dir, exist_ok=True)
+                
+                # Configure Whisper parameters based on model and quality preset
+                _, mode_info = self._build_whisper_cmd(temp_audio_file, whisper_output_dir, model, quality_preset)
+                
+                # Update message to reflect processing mode
+                status['message'] = f"⏳ Etapa 2/3: Transcrevendo o áudio em {mode_info}..."
+                self._save_status(status)
+                
+                # Run whisper
+                # The output file will be named like the input audio file but with .srt extension
+                generated_srt = self._run_whisper_on_speech(
+                    temp_audio_file, whisper_output_dir, model, quality_preset, vad
+                )
+                
+                status['progress'] = 80
+                self._save_status(status)
+                
+                # STEP 3: Process results
+                status['stage'] = 'finishing'
+                status['message'] = "⏳ Etapa 3/3: Finalizando e salvando as legendas..."
+                self._save_status(status)
+                
+                # Check if output file exists
+                if not os.path.exists(generated_srt):
+                    raise Exception("Arquivo SRT não foi gerado pelo Whisper.")
+                
+                # Read the file to fix possible encoding issues
+                with open(generated_srt, 'r', encoding='utf-8', errors='replace') as f:
+                    content = f.read()
+                
+                # Write to the requested output path
+                with open(output_path, 'w', encoding='utf-8') as f:
+                    f.write(content)
+                
+                # Save to cache
+                self._save_cached_transcription(video_path, output_path, model, quality_preset, vad)
             
             status['progress'] = 90
             self._save_status(status)
             
-            # Clean up temp files
-            if os.path.exists(temp_audio_file):
-                os.remove(temp_audio_file)
-            
             # Complete status
             status['progress'] = 100
             status['stage'] = 'complete'
-            status['message'] = "✅ Transcrição concluída com sucesso!"
             status['complete'] = True
             status['result_path'] = output_path
+            if refine_model:
+                status['message'] = f"✅ Rascunho pronto! Refinando com o modelo {refine_model} em segundo plano..."
+                status['refining'] = True
+            else:
+                status['message'] = "✅ Transcrição concluída com sucesso!"
             self._save_status(status)
             
         except Exception as e:
@@ -421,6 +1154,30 @@ class SubtitleProcessor:
             # Create a dummy SRT file on error
             with open(output_path, 'w', encoding='utf-8') as f:
                 f.write("1\n00:00:00,000 --> 00:00:05,000\nErro na transcrição: " + error_msg)
+            return
+        
+        if refine_model:
+            self._run_refinement(video_path, output_path, refine_model, quality_preset, vad, status)
+    
+    def _run_refinement(self, video_path, output_path, model, quality_preset, vad, status):
+        """Refine a draft transcription in the background thread.
+        
+        The draft stays usable throughout: it is only replaced (atomically)
+        once the refined subtitles are complete, and kept if refining fails.
+        """
+        try:
+            # Nobody watches the reporter from this thread; progress goes to the status file
+            self.with_reporter(ProgressReporter())._refine_transcription(
+                video_path, output_path, model, quality_preset, vad
+            )
+            status['tier'] = 'final'
+            status['message'] = f"✅ Legendas refinadas com o modelo {model}!"
+        except Exception as e:
+            status['refine_error'] = str(e)
+            status['message'] = f"⚠️ Não foi possível refinar as legendas; o rascunho foi mantido. ({str(e)})"
+        
+        status['refining'] = False
+        self._save_status(status)
     
     def _parse_srt_file(self, srt_file_path):
         """Parse an SRT file to get subtitle segments.
@@ -437,7 +1194,7 @@ class SubtitleProcessor:
             
             return list(srt.parse(content))
         except Exception as e:
-            st.error(f"Erro ao analisar arquivo SRT: {str(e)}")
+            self.reporter.error(f"Erro ao analisar arquivo SRT: {str(e)}")
             return []
     
     def extract_subtitle_segment(self, subtitle_path, output_path, start_time, end_time):
@@ -453,12 +1210,8 @@ class SubtitleProcessor:
             str: Path to the output subtitle segment.
         """
         try:
-            # Read the SRT file
-            with open(subtitle_path, 'r', encoding='utf-8') as f:
-                subtitle_content = f.read()
-            
-            # Parse the subtitles
-            subtitles = list(srt.parse(subtitle_content))
+            # Parsed once per version of the file, however many segments are cut from it
+            subtitles = load_cue_index(subtitle_path)
             
             # Filter subtitles within the segment timeframe
             segment_subtitles = []
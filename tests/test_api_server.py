@@ -0,0 +1,184 @@
+"""The HTTP API validates requests, streams job events and expires the files it stores."""
+import json
+import os
+import time
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+import api_server
+import jobs
+from workspace import WorkspaceManager
+
+
+@pytest.fixture
+def api(tmp_path):
+    storage = WorkspaceManager(str(tmp_path), session_quota_bytes=1024, total_quota_bytes=4096, ttl_seconds=60)
+    server, base_url = api_server.serve_in_background(port=0, root_dir=str(tmp_path), storage=storage)
+    yield server, base_url
+    server.shutdown()
+    server.server_close()
+    server.queue.shutdown()
+
+
+def request(method, url, data=None):
+    req = urllib.request.Request(url, data=data, method=method)
+    try:
+        with urllib.request.urlopen(req, timeout=10) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def upload(base_url, content=b"1\n00:00:00,000 --> 00:00:01,000\nOi\n", name="legendas.srt"):
+    return request("PUT", f"{base_url}/uploads/{name}", data=content)
+
+
+@pytest.mark.parametrize("body", [b"[]", b'"x"', b'{"type": "embed", "params": [1]}'])
+def test_non_object_body_is_rejected(api, body):
+    _, base_url = api
+
+    status, answer = request("POST", f"{base_url}/jobs", data=body)
+
+    assert status == 400
+    assert 'error' in answer
+
+
+@pytest.mark.parametrize("style", [
+    {'fontsize': "24':drawtext=textfile=/etc/passwd"},
+    {'fontname': "Arial,drawbox"},
+    {'filter_complex': 1},
+    "fontsize=24",
+])
+def test_embed_with_unsafe_style_is_rejected(api, style):
+    _, base_url = api
+    _, uploaded = upload(base_url)
+
+    status, _ = request("POST", f"{base_url}/jobs", data=json.dumps({
+        'type': 'embed',
+        'params': {'input': uploaded['path'], 'subtitle': uploaded['path'], 'subtitle_style': style}
+    }).encode('utf-8'))
+
+    assert status == 400
+
+
+def test_embed_workers_are_capped_to_cpu_count(api):
+    params = {'workers': 10000}
+    api_server._check_job_params('embed', params)
+    assert params['workers'] == (os.cpu_count() or 1)
+
+    with pytest.raises(Exception):
+        api_server._check_job_params('embed', {'workers': 'muitos'})
+
+
+def test_upload_over_quota_is_refused(api):
+    _, base_url = api
+
+    status, _ = upload(base_url, content=b"x" * 2048, name="grande.mp4")
+
+    assert status == 413
+
+
+def test_expired_uploads_are_collected(api):
+    server, base_url = api
+    status, uploaded = upload(base_url)
+    assert status == 201
+    assert os.path.exists(uploaded['path'])
+
+    server.storage.collect_garbage(now=time.time() + 120)
+
+    assert not os.path.exists(uploaded['path'])
+
+
+def read_events(base_url, job_id, last_event_id=None, stop_after=None):
+    """Follow /jobs/<id>/events, returning (id, event) pairs."""
+    headers = {'Last-Event-ID': str(last_event_id)} if last_event_id is not None else {}
+    req = urllib.request.Request(f"{base_url}/jobs/{job_id}/events", headers=headers)
+    events = []
+    with urllib.request.urlopen(req, timeout=10) as stream:
+        fields = {}
+        for line in stream:
+            line = line.decode('utf-8').rstrip('\n')
+            if line:
+                name, _, value = line.partition(': ')
+                fields[name] = value
+                continue
+            if 'data' in fields:
+                events.append((int(fields['id']), json.loads(fields['data'])))
+                if len(events) == stop_after:
+                    break
+            fields = {}
+    return events
+
+
+@pytest.fixture
+def stub_probe(monkeypatch):
+    """A probe job that reports progress, waits for 'release' and writes a file."""
+    release = threading.Event()
+
+    def probe(video_processor, params):
+        bar = video_processor.reporter.progress_bar()
+        for value in range(0, 100, 20):
+            bar.progress(value)
+        release.wait(10)
+        for value in range(100, 200, 20):
+            bar.progress(value)
+        with open(params['output'], 'w', encoding='utf-8') as f:
+            f.write('{"duration": 12.5}')
+        return {'duration': 12.5}
+
+    monkeypatch.setitem(jobs.JOB_HANDLERS, 'probe', probe)
+    monkeypatch.setitem(api_server.OUTPUT_PARAMS, 'probe', ('output', 'duracao.json'))
+    return release
+
+
+def test_job_events_resume_and_artifact_download(api, stub_probe):
+    _, base_url = api
+    _, uploaded = upload(base_url, name="video.mp4")
+
+    status, submitted = request("POST", f"{base_url}/jobs", data=json.dumps({
+        'type': 'probe', 'params': {'input': uploaded['path']}
+    }).encode('utf-8'))
+    assert status == 202
+
+    # The connection drops after three events; the client reconnects with Last-Event-ID
+    first = read_events(base_url, submitted['id'], stop_after=3)
+    stub_probe.set()
+    rest = read_events(base_url, submitted['id'], last_event_id=first[-1][0])
+
+    events = first + rest
+    assert [event_id for event_id, _ in events] == list(range(11))
+    assert [event['value'] for _, event in events[:-1]] == list(range(0, 200, 20))
+    assert events[-1][1] == {'event': 'result', 'result': {'duration': 12.5}}
+
+    status, job = request("GET", f"{base_url}/jobs/{submitted['id']}")
+    assert status == 200 and job['status'] == 'complete'
+    assert [artifact['name'] for artifact in job['artifacts']] == ['duracao.json']
+    with urllib.request.urlopen(f"{base_url}{job['artifacts'][0]['url']}", timeout=10) as response:
+        assert json.loads(response.read()) == {'duration': 12.5}
+
+
+def test_job_events_are_capped(tmp_path, stub_probe):
+    stub_probe.set()
+    storage = WorkspaceManager(str(tmp_path), session_quota_bytes=1024, total_quota_bytes=4096, ttl_seconds=60)
+    queue = jobs.JobQueue(max_events=4)
+    server, base_url = api_server.serve_in_background(port=0, root_dir=str(tmp_path), queue=queue, storage=storage)
+    try:
+        _, uploaded = upload(base_url, name="video.mp4")
+        _, submitted = request("POST", f"{base_url}/jobs", data=json.dumps({
+            'type': 'probe', 'params': {'input': uploaded['path']}
+        }).encode('utf-8'))
+
+        events = read_events(base_url, submitted['id'])
+        # A client resuming from a dropped event continues from the oldest one kept
+        resumed = read_events(base_url, submitted['id'], last_event_id=2)
+    finally:
+        server.shutdown()
+        server.server_close()
+        queue.shutdown()
+
+    assert [event_id for event_id, _ in events] == [7, 8, 9, 10]
+    assert events[-1][1]['event'] == 'result'
+    assert resumed == events
@@ -0,0 +1,16 @@
+"""The CLI starts within its time budget without loading heavy modules."""
+import pytest
+
+import cli
+
+
+def test_help_starts_within_budget_without_heavy_modules():
+    report = cli.measure_startup(['--help'], runs=3)
+
+    assert report['heavy'] == []
+    assert report['seconds'] <= cli.STARTUP_BUDGET_SECONDS
+
+
+def test_crashing_cli_is_not_reported_as_fast():
+    with pytest.raises(Exception, match="código 2"):
+        cli.measure_startup(['--opcao-inexistente'], runs=1)
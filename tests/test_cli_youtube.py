@@ -0,0 +1,39 @@
+"""youtube --audio-only --output keeps the extension of the downloaded audio."""
+import argparse
+
+import pytest
+
+import cli
+
+
+@pytest.fixture
+def fake_download(monkeypatch):
+    def run_job(args, job_type, params):
+        audio_path = f"{params['output_dir']}/youtube_audio_ID.m4a"
+        with open(audio_path, 'wb') as f:
+            f.write(b"audio m4a")
+        return {'media_path': audio_path}
+
+    monkeypatch.setattr(cli, "run_job", run_job)
+
+
+def youtube_args(output, audio_only=True):
+    return argparse.Namespace(
+        url="https://www.youtube.com/watch?v=ID", output=output, transcribe=False, quality='medium',
+        fragments=None, audio_only=audio_only, stream=False, model='tiny', no_daemon=True
+    )
+
+
+def test_audio_only_output_gets_the_downloaded_extension(fake_download, tmp_path, capsys):
+    assert cli.download_youtube(youtube_args(str(tmp_path / "aula.mp4")))
+
+    assert (tmp_path / "aula.m4a").read_bytes() == b"audio m4a"
+    assert not (tmp_path / "aula.mp4").exists()
+    assert "aula.m4a" in capsys.readouterr().out
+
+
+def test_audio_only_output_with_the_right_extension_is_kept(fake_download, tmp_path, capsys):
+    assert cli.download_youtube(youtube_args(str(tmp_path / "aula.M4A")))
+
+    assert (tmp_path / "aula.M4A").read_bytes() == b"audio m4a"
+    assert "extensão" not in capsys.readouterr().out
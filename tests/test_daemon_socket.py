@@ -0,0 +1,58 @@
+"""The CLI only talks to daemon sockets that belong to the current user."""
+import os
+import socket
+
+import pytest
+
+import daemon_server
+
+
+@pytest.fixture
+def make_socket(tmp_path):
+    sockets = []
+
+    def make(directory, mode=0o700):
+        directory.mkdir(exist_ok=True)
+        os.chmod(directory, mode)
+        path = str(directory / "d.sock")
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(path)
+        server.listen(1)
+        sockets.append(server)
+        return path
+
+    yield make
+    for server in sockets:
+        server.close()
+
+
+def test_own_socket_in_private_directory_is_trusted(make_socket, tmp_path):
+    path = make_socket(tmp_path / "privado")
+
+    assert daemon_server.is_trusted_socket(path)
+    assert daemon_server.is_running(path)
+
+
+def test_socket_in_world_writable_directory_is_rejected(make_socket, tmp_path):
+    path = make_socket(tmp_path / "aberto", mode=0o777)
+
+    assert not daemon_server.is_trusted_socket(path)
+    assert not daemon_server.is_running(path)
+    with pytest.raises(Exception, match="não pertence"):
+        daemon_server.send_request('ping', socket_path=path)
+
+
+def test_regular_file_is_not_a_socket(tmp_path):
+    path = tmp_path / "d.sock"
+    path.write_text("")
+
+    assert not daemon_server.is_trusted_socket(str(path))
+
+
+@pytest.mark.skipif(os.getuid() != 0, reason="mudar o dono do socket exige root")
+def test_socket_of_another_user_is_rejected(make_socket, tmp_path):
+    path = make_socket(tmp_path / "privado")
+    os.chown(path, 12345, 12345)
+
+    assert not daemon_server.is_trusted_socket(path)
+    assert not daemon_server.is_running(path)
@@ -0,0 +1,94 @@
+"""An interrupted download resumes from its .part file instead of starting over."""
+import os
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("yt_dlp")
+
+import video_processor
+from video_processor import VideoProcessor
+
+PAYLOAD = bytes(range(256)) * 4096   # 1 MiB
+HALF = len(PAYLOAD) // 2
+
+
+class VideoHandler(BaseHTTPRequestHandler):
+    """Serves PAYLOAD as video/mp4 with Range support.
+
+    While the server is 'broken', no byte past HALF is ever sent: the
+    connection is closed there, and requests starting at HALF fail.
+    """
+
+    def do_GET(self):
+        server = self.server
+        start = 0
+        match = re.match(r"bytes=(\d+)-", self.headers.get('Range', ''))
+        if match:
+            start = int(match.group(1))
+        server.requests.append(start)
+
+        if server.broken and start >= HALF:
+            self.send_error(503)
+            return
+
+        self.send_response(206 if start else 200)
+        self.send_header('Content-Type', 'video/mp4')
+        self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('Content-Length', str(len(PAYLOAD) - start))
+        if start:
+            self.send_header('Content-Range', f"bytes {start}-{len(PAYLOAD) - 1}/{len(PAYLOAD)}")
+        self.end_headers()
+
+        end = HALF if server.broken else len(PAYLOAD)
+        try:
+            self.wfile.write(PAYLOAD[start:end])
+            server.bytes_sent += end - start
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        if server.broken:
+            self.close_connection = True
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def video_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), VideoHandler)
+    server.broken = True
+    server.requests = []
+    server.bytes_sent = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    video_processor.clear_caches()
+    yield server
+    server.shutdown()
+    server.server_close()
+    video_processor.clear_caches()
+
+
+def test_interrupted_download_resumes_from_part_file(video_server, tmp_path):
+    url = f"http://127.0.0.1:{video_server.server_address[1]}/video.mp4"
+    processor = VideoProcessor(download_cache=False, segment_cache=False)
+
+    # The connection drops halfway: the download fails and leaves the .part file
+    with pytest.raises(Exception):
+        processor.download_youtube_video(url, str(tmp_path))
+    part_files = [name for name in os.listdir(tmp_path) if name.endswith('.part')]
+    assert len(part_files) == 1
+    assert os.path.getsize(tmp_path / part_files[0]) == HALF
+
+    # Once the server is back, only the missing half is requested
+    video_server.broken = False
+    video_server.requests.clear()
+    video_server.bytes_sent = 0
+    output_path = processor.download_youtube_video(url, str(tmp_path))
+
+    with open(output_path, 'rb') as f:
+        assert f.read() == PAYLOAD
+    assert video_server.requests == [HALF]
+    assert video_server.bytes_sent == len(PAYLOAD) - HALF
+    assert not any(name.endswith('.part') for name in os.listdir(tmp_path))
@@ -0,0 +1,41 @@
+"""Embedded subtitle detection: forced tracks are skipped and conversions aren't cached."""
+import json
+import subprocess
+
+import subtitle_processor
+from subtitle_processor import SubtitleProcessor
+
+
+def _completed(stdout="", returncode=0):
+    return subprocess.CompletedProcess(args=[], returncode=returncode, stdout=stdout, stderr="")
+
+
+def test_forced_tracks_are_skipped(monkeypatch):
+    streams = [
+        {'index': 2, 'codec_name': 'ass', 'tags': {'language': 'por', 'title': 'Signs & Songs'}},
+        {'index': 3, 'codec_name': 'subrip', 'tags': {'language': 'por'}, 'disposition': {'forced': 1}},
+        {'index': 4, 'codec_name': 'subrip', 'tags': {'language': 'eng'}, 'disposition': {'forced': 0}},
+        {'index': 5, 'codec_name': 'subrip', 'tags': {'language': 'por', 'title': 'Completa'}},
+    ]
+    monkeypatch.setattr(subtitle_processor.subprocess, "run",
+                        lambda cmd, **kwargs: _completed(json.dumps({'streams': streams})))
+
+    found = SubtitleProcessor().find_subtitle_streams("video.mkv")
+
+    assert [stream['index'] for stream in found] == [5, 4]
+
+
+def test_converted_subtitles_are_not_cached(monkeypatch, tmp_path):
+    def fake_ffmpeg(cmd, **kwargs):
+        with open(cmd[-1], 'w', encoding='utf-8') as f:
+            f.write("1\n00:00:00,000 --> 00:00:01,000\nOlá\n")
+        return _completed()
+
+    monkeypatch.setattr(subtitle_processor.subprocess, "run", fake_ffmpeg)
+    subtitle_processor.clear_caches()
+    output_path = tmp_path / "legendas.srt"
+
+    assert SubtitleProcessor()._convert_to_srt(["-i", "video.mkv"], str(output_path))
+    assert output_path.read_text(encoding="utf-8").strip().endswith("Olá")
+    assert subtitle_processor._load_cue_index_cached.cache_info().currsize == 0
+    assert list(tmp_path.iterdir()) == [output_path]
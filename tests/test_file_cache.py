@@ -0,0 +1,61 @@
+"""FileCache keeps a consistent index when several processes share it."""
+import os
+import multiprocessing
+
+import pytest
+
+from file_cache import FileCache
+
+
+def _put_many(cache_dir, worker, count):
+    cache = FileCache(cache_dir, max_bytes=1 << 30)
+    for i in range(count):
+        src_path = os.path.join(cache_dir, f"src_{worker}_{i}.bin")
+        with open(src_path, 'wb') as f:
+            f.write(os.urandom(64))
+        cache.put(FileCache.make_key(worker, i), src_path)
+
+
+def test_concurrent_puts_from_processes_keep_every_entry(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    os.makedirs(cache_dir)
+    context = multiprocessing.get_context("fork")
+    processes = [context.Process(target=_put_many, args=(cache_dir, worker, 25)) for worker in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    cache = FileCache(cache_dir, max_bytes=1 << 30)
+    for worker in range(4):
+        for i in range(25):
+            assert cache.get(FileCache.make_key(worker, i)) is not None
+
+
+def test_put_does_not_hardlink_the_source(tmp_path):
+    src_path = tmp_path / "video.mp4"
+    src_path.write_bytes(b"original")
+    cache = FileCache(str(tmp_path / "cache"), max_bytes=1 << 20)
+
+    cached_path = cache.put("key", str(src_path))
+    with open(src_path, 'r+b') as f:
+        f.write(b"EDITADO!")
+
+    with open(cached_path, 'rb') as f:
+        assert f.read() == b"original"
+
+
+def test_entry_written_through_a_hardlink_is_dropped(tmp_path):
+    src_path = tmp_path / "segment.mp4"
+    src_path.write_bytes(b"original")
+    cache = FileCache(str(tmp_path / "cache"), max_bytes=1 << 20)
+
+    cached_path = cache.put("key", str(src_path), allow_hardlink=True)
+    if not os.path.samefile(src_path, cached_path):
+        pytest.skip("o sistema de arquivos não permitiu o hardlink")
+    with open(src_path, 'r+b') as f:
+        f.write(b"EDITADO! e maior")
+
+    assert cache.get("key") is None
+    assert not os.path.exists(cached_path)
+    assert src_path.read_bytes() == b"EDITADO! e maior"
@@ -0,0 +1,81 @@
+"""HLS fragments are fetched --fragments at a time, and the result is complete."""
+import os
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("yt_dlp")
+
+import video_processor
+from video_processor import VideoProcessor
+
+FRAGMENTS = 12
+FRAGMENT_DELAY = 0.1
+
+
+def fragment_payload(index):
+    return bytes([index]) * 64 * 1024
+
+
+class PlaylistHandler(BaseHTTPRequestHandler):
+    """Serves an HLS playlist whose fragments each take FRAGMENT_DELAY to start."""
+
+    def do_GET(self):
+        server = self.server
+        if self.path.endswith('.m3u8'):
+            body = "#EXTM3U\n#EXT-X-VERSION:3\n#EXT-X-TARGETDURATION:4\n#EXT-X-MEDIA-SEQUENCE:0\n"
+            body += "".join(f"#EXTINF:4.0,\nfrag{i}.ts\n" for i in range(FRAGMENTS))
+            body = (body + "#EXT-X-ENDLIST\n").encode()
+            content_type = 'application/vnd.apple.mpegurl'
+        else:
+            with server.lock:
+                server.active += 1
+                server.max_active = max(server.max_active, server.active)
+            time.sleep(FRAGMENT_DELAY)
+            with server.lock:
+                server.active -= 1
+            body = fragment_payload(int(self.path.rsplit('frag', 1)[1].split('.')[0]))
+            content_type = 'video/mp2t'
+
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def hls_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), PlaylistHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.active = 0
+    server.max_active = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    video_processor.clear_caches()
+    yield server
+    server.shutdown()
+    server.server_close()
+    video_processor.clear_caches()
+
+
+@pytest.mark.parametrize("fragments", [1, 4])
+def test_fragments_are_downloaded_concurrently(hls_server, tmp_path, fragments):
+    url = f"http://127.0.0.1:{hls_server.server_address[1]}/playlist.m3u8"
+    processor = VideoProcessor(download_cache=False, segment_cache=False)
+
+    output_path = processor.download_youtube_video(url, str(tmp_path), concurrent_fragments=fragments)
+
+    assert hls_server.max_active == fragments
+    with open(output_path, 'rb') as f:
+        assert f.read() == b"".join(fragment_payload(i) for i in range(FRAGMENTS))
+    assert not any(name.endswith(('.part', '.ytdl')) for name in os.listdir(tmp_path))
@@ -0,0 +1,40 @@
+"""Regenerating segment subtitles discards the videos burned from the old ones."""
+import os
+
+from video_processor import VideoProcessor
+
+
+SRT = """1
+00:00:01,000 --> 00:00:02,000
+{first}
+
+2
+00:00:11,000 --> 00:00:12,000
+{second}
+"""
+
+
+def test_resplit_drops_stale_burned_videos(tmp_path):
+    subtitle_path = tmp_path / "legendas.srt"
+    subtitle_path.write_text(SRT.format(first="rascunho um", second="rascunho dois"), encoding="utf-8")
+
+    segments = []
+    for i, (start, end) in enumerate([(0, 10), (10, 20)]):
+        embedded = tmp_path / f"embedded_segment_{i + 1}.mp4"
+        embedded.write_bytes(b"video com legendas antigas")
+        segments.append({
+            'video_path': str(tmp_path / f"segment_{i + 1}.mp4"),
+            'subtitle_path': str(tmp_path / f"segment_{i + 1}.srt"),
+            'start_time': start,
+            'end_time': end,
+            'embedded_path': str(embedded),
+        })
+
+    subtitle_path.write_text(SRT.format(first="refinado um", second="refinado dois"), encoding="utf-8")
+    processor = VideoProcessor(download_cache=False, segment_cache=False)
+    processor.resplit_subtitles(segments, str(subtitle_path))
+
+    for i, segment in enumerate(segments):
+        assert 'embedded_path' not in segment
+        assert not os.path.exists(tmp_path / f"embedded_segment_{i + 1}.mp4")
+    assert "refinado dois" in open(segments[1]['subtitle_path'], encoding="utf-8").read()
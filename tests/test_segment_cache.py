@@ -0,0 +1,74 @@
+"""Re-splitting only extracts the segments whose bounds changed."""
+import os
+
+import pytest
+
+import artifact_store
+from file_cache import FileCache
+from video_processor import VideoProcessor
+
+
+SRT = "1\n00:00:05,000 --> 00:00:06,000\nOlá\n"
+
+
+@pytest.fixture
+def processor(tmp_path, monkeypatch):
+    def no_reflink(src_path, dst_path):
+        raise OSError("sem reflink")
+
+    def fake_extract(self, input_path, output_path, start_time, duration, quality="medium"):
+        self.extracted.append((round(start_time, 3), round(start_time + duration, 3)))
+        with open(output_path, 'w') as f:
+            f.write(f"{start_time:.3f}-{start_time + duration:.3f}")
+
+    # A filesystem without reflinks: the segment and its cache entry are hardlinked
+    monkeypatch.setattr(artifact_store, "reflink", no_reflink)
+    monkeypatch.setattr(VideoProcessor, "get_video_duration", lambda self, path: 100.0)
+    monkeypatch.setattr(VideoProcessor, "_extract_video_segment", fake_extract)
+
+    processor = VideoProcessor(download_cache=False, segment_cache=FileCache(str(tmp_path / "cache"), 1 << 20))
+    processor.extracted = []
+    return processor
+
+
+@pytest.fixture
+def inputs(tmp_path):
+    video_path = tmp_path / "video.mp4"
+    video_path.write_bytes(b"video")
+    subtitle_path = tmp_path / "legendas.srt"
+    subtitle_path.write_text(SRT, encoding='utf-8')
+    return str(video_path), str(subtitle_path), str(tmp_path / "saida")
+
+
+def test_moved_timestamp_reextracts_only_its_segments(processor, inputs):
+    processor.split_video_custom_timestamps(*inputs[:2], [20, 40, 60], inputs[2])
+    assert processor.extracted == [(0, 20), (20, 40), (40, 60), (60, 100)]
+
+    processor.extracted.clear()
+    segments = processor.split_video_custom_timestamps(*inputs[:2], [20, 45, 60], inputs[2])
+
+    assert processor.extracted == [(20, 45), (45, 60)]
+    with open(segments[1]['video_path']) as f:
+        assert f.read() == "20.000-45.000"
+
+
+def test_new_timestamp_reuses_cached_segments_at_other_positions(processor, inputs):
+    processor.split_video_custom_timestamps(*inputs[:2], [20, 40], inputs[2])
+    processor.extracted.clear()
+
+    # Every segment after the new cut moves to another file, but comes from the cache
+    segments = processor.split_video_custom_timestamps(*inputs[:2], [10, 20, 40], inputs[2])
+
+    assert processor.extracted == [(0, 10), (10, 20)]
+    with open(segments[3]['video_path']) as f:
+        assert f.read() == "40.000-100.000"
+
+
+def test_fresh_segment_shares_its_bytes_with_the_cache(processor, inputs, tmp_path):
+    segments = processor.split_video_custom_timestamps(*inputs[:2], [50], inputs[2])
+
+    cache_dir = tmp_path / "cache"
+    cached = [cache_dir / name for name in os.listdir(cache_dir) if name.endswith('.mp4')]
+    assert len(cached) == 2
+    for segment in segments:
+        assert any(os.path.samefile(segment['video_path'], path) for path in cached)
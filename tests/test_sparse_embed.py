@@ -0,0 +1,117 @@
+"""Sparse subtitle burning: span selection, keyframe times and chunk compatibility."""
+import datetime
+import os
+import shutil
+import subprocess
+
+import pytest
+import srt
+
+import video_processor
+from video_processor import VideoProcessor
+
+
+def _cue(start, end):
+    return srt.Subtitle(index=None, start=datetime.timedelta(seconds=start),
+                        end=datetime.timedelta(seconds=end), content="legenda")
+
+
+@pytest.fixture
+def processor():
+    return VideoProcessor(download_cache=False, segment_cache=False)
+
+
+KEYFRAMES = [0.0, 2.0, 4.0, 6.0, 8.0, 10.0, 12.0, 14.0, 16.0, 18.0]
+
+
+def test_burn_spans_widen_cues_to_keyframes(processor):
+    spans = processor._get_burn_spans([_cue(3.1, 4.5), _cue(11.0, 11.5)], KEYFRAMES, 20.0)
+    assert spans == [(2.0, 6.0), (10.0, 12.0)]
+
+
+def test_burn_spans_merge_short_gaps_and_clamp_to_duration(processor):
+    # Gap shorter than MIN_COPY_SECONDS: one span; the last cue runs past the end
+    cues = [_cue(3.0, 4.0), _cue(5.0, 5.5), _cue(18.5, 25.0)]
+    assert processor._get_burn_spans(cues, KEYFRAMES, 20.0) == [(2.0, 6.0), (18.0, 20.0)]
+
+
+def test_burn_spans_join_spans_sharing_a_keyframe(processor):
+    # Cues in neighbouring GOPs widen to touching spans, which are merged
+    spans = processor._get_burn_spans([_cue(2.5, 3.5), _cue(5.6, 7.0)], KEYFRAMES, 20.0)
+    assert spans == [(2.0, 8.0)]
+
+
+def test_burn_spans_ignore_empty_and_out_of_range_cues(processor):
+    assert processor._get_burn_spans([_cue(5.0, 5.0), _cue(25.0, 26.0)], KEYFRAMES, 20.0) == []
+    assert processor._get_burn_spans([], KEYFRAMES, 20.0) == []
+
+
+def test_keyframe_times_are_relative_to_the_stream_start(monkeypatch, processor):
+    packets = "11.400000,K__\n11.440000,___\n13.400000,K__\n15.400000,K_\nN/A,K__\n"
+    monkeypatch.setattr(video_processor.subprocess, "run",
+                        lambda cmd, **kwargs: subprocess.CompletedProcess(cmd, 0, stdout=packets, stderr=""))
+
+    assert processor._get_keyframe_times("video.ts", start_time=11.4) == [0.0, 2.0, 4.0]
+
+    # With the raw times the cue at 3 s would fall outside every span of the video
+    keyframes = processor._get_keyframe_times("video.ts", start_time=11.4)
+    assert processor._get_burn_spans([_cue(3.0, 3.5)], keyframes, 6.0) == [(2.0, 4.0)]
+
+
+def test_encoder_args_copy_the_source_settings(processor):
+    args = processor._sparse_encoder_args({
+        'codec_name': 'h264', 'profile': 'High', 'level': 41, 'refs': 3, 'pix_fmt': 'yuv420p',
+        'width': 1440, 'height': 1080, 'sample_aspect_ratio': '4:3'
+    })
+    options = dict(zip(args[::2], args[1::2]))
+
+    assert options['-profile:v'] == 'high'
+    assert options['-level'] == '4.1'
+    assert options['-s'] == '1440x1080'
+    assert options['-aspect'] == '5760:3240'
+    assert options['-refs'] == '3'
+    assert options['-bsf:v'] == 'h264_mp4toannexb'
+    assert options['-x264-params'] == 'repeat-headers=1:cabac=1:8x8dct=1'
+
+
+@pytest.mark.parametrize("stream_info", [
+    {'codec_name': 'hevc', 'profile': 'Main', 'level': 120, 'pix_fmt': 'yuv420p', 'width': 640, 'height': 360},
+    {'codec_name': 'h264', 'profile': 'High 4:4:4 Intra', 'level': 40, 'pix_fmt': 'yuv444p', 'width': 640, 'height': 360},
+    {'codec_name': 'h264', 'profile': 'Main', 'level': 0, 'pix_fmt': 'yuv420p', 'width': 640, 'height': 360},
+    {'codec_name': 'h264', 'profile': 'Main', 'level': 31, 'pix_fmt': 'yuv420p'},
+])
+def test_incompatible_sources_use_the_parallel_mode(processor, stream_info):
+    assert processor._sparse_encoder_args(stream_info) is None
+
+
+def test_chunk_must_match_the_source(processor):
+    source = {'codec_name': 'h264', 'profile': 'Main', 'level': 31, 'width': 640, 'height': 360,
+              'pix_fmt': 'yuv420p', 'sample_aspect_ratio': '1:1'}
+    assert processor._chunk_matches_source(dict(source, sample_aspect_ratio=None), source)
+    assert not processor._chunk_matches_source(dict(source, profile='Constrained Baseline'), source)
+    assert not processor._chunk_matches_source(dict(source, sample_aspect_ratio='4:3'), source)
+
+
+@pytest.mark.skipif(not (shutil.which("ffmpeg") and shutil.which("ffprobe")), reason="requer ffmpeg e ffprobe")
+def test_sparse_burn_of_a_shifted_stream(tmp_path, processor, monkeypatch):
+    source = str(tmp_path / "origem.mp4")
+    subprocess.run([
+        "ffmpeg", "-v", "error", "-f", "lavfi", "-i", "testsrc2=s=320x180:r=25:d=20",
+        "-vf", "setsar=4/3", "-c:v", "libx264", "-preset", "veryfast", "-profile:v", "main",
+        "-g", "25", "-output_ts_offset", "7", "-y", source
+    ], check=True)
+    subtitle_path = tmp_path / "legendas.srt"
+    subtitle_path.write_text(srt.compose([_cue(12.2, 13.0)]), encoding="utf-8")
+    monkeypatch.setattr(processor, "_embed_subtitles_parallel",
+                        lambda *args, **kwargs: pytest.fail("o modo esparso caiu para o paralelo"))
+
+    output_path = str(tmp_path / "saida.mp4")
+    processor.embed_subtitles(source, str(subtitle_path), output_path, quality="low", mode="sparse")
+
+    # The "low" preset (ultrafast) would signal Constrained Baseline without the forced tools
+    info = processor._probe_video_stream(output_path)
+    assert (info['profile'], info['sample_aspect_ratio']) == ('Main', '4:3')
+    decode = subprocess.run(["ffmpeg", "-v", "error", "-i", output_path, "-f", "null", "-"],
+                            capture_output=True, text=True)
+    assert decode.returncode == 0 and not decode.stderr.strip()
+    assert os.path.getsize(output_path) > 0
@@ -0,0 +1,161 @@
+"""Streaming transcription: pieces cut at pauses, one model load, producer failures."""
+import os
+import sys
+import math
+import wave
+import types
+import shutil
+import struct
+
+import pytest
+import srt
+
+import vad
+import subtitle_processor
+from subtitle_processor import SubtitleProcessor
+
+RATE = 8000
+
+
+class FinishedProcess:
+    """Stand-in for a subprocess.Popen that has already exited."""
+
+    def __init__(self, returncode):
+        self.returncode = returncode
+
+    def poll(self):
+        return self.returncode
+
+
+def fake_whisper(self, audio_path, output_dir, model="tiny", quality_preset="fast", **kwargs):
+    srt_path = os.path.join(output_dir, os.path.splitext(os.path.basename(audio_path))[0] + ".srt")
+    with open(srt_path, 'w', encoding='utf-8') as f:
+        f.write("1\n00:00:00,000 --> 00:00:02,000\nOlá\n")
+    return srt_path
+
+
+def write_wav(path, pattern):
+    """Write a mono WAV from (seconds, is_tone) pairs."""
+    frames = bytearray()
+    for seconds, is_tone in pattern:
+        for i in range(int(seconds * RATE)):
+            value = int(8000 * math.sin(2 * math.pi * 440 * i / RATE)) if is_tone else 0
+            frames += struct.pack('<h', value)
+    with wave.open(str(path), 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(RATE)
+        f.writeframes(bytes(frames))
+
+
+def write_chunks(chunk_dir, patterns):
+    """Write the chunks and the CSV segment list ffmpeg would produce."""
+    lines = []
+    start = 0.0
+    for i, pattern in enumerate(patterns):
+        name = f"chunk_{i:05d}.wav"
+        write_wav(chunk_dir / name, pattern)
+        end = start + sum(seconds for seconds, _ in pattern)
+        lines.append(f"{name},{start:.6f},{end:.6f}\n")
+        start = end
+    (chunk_dir / "chunks.csv").write_text("".join(lines))
+
+
+def read_cues(path):
+    with open(path, encoding='utf-8') as f:
+        return list(srt.parse(f.read()))
+
+
+@pytest.fixture
+def chunk_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(SubtitleProcessor, "_run_whisper", fake_whisper)
+    write_chunks(tmp_path, [[(30, True)]])
+    (tmp_path / "decode.log").write_text("pipe:0: Invalid data found when processing input\n")
+    return tmp_path
+
+
+def test_producer_failure_after_first_chunk_raises(chunk_dir, monkeypatch):
+    monkeypatch.setattr(vad, "detect_silences", lambda *args, **kwargs: [(14.0, 15.0)])
+    processor = SubtitleProcessor(transcription_cache=False)
+
+    with pytest.raises(Exception, match="Invalid data found"):
+        processor.transcribe_chunk_stream(
+            str(chunk_dir), str(chunk_dir / "chunks.csv"), str(chunk_dir / "out.srt"),
+            FinishedProcess(1), producer_log=str(chunk_dir / "decode.log")
+        )
+
+
+def test_pieces_are_cut_in_the_last_pause_and_shifted(chunk_dir, monkeypatch):
+    silences = iter([[(3.0, 4.0), (14.0, 15.0)], []])
+    monkeypatch.setattr(vad, "detect_silences", lambda *args, **kwargs: next(silences))
+    processor = SubtitleProcessor(transcription_cache=False)
+    output_path = str(chunk_dir / "out.srt")
+    updates = []
+
+    processor.transcribe_chunk_stream(
+        str(chunk_dir), str(chunk_dir / "chunks.csv"), output_path, FinishedProcess(0),
+        on_update=lambda count, seconds: updates.append((count, seconds))
+    )
+
+    # The pause at 3 s makes a piece shorter than STREAM_MIN_PIECE_SECONDS: cut at 14.5 s
+    cues = read_cues(output_path)
+    assert [cue.start.total_seconds() for cue in cues] == [0.0, 14.5]
+    assert updates == [(1, 14.5), (2, 30.0)]
+    assert sorted(os.listdir(chunk_dir)) == ["chunks.csv", "decode.log", "out.srt", "whisper_output"]
+
+
+def test_speech_without_pauses_is_cut_at_the_maximum_length(tmp_path, monkeypatch):
+    monkeypatch.setattr(SubtitleProcessor, "_run_whisper", fake_whisper)
+    monkeypatch.setattr(vad, "detect_silences", lambda *args, **kwargs: [])
+    write_chunks(tmp_path, [[(30, True)]] * 4)
+    processor = SubtitleProcessor(transcription_cache=False)
+    output_path = str(tmp_path / "out.srt")
+
+    processor.transcribe_chunk_stream(str(tmp_path), str(tmp_path / "chunks.csv"), output_path, FinishedProcess(0))
+
+    cues = read_cues(output_path)
+    assert [cue.start.total_seconds() for cue in cues] == [0.0, SubtitleProcessor.STREAM_MAX_PIECE_SECONDS]
+
+
+def test_whisper_model_is_loaded_once_for_the_stream(tmp_path, monkeypatch):
+    loads = []
+
+    class FakeModel:
+        device = types.SimpleNamespace(type="cpu")
+
+        def transcribe(self, audio_path, **options):
+            return {'segments': [{'start': 0.5, 'end': 1.5, 'text': " Olá"}]}
+
+    fake_module = types.ModuleType("whisper")
+    fake_module.load_model = lambda name: loads.append(name) or FakeModel()
+    monkeypatch.setitem(sys.modules, "whisper", fake_module)
+    monkeypatch.setattr(subtitle_processor, "_whisper_models", {})
+    monkeypatch.setattr(vad, "detect_silences", lambda *args, **kwargs: [(10.5, 11.5)])
+    write_chunks(tmp_path, [[(12, True)]] * 3)
+    processor = SubtitleProcessor(transcription_cache=False)
+    output_path = str(tmp_path / "out.srt")
+
+    processor.transcribe_chunk_stream(str(tmp_path), str(tmp_path / "chunks.csv"), output_path, FinishedProcess(0))
+
+    # Pieces of 11 s, 11 s, 11 s and the remaining 3 s, one model load
+    assert loads == ["tiny"]
+    assert len(read_cues(output_path)) == 4
+
+
+@pytest.mark.skipif(not shutil.which("ffmpeg"), reason="requer ffmpeg")
+def test_cuts_fall_in_real_pauses(tmp_path, monkeypatch):
+    monkeypatch.setattr(SubtitleProcessor, "_run_whisper", fake_whisper)
+    # A pause from 11.5 s to 12.5 s spans the joint between the first two chunks
+    write_chunks(tmp_path, [
+        [(11.5, True), (0.5, False)],
+        [(0.5, False), (11.5, True)],
+        [(6, True)]
+    ])
+    processor = SubtitleProcessor(transcription_cache=False)
+    output_path = str(tmp_path / "out.srt")
+
+    processor.transcribe_chunk_stream(str(tmp_path), str(tmp_path / "chunks.csv"), output_path, FinishedProcess(0))
+
+    starts = [cue.start.total_seconds() for cue in read_cues(output_path)]
+    assert len(starts) == 2
+    assert 11.5 <= starts[1] <= 12.5
@@ -0,0 +1,38 @@
+"""The subtitle preview is built from the cached cue index, without re-reading the file."""
+import pytest
+
+import utils
+from subtitle_processor import load_cue_index
+
+SRT = "1\n00:00:01,000 --> 00:00:02,000\nOlá\n\n2\n00:00:03,000 --> 00:00:04,500\nTudo bem?\n\n"
+
+
+@pytest.fixture(autouse=True)
+def clear_preview_cache():
+    utils._load_subtitle_preview.clear()
+    yield
+    utils._load_subtitle_preview.clear()
+
+
+def test_preview_comes_from_the_cue_index(tmp_path, monkeypatch):
+    subtitle_path = tmp_path / "legendas.srt"
+    subtitle_path.write_text(SRT, encoding='utf-8')
+    load_cue_index(str(subtitle_path))
+
+    def no_open(*args, **kwargs):
+        raise AssertionError("a prévia não deve reler o arquivo")
+
+    monkeypatch.setattr(utils, "open", no_open, raising=False)
+    preview = utils.get_subtitle_preview(str(subtitle_path))
+
+    assert preview == {'content': SRT, 'text': "Olá\n\nTudo bem?", 'count': 2}
+
+
+def test_malformed_file_shows_the_raw_content(tmp_path):
+    subtitle_path = tmp_path / "legendas.srt"
+    subtitle_path.write_text("isto não é um SRT", encoding='utf-8')
+
+    preview = utils.get_subtitle_preview(str(subtitle_path))
+
+    assert preview['content'] == "isto não é um SRT"
+    assert preview['text'] == "isto não é um SRT"
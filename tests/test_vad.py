@@ -0,0 +1,84 @@
+"""The VAD pre-pass keeps padded speech stretches and maps cue times back."""
+import pytest
+import srt
+
+from vad import Timeline, remap_srt, speech_intervals
+
+
+def test_padding_merges_stretches_around_short_silences():
+    # The 0.3 s silence is shorter than the padding on both sides: its stretches merge
+    intervals = speech_intervals([(2.0, 2.3), (5.0, 8.0)], duration=10.0, padding=0.25)
+
+    assert intervals == [(0.0, 5.25), (7.75, 10.0)]
+
+
+def test_padding_stays_inside_the_audio():
+    intervals = speech_intervals([(0.0, 1.0), (9.0, 9.5)], duration=10.0, padding=0.25)
+
+    # Touching padded stretches merge too
+    assert intervals == [(0.75, 10.0)]
+
+
+def test_silence_running_to_the_end_and_unsorted_overlaps():
+    intervals = speech_intervals([(6.0, None), (1.0, 2.0), (1.5, 3.0)], duration=10.0, padding=0.0)
+
+    assert intervals == [(0.0, 1.0), (3.0, 6.0)]
+
+
+@pytest.mark.parametrize("silences", [[(0.0, None)], [(0.0, 10.0)], [(0.0, 4.0), (3.0, None)]])
+def test_all_silence_has_no_speech(silences):
+    assert speech_intervals(silences, duration=10.0, padding=0.25) == []
+
+
+def test_no_silence_keeps_the_whole_audio():
+    assert speech_intervals([], duration=10.0, padding=0.25) == [(0.0, 10.0)]
+
+
+@pytest.fixture
+def timeline():
+    # Speech-only audio: 0-2 s is 1-3 s, 2-3 s is 5-6 s, 3-5 s is 8-10 s
+    return Timeline([(1.0, 3.0), (5.0, 6.0), (8.0, 10.0)])
+
+
+def test_timeline_offsets(timeline):
+    assert timeline.offsets == [0.0, 2.0, 3.0]
+    assert timeline.speech_seconds == 5.0
+
+
+@pytest.mark.parametrize("seconds, is_end, expected", [
+    (0.0, False, 1.0),
+    (0.5, False, 1.5),
+    (2.5, False, 5.5),
+    # On a joint, a start belongs to the later stretch and an end to the earlier one
+    (2.0, False, 5.0),
+    (2.0, True, 3.0),
+    (3.0, False, 8.0),
+    (3.0, True, 6.0),
+    (5.0, True, 10.0),
+    # Past the end of the speech-only audio
+    (7.0, False, 10.0),
+])
+def test_to_original(timeline, seconds, is_end, expected):
+    assert timeline.to_original(seconds, is_end=is_end) == pytest.approx(expected)
+
+
+def test_empty_timeline_keeps_times():
+    assert Timeline([]).to_original(4.2) == 4.2
+    assert Timeline([]).speech_seconds == 0.0
+
+
+def test_remap_srt(tmp_path, timeline):
+    srt_path = tmp_path / "legendas.srt"
+    srt_path.write_text(
+        "1\n00:00:00,500 --> 00:00:02,000\nAté a junção\n\n"
+        "2\n00:00:01,500 --> 00:00:02,500\nAtravessa a junção\n\n"
+        "3\n00:00:02,900 --> 00:00:03,000\nTermina na junção\n",
+        encoding='utf-8'
+    )
+
+    remap_srt(str(srt_path), timeline)
+
+    cues = list(srt.parse(srt_path.read_text(encoding='utf-8')))
+    times = [(cue.start.total_seconds(), cue.end.total_seconds()) for cue in cues]
+    assert times == [(1.5, 3.0), (2.5, 5.5), (5.9, 6.0)]
+    assert [cue.content for cue in cues] == ["Até a junção", "Atravessa a junção", "Termina na junção"]
@@ -0,0 +1,18 @@
+"""Session workspaces: expiry is detected when a collected session comes back."""
+from workspace import WorkspaceManager
+
+
+def test_resume_session_reports_collected_sessions(tmp_path):
+    manager = WorkspaceManager(str(tmp_path), 1024 * 1024, 10 * 1024 * 1024, ttl_seconds=60)
+    session_id, session_dir = manager.create_session()
+    (tmp_path / session_id / "video.mp4").write_bytes(b"video")
+
+    assert manager.resume_session(session_id) == (session_dir, False)
+
+    manager.collect_garbage(now=manager.last_access(session_id) + 61)
+    resumed_dir, expired = manager.resume_session(session_id)
+
+    assert expired
+    assert resumed_dir == session_dir
+    assert sorted(p.name for p in (tmp_path / session_id).iterdir()) == [manager.ACCESS_MARKER]
+    assert manager.resume_session(session_id) == (session_dir, False)
@@ -0,0 +1,114 @@
+"""The yt-dlp metadata is extracted once per video across the download flow."""
+import os
+
+import pytest
+
+yt_dlp = pytest.importorskip("yt_dlp")
+
+import video_processor
+from video_processor import VideoProcessor
+
+
+class FakeYoutubeDL:
+    """Stand-in for yt_dlp.YoutubeDL that counts extractions and writes fake files."""
+
+    extract_calls = []
+
+    def __init__(self, params=None):
+        self.params = params or {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def extract_info(self, url, download=True, process=True):
+        FakeYoutubeDL.extract_calls.append(url)
+        return {
+            'id': 'abc123',
+            'title': 'Vídeo de teste',
+            'extractor_key': 'Youtube',
+            'subtitles': {'pt': [{'ext': 'srt', 'url': 'https://example.invalid/pt.srt'}]},
+        }
+
+    def process_ie_result(self, info, download=True):
+        base = os.path.splitext(self.params['outtmpl'])[0]
+        if not self.params.get('skip_download'):
+            with open(self.params['outtmpl'], 'wb') as f:
+                f.write(b'video')
+        if self.params.get('writesubtitles'):
+            with open(f"{base}.pt.srt", 'w', encoding='utf-8') as f:
+                f.write("1\n00:00:00,000 --> 00:00:01,000\nOlá\n")
+        return info
+
+
+@pytest.fixture
+def fake_extractor(monkeypatch):
+    FakeYoutubeDL.extract_calls = []
+    monkeypatch.setattr(yt_dlp, "YoutubeDL", FakeYoutubeDL)
+    video_processor.clear_caches()
+    yield FakeYoutubeDL
+    video_processor.clear_caches()
+
+
+def test_single_extraction_per_video(fake_extractor, tmp_path):
+    url = "https://www.youtube.com/watch?v=abc123"
+    processor = VideoProcessor(download_cache=False, segment_cache=False)
+
+    result = processor.download_youtube_video(url, str(tmp_path), download_subtitles=True)
+
+    assert os.path.exists(result['video_path'])
+    assert os.path.exists(result['subtitle_path'])
+    assert fake_extractor.extract_calls == [url]
+
+    # Subtitles alone and a second download reuse the same metadata
+    processor.download_youtube_subtitles(url, str(tmp_path / "legendas"))
+    processor.download_youtube_video(url, str(tmp_path / "outra"), quality="low")
+    assert fake_extractor.extract_calls == [url]
+
+
+def test_download_falls_back_when_metadata_fails(monkeypatch, tmp_path):
+    class FailingYoutubeDL(FakeYoutubeDL):
+        def extract_info(self, url, download=True, process=True):
+            raise Exception("extração indisponível")
+
+        def download(self, urls):
+            with open(self.params['outtmpl'], 'wb') as f:
+                f.write(b'video')
+
+    monkeypatch.setattr(yt_dlp, "YoutubeDL", FailingYoutubeDL)
+    video_processor.clear_caches()
+    processor = VideoProcessor(download_cache=False, segment_cache=False)
+
+    output_path = processor.download_youtube_video("https://www.youtube.com/watch?v=xyz", str(tmp_path))
+
+    assert os.path.exists(output_path)
+
+
+def test_download_size_estimate_uses_selected_formats(monkeypatch):
+    info = {
+        'id': 'abc123',
+        'title': 'Vídeo de teste',
+        'extractor': 'youtube',
+        'extractor_key': 'Youtube',
+        'webpage_url': 'https://www.youtube.com/watch?v=abc123',
+        'formats': [
+            {'format_id': '18', 'ext': 'mp4', 'url': 'https://example.invalid/18', 'height': 360,
+             'vcodec': 'avc1', 'acodec': 'mp4a', 'filesize': 30_000_000},
+            {'format_id': '136', 'ext': 'mp4', 'url': 'https://example.invalid/136', 'height': 720,
+             'vcodec': 'avc1', 'acodec': 'none', 'filesize': 80_000_000},
+            {'format_id': '140', 'ext': 'm4a', 'url': 'https://example.invalid/140',
+             'vcodec': 'none', 'acodec': 'mp4a', 'filesize_approx': 5_000_000},
+        ],
+    }
+    processor = VideoProcessor(download_cache=False, segment_cache=False)
+    monkeypatch.setattr(processor, "_extract_youtube_info", lambda url: dict(info))
+
+    url = info['webpage_url']
+    assert processor.estimate_youtube_download_size(url, quality="medium") == 85_000_000
+    assert processor.estimate_youtube_download_size(url, audio_only=True) == 5_000_000
+
+    # Sem metadados, a cota é verificada sem estimativa
+    monkeypatch.setattr(processor, "_extract_youtube_info", lambda url: 1 / 0)
+    assert processor.estimate_youtube_download_size(url) == 0
@@ -1,6 +1,8 @@
 import os
 import streamlit as st
 import base64
+import srt
+from subtitle_processor import load_cue_index
 
 def save_uploaded_file(uploaded_file, directory):
     """Save an uploaded file to a directory.
@@ -52,6 +54,47 @@ def create_download_link(file_path, text, download_filename=None):
         mime=mime_type
     )
 
+@st.cache_data(max_entries=256, show_spinner=False)
+def _load_subtitle_preview(subtitle_path, mtime_ns, size):
+    """Build the preview data for a subtitle file (cached per path and mtime).
+    
+    Everything comes from the cues of load_cue_index(), which are usually
+    already parsed, so the file is only read again when it doesn't parse.
+    """
+    try:
+        cues = load_cue_index(subtitle_path)
+        content = srt.compose(cues, reindex=False)
+        text = "\n\n".join(cue.content for cue in cues)
+        count = len(cues)
+    except Exception:
+        # Arquivo malformado: mostra o conteúdo bruto
+        with open(subtitle_path, 'r', encoding='utf-8', errors='replace') as f:
+            content = f.read()
+        text = content
+        count = content.count('\n\n') + 1
+    
+    return {
+        'content': content,
+        'text': text,
+        'count': count
+    }
+
+def get_subtitle_preview(subtitle_path):
+    """Get the content, preview text and cue count of a subtitle file.
+
+    Results are memoized per (file, mtime), so Streamlit reruns do not re-read
+    or re-parse subtitle files that have not changed.
+
+    Args:
+        subtitle_path (str): Path to the SRT file.
+
+    Returns:
+        dict: Dictionary with 'content' (the SRT, rebuilt from the cues), 'text'
+            (cue text only) and 'count' (number of cues).
+    """
+    stat = os.stat(subtitle_path)
+    return _load_subtitle_preview(os.path.abspath(subtitle_path), stat.st_mtime_ns, stat.st_size)
+
 def get_mime_type(file_extension):
     """Get the MIME type for a file extension.
     
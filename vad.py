@@ -0,0 +1,246 @@
+"""
+Detecção de voz (VAD) antes da transcrição.
+
+O Whisper gasta CPU com introduções musicais, silêncio e pausas longas, e
+costuma inventar texto nesses trechos. Este módulo encontra os trechos com fala
+no áudio extraído (com o filtro silencedetect do ffmpeg, que é muito mais
+barato que a transcrição), monta um WAV só com esses trechos e depois devolve
+os tempos das legendas para a linha do tempo original.
+"""
+import os
+import re
+import time
+import wave
+import shutil
+import tempfile
+import bisect
+import datetime
+import subprocess
+
+import srt
+
+# Volume abaixo do qual o áudio é considerado silêncio, e a duração mínima de uma pausa
+DEFAULT_NOISE_DB = -35
+DEFAULT_MIN_SILENCE_SECONDS = 1.0
+# Margem mantida em volta de cada trecho de fala, para não cortar o início e o fim das palavras
+DEFAULT_PADDING_SECONDS = 0.25
+# Acima desta fração de fala, montar um novo áudio não compensa
+MAX_SPEECH_FRACTION = 0.95
+
+_SILENCE_START = re.compile(r"silence_start:\s*(-?[\d.]+)")
+_SILENCE_END = re.compile(r"silence_end:\s*(-?[\d.]+)")
+
+
+def wav_duration(audio_path):
+    """Get the duration of a WAV file, in seconds."""
+    with wave.open(audio_path, 'rb') as wav:
+        return wav.getnframes() / float(wav.getframerate())
+
+
+def detect_silences(audio_path, noise_db=DEFAULT_NOISE_DB, min_silence=DEFAULT_MIN_SILENCE_SECONDS):
+    """Find the silent stretches of an audio file with ffmpeg's silencedetect.
+
+    Args:
+        audio_path (str): Path to the audio file.
+        noise_db (float): Volume (dB) below which audio counts as silence.
+        min_silence (float): Shortest silence reported, in seconds.
+
+    Returns:
+        list: (start, end) tuples in seconds; a silence running to the end of
+            the file has end None.
+    """
+    ffmpeg_cmd = [
+        "ffmpeg", "-hide_banner", "-nostats", "-i", audio_path,
+        "-af", f"silencedetect=noise={noise_db}dB:d={min_silence}",
+        "-f", "null", "-"
+    ]
+    result = subprocess.run(ffmpeg_cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise Exception(f"Erro ao detectar silêncio: {result.stderr}")
+
+    silences = []
+    start = None
+    for line in result.stderr.splitlines():
+        match = _SILENCE_START.search(line)
+        if match:
+            start = max(0.0, float(match.group(1)))
+            continue
+        match = _SILENCE_END.search(line)
+        if match and start is not None:
+            silences.append((start, float(match.group(1))))
+            start = None
+
+    if start is not None:
+        silences.append((start, None))
+    return silences
+
+
+def speech_intervals(silences, duration, padding=DEFAULT_PADDING_SECONDS):
+    """Get the stretches between silences, widened by padding and merged.
+
+    Args:
+        silences (list): (start, end) tuples from detect_silences().
+        duration (float): Duration of the audio, in seconds.
+        padding (float): Seconds kept on each side of every speech stretch.
+
+    Returns:
+        list: Sorted, non-overlapping (start, end) tuples in seconds.
+    """
+    intervals = []
+    position = 0.0
+    for start, end in sorted(silences, key=lambda silence: silence[0]):
+        end = duration if end is None else end
+        if start > position:
+            intervals.append((position, start))
+        position = max(position, end)
+    if position < duration:
+        intervals.append((position, duration))
+
+    merged = []
+    for start, end in intervals:
+        start, end = max(0.0, start - padding), min(duration, end + padding)
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class Timeline:
+    """Map times in the speech-only audio back to the original audio."""
+
+    def __init__(self, intervals):
+        """Initialize the timeline.
+
+        Args:
+            intervals (list): The (start, end) speech stretches, in the order
+                they were joined.
+        """
+        self.intervals = intervals
+        # Where each stretch starts in the speech-only audio
+        self.offsets = []
+        total = 0.0
+        for start, end in intervals:
+            self.offsets.append(total)
+            total += end - start
+        self.speech_seconds = total
+
+    def to_original(self, seconds, is_end=False):
+        """Convert a time in the speech-only audio to the original timeline.
+
+        Args:
+            seconds (float): Time in the speech-only audio.
+            is_end (bool): Whether this is the end of a cue; an end that falls
+                exactly on a joint belongs to the earlier stretch.
+
+        Returns:
+            float: Time in the original audio.
+        """
+        if not self.intervals:
+            return seconds
+
+        if is_end:
+            index = bisect.bisect_left(self.offsets, seconds) - 1
+        else:
+            index = bisect.bisect_right(self.offsets, seconds) - 1
+        index = max(0, min(index, len(self.intervals) - 1))
+
+        start, end = self.intervals[index]
+        return min(end, start + max(0.0, seconds - self.offsets[index]))
+
+
+def build_speech_audio(audio_path, intervals, output_path):
+    """Write a WAV holding only the given stretches of audio_path, back to back.
+
+    Args:
+        audio_path (str): Path to the source WAV file.
+        intervals (list): (start, end) stretches to keep, in seconds.
+        output_path (str): Path to save the speech-only WAV.
+
+    Returns:
+        Timeline: Maps times in output_path back to audio_path.
+    """
+    with wave.open(audio_path, 'rb') as source, wave.open(output_path, 'wb') as target:
+        target.setparams(source.getparams())
+        rate = source.getframerate()
+        frame_count = source.getnframes()
+
+        for start, end in intervals:
+            first = min(frame_count, int(start * rate))
+            last = min(frame_count, int(end * rate))
+            source.setpos(first)
+            target.writeframes(source.readframes(last - first))
+
+    return Timeline(intervals)
+
+
+def remap_srt(srt_path, timeline):
+    """Rewrite the cue times of an SRT file from the speech-only timeline to the original one."""
+    with open(srt_path, 'r', encoding='utf-8', errors='replace') as f:
+        cues = list(srt.parse(f.read()))
+
+    for cue in cues:
+        start = timeline.to_original(cue.start.total_seconds())
+        end = timeline.to_original(cue.end.total_seconds(), is_end=True)
+        cue.start = datetime.timedelta(seconds=start)
+        cue.end = datetime.timedelta(seconds=max(start, end))
+
+    with open(srt_path, 'w', encoding='utf-8') as f:
+        f.write(srt.compose(cues))
+
+
+def benchmark_vad(video_paths, audio_args, transcribe=None):
+    """Measure how much audio the VAD pre-pass removes from a set of videos.
+
+    Args:
+        video_paths (list): Paths to the sample videos.
+        audio_args (list): ffmpeg arguments of the audio extraction
+            (SubtitleProcessor.AUDIO_EXTRACTION_ARGS).
+        transcribe (callable, optional): Called as transcribe(video_path, vad)
+            to time a full transcription with and without the pre-pass.
+
+    Returns:
+        list: Dictionaries with 'path', 'duration', 'speech_seconds',
+            'detect_seconds', 'asr_seconds' and 'vad_asr_seconds' (None unless
+            transcribe is given), or 'error'.
+    """
+    results = []
+    for video_path in video_paths:
+        work_dir = tempfile.mkdtemp(prefix="vad_benchmark_")
+        try:
+            audio_path = os.path.join(work_dir, "audio.wav")
+            ffmpeg_cmd = ["ffmpeg", "-i", video_path] + audio_args + ["-y", audio_path]
+            result = subprocess.run(ffmpeg_cmd, capture_output=True, text=True)
+            if result.returncode != 0:
+                error = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "erro desconhecido"
+                results.append({'path': video_path, 'error': error})
+                continue
+
+            duration = wav_duration(audio_path)
+            start_time = time.time()
+            intervals = speech_intervals(detect_silences(audio_path), duration)
+            detect_seconds = time.time() - start_time
+
+            entry = {
+                'path': video_path,
+                'duration': duration,
+                'speech_seconds': Timeline(intervals).speech_seconds,
+                'detect_seconds': detect_seconds,
+                'asr_seconds': None,
+                'vad_asr_seconds': None,
+                'error': None
+            }
+
+            if transcribe:
+                for key, vad in (('asr_seconds', False), ('vad_asr_seconds', True)):
+                    start_time = time.time()
+                    transcribe(video_path, vad)
+                    entry[key] = time.time() - start_time
+
+            results.append(entry)
+        except Exception as e:
+            results.append({'path': video_path, 'error': str(e)})
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    return results
@@ -1,20 +1,217 @@
 import os
+import sys
 import subprocess
-import tempfile
 import json
 import time
-import streamlit as st
-import yt_dlp
-from subtitle_processor import SubtitleProcessor
+import re
+import csv
+import bisect
+import shutil
+import copy
+import threading
+import contextlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from subtitle_processor import SubtitleProcessor, load_cue_index
+from encoder_profiles import get_encoder_args, get_default_encoder
+from file_cache import FileCache, get_download_cache, get_segment_cache
+from workspace import content_hash
+from artifact_store import materialize
+from progress import ProgressReporter
+from scratch import get_scratch_space
+
+# yt_dlp is imported inside the YouTube methods: it is slow to import and the
+# splitting and embedding paths never need it.
+
+# Cache de metadados do yt-dlp, compartilhado por todas as instâncias.
+# As URLs de mídia do YouTube expiram, por isso as entradas têm validade.
+INFO_CACHE_TTL = 30 * 60
+INFO_CACHE_MAX_ENTRIES = 128
+_info_cache = OrderedDict()   # "extractor:id" -> (timestamp, info)
+_info_cache_urls = {}         # URL -> "extractor:id"
+_info_cache_lock = threading.Lock()
+
+# Durações obtidas pelo ffprobe, por arquivo (inode), compartilhadas entre instâncias.
+PROBE_CACHE_MAX_ENTRIES = 256
+_probe_cache = OrderedDict()  # (device, inode, mtime, size) -> duration
+_probe_cache_lock = threading.Lock()
+
+
+def cache_stats():
+    """Get the size of the module-level metadata and probe caches.
+    
+    Returns:
+        dict: 'info_cache' and 'probe_cache', each with 'entries' and an
+            approximate 'bytes' figure.
+    """
+    with _info_cache_lock:
+        info_entries = len(_info_cache)
+        info_bytes = sum(len(json.dumps(info, default=str)) for _, info in _info_cache.values())
+    with _probe_cache_lock:
+        probe_entries = len(_probe_cache)
+        probe_bytes = sum(sys.getsizeof(key) + sys.getsizeof(value) for key, value in _probe_cache.items())
+    
+    return {
+        'info_cache': {'entries': info_entries, 'bytes': info_bytes},
+        'probe_cache': {'entries': probe_entries, 'bytes': probe_bytes}
+    }
+
+
+def clear_caches():
+    """Empty the metadata and probe caches."""
+    with _info_cache_lock:
+        _info_cache.clear()
+        _info_cache_urls.clear()
+    with _probe_cache_lock:
+        _probe_cache.clear()
+
+
+# Chaves aceitas em subtitle_style (em minúsculas): as do estilo padrão e os
+# campos de estilo ASS aceitos pelo force_style do filtro subtitles
+SUBTITLE_STYLE_KEYS = frozenset({
+    'fontsize', 'fontcolor', 'bordercolor', 'borderw', 'shadowcolor', 'shadowx', 'shadowy',
+    'fontname', 'primarycolour', 'secondarycolour', 'outlinecolour', 'backcolour',
+    'bold', 'italic', 'underline', 'strikeout', 'scalex', 'scaley', 'spacing', 'angle',
+    'borderstyle', 'outline', 'shadow', 'alignment', 'marginl', 'marginr', 'marginv',
+})
+# Valores em texto: nomes de fonte e de cor, ou cores como &H00FFFFFF e #FFFFFF.
+# Nada que o ffmpeg interprete dentro de um filtro (aspas, ':', ',', ';', '[', '=', '\\')
+_STYLE_TEXT_VALUE = re.compile(r"^[A-Za-z0-9 _.#&+-]{1,64}$")
+
+
+def validate_subtitle_style(subtitle_style):
+    """Check a subtitle_style dictionary before it goes into an ffmpeg filter.
+    
+    Args:
+        subtitle_style (dict): Style keys (see SUBTITLE_STYLE_KEYS) and their values.
+        
+    Returns:
+        list: (key, value) pairs, with values as strings.
+        
+    Raises:
+        Exception: If the style isn't a dictionary, a key isn't allowed, or a
+            value isn't a number, a colour or a font name.
+    """
+    if not isinstance(subtitle_style, dict):
+        raise Exception("O estilo das legendas deve ser um dicionário")
+    
+    items = []
+    for key, value in subtitle_style.items():
+        if not isinstance(key, str) or key.lower() not in SUBTITLE_STYLE_KEYS:
+            raise Exception(f"Opção de estilo de legenda não permitida: {key}")
+        if isinstance(value, bool):
+            value = int(value)
+        if isinstance(value, (int, float)):
+            value = f"{value:g}" if isinstance(value, float) else str(value)
+        elif not isinstance(value, str) or not _STYLE_TEXT_VALUE.match(value):
+            raise Exception(f"Valor inválido para a opção de estilo '{key}': {value!r}")
+        items.append((key, value))
+    return items
+
+
+def _escape_filter_value(value):
+    """Escape text for a single-quoted ffmpeg filter option value."""
+    return value.replace("\\", "\\\\").replace("'", "'\\''")
+
 
 class VideoProcessor:
-    def __init__(self):
-        """Initialize the VideoProcessor class."""
-        self.subtitle_processor = SubtitleProcessor()
+    # Menor duração (em segundos) de um bloco na incorporação paralela de legendas
+    MIN_CHUNK_SECONDS = 10
+    
+    # Intervalos sem legenda menores que isso (em segundos) são re-encodados junto
+    # com as legendas vizinhas em vez de copiados no modo esparso
+    MIN_COPY_SECONDS = 2.0
+    
+    # Se as legendas cobrirem mais que essa fração do vídeo, o modo esparso
+    # não compensa e o modo paralelo é usado
+    MAX_SPARSE_COVERAGE = 0.9
+    
+    # Perfis H.264 do ffprobe que o libx264 consegue reproduzir nos blocos re-encodados
+    X264_PROFILES = {
+        'Constrained Baseline': 'baseline',
+        'Baseline': 'baseline',
+        'Main': 'main',
+        'High': 'high',
+        'High 10': 'high10',
+        'High 4:2:2': 'high422',
+        'High 4:4:4 Predictive': 'high444',
+    }
+    
+    # Fragmentos DASH/HLS baixados ao mesmo tempo pelo yt-dlp
+    DEFAULT_CONCURRENT_FRAGMENTS = 4
+    
+    # Formatos do yt-dlp por qualidade de download
+    YOUTUBE_FORMATS = {
+        'low': 'worst[ext=mp4]',          # Menor qualidade disponível (mais rápido, menor arquivo)
+        'medium': 'bestvideo[height<=720][ext=mp4]+bestaudio[ext=m4a]/best[height<=720][ext=mp4]/best[ext=mp4]',  # Qualidade média (720p)
+        'high': 'bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]'   # Melhor qualidade
+    }
+    YOUTUBE_AUDIO_FORMAT = 'bestaudio[ext=m4a]/bestaudio/best'
+    
+    # Itens de playlist baixados e transcritos ao mesmo tempo
+    DEFAULT_PLAYLIST_DOWNLOAD_WORKERS = 2
+    DEFAULT_PLAYLIST_TRANSCRIBE_WORKERS = 1
+    
+    # Arquivo, na pasta dos segmentos, que descreve os vídeos gerados na última divisão
+    SEGMENT_MANIFEST = "manifest.json"
+    
+    def __init__(self, encoder=None, download_cache=None, reporter=None, subtitle_processor=None,
+                 segment_cache=None):
+        """Initialize the VideoProcessor class.
         
-    def download_youtube_video(self, youtube_url, output_dir, download_subtitles=False, quality="medium"):
+        Args:
+            encoder (str, optional): Video encoder used when re-encoding
+                (see encoder_profiles.ENCODER_PROFILES). Defaults to the
+                VIDEO_ENCODER environment variable, or libx264.
+            download_cache (FileCache, optional): Cache for downloaded videos.
+                Defaults to the shared cache from file_cache.get_download_cache();
+                pass False to disable caching.
+            reporter (ProgressReporter, optional): Receives progress messages
+                (see progress.py). Defaults to a reporter that ignores them.
+            subtitle_processor (SubtitleProcessor, optional): Processor used for
+                transcriptions and subtitle segments. Defaults to a new one
+                using the same reporter.
+            segment_cache (FileCache, optional): Cache for the video segments
+                cut when splitting. Defaults to the shared cache from
+                file_cache.get_segment_cache(); pass False to disable caching.
+        """
+        self.reporter = reporter or ProgressReporter()
+        if subtitle_processor is None:
+            subtitle_processor = SubtitleProcessor(reporter=self.reporter)
+        self.subtitle_processor = subtitle_processor
+        self.encoder = encoder or get_default_encoder()
+        if download_cache is None:
+            download_cache = get_download_cache()
+        self.download_cache = download_cache or None
+        if segment_cache is None:
+            segment_cache = get_segment_cache()
+        self.segment_cache = segment_cache or None
+    
+    def with_reporter(self, reporter):
+        """Get a copy of this processor that reports progress to another reporter.
+        
+        The copy shares the encoder and caches, so it is cheap to create per request.
+        
+        Args:
+            reporter (ProgressReporter): Reporter for the copy.
+            
+        Returns:
+            VideoProcessor: The copy.
+        """
+        processor = copy.copy(self)
+        processor.reporter = reporter
+        processor.subtitle_processor = self.subtitle_processor.with_reporter(reporter)
+        return processor
+        
+    def download_youtube_video(self, youtube_url, output_dir, download_subtitles=False, quality="medium",
+                               concurrent_fragments=None):
         """Download a video from YouTube using yt-dlp, with option for subtitles.
         
+        The video metadata is extracted once (and cached per video id); the same
+        result is used for the title, the subtitle check and the download itself.
+        Files are named after the video id and quality, so an interrupted
+        download resumes from its partial file instead of starting over.
+        
         Args:
             youtube_url (str): URL of the YouTube video.
             output_dir (str): Directory to save the downloaded video.
@@ -23,13 +220,15 @@ class VideoProcessor:
                 - low: Menor resolução, download rápido, arquivo menor
                 - medium: Resolução intermediária, bom equilíbrio
                 - high: Melhor resolução disponível, arquivo maior
+            concurrent_fragments (int, optional): Number of DASH/HLS fragments
+                downloaded at the same time. Defaults to DEFAULT_CONCURRENT_FRAGMENTS.
             
         Returns:
             dict: Dictionary with paths to the downloaded files or str path if no subtitles.
         """
         try:
             # Create a progress message
-            st.write("Conectando ao YouTube...")
+            self.reporter.write("Conectando ao YouTube...")
             
             # Informar a qualidade selecionada
             quality_labels = {
@@ -37,84 +236,51 @@ class VideoProcessor:
                 'medium': 'média (720p, equilíbrio)',
                 'high': 'alta (melhor resolução disponível)'
             }
-            st.info(f"Qualidade de download: {quality_labels.get(quality, 'média')}")
-            
-            # Generate an output filename with timestamp to avoid conflicts
-            timestamp = int(time.time())
-            output_filename = f"youtube_video_{timestamp}.mp4"
-            output_path = os.path.join(output_dir, output_filename)
+            self.reporter.info(f"Qualidade de download: {quality_labels.get(quality, 'média')}")
             
             # Ensure output directory exists
             os.makedirs(output_dir, exist_ok=True)
             
-            # Definir a configuração de formato baseada na qualidade selecionada
-            format_config = {
-                'low': 'worst[ext=mp4]',          # Menor qualidade disponível (mais rápido, menor arquivo)
-                'medium': 'bestvideo[height<=720][ext=mp4]+bestaudio[ext=m4a]/best[height<=720][ext=mp4]/best[ext=mp4]',  # Qualidade média (720p)
-                'high': 'bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]'   # Melhor qualidade
-            }
+            # Create progress status
+            status = self.reporter.status_line()
+            status.write("Obtendo informações do vídeo...")
+            
+            # Single metadata extraction, reused for title, subtitles and download.
+            # If it fails, the video is still downloaded straight from the URL
+            try:
+                info = self._extract_youtube_info(youtube_url)
+            except Exception as e:
+                self.reporter.warning(f"⚠️ Não foi possível obter informações do vídeo ({str(e)}). Tentando baixar mesmo assim...")
+                info = None
+            video_title = (info or {}).get('title') or 'Vídeo do YouTube'
+            
+            # Stable filename per video (or URL) and quality, so partial downloads can be resumed
+            video_id = self._safe_video_id(info) if info else FileCache.make_key(youtube_url)[:16]
+            output_filename = f"youtube_video_{video_id}_{quality}.mp4"
+            output_path = os.path.join(output_dir, output_filename)
             
             # Configure yt-dlp options with selected quality
             ydl_opts = {
-                'format': format_config.get(quality, format_config['medium']),  # Get format based on quality
+                'format': self.YOUTUBE_FORMATS.get(quality, self.YOUTUBE_FORMATS['medium']),  # Get format based on quality
                 'outtmpl': output_path,     # Output path
                 'quiet': True,              # Less verbose output
                 'no_warnings': True,        # No warnings
                 'progress': False,          # No progress to avoid clutter in logs
             }
+            ydl_opts.update(self._get_resumable_download_opts(concurrent_fragments))
+            
+            # Check if video has subtitles
+            has_subtitles = bool(info and (info.get('subtitles') or info.get('automatic_captions')))
             
-            # Setup subtitle options if requested
+            # Setup subtitle options if requested and available
             subtitle_path = None
-            if download_subtitles:
-                # Add subtitle options, com tratamento para falhas
-                try_subtitle_opts = {
+            if download_subtitles and has_subtitles:
+                ydl_opts.update({
                     'writesubtitles': True,
                     'writeautomaticsub': True,
                     'subtitleslangs': ['pt', 'en'],  # Prefer Portuguese, then English
                     'subtitlesformat': 'srt',
-                    'skip_download': True  # Só para verificar legendas disponíveis
-                }
-                
-                # Primeiro verificamos se há legendas disponíveis
-                has_subtitles_available = False
-                try:
-                    with yt_dlp.YoutubeDL(try_subtitle_opts) as ydl:
-                        ydl.extract_info(youtube_url, download=False)
-                        has_subtitles_available = True
-                except Exception:
-                    # Se falhar ao verificar legendas, continuamos sem elas
-                    st.warning("⚠️ Não foi possível verificar legendas para este vídeo, continuando apenas com o download do vídeo.")
-                    has_subtitles_available = False
-                
-                # Só adiciona opções de legendas se elas estiverem disponíveis    
-                if has_subtitles_available:
-                    ydl_opts.update({
-                        'writesubtitles': True,
-                        'writeautomaticsub': True,
-                        'subtitleslangs': ['pt', 'en'],  # Prefer Portuguese, then English
-                        'subtitlesformat': 'srt',
-                    })
-            
-            # Create progress status
-            status = st.empty()
-            status.write("Obtendo informações do vídeo...")
-            
-            # First get video info to show title
-            info = None
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                try:
-                    info = ydl.extract_info(youtube_url, download=False)
-                    video_title = info.get('title', 'Vídeo do YouTube') if info else 'Vídeo do YouTube'
-                except Exception:
-                    video_title = 'Vídeo do YouTube'
-            
-            # Check if video has subtitles
-            has_subtitles = False
-            if info and isinstance(info, dict):
-                if 'subtitles' in info and info['subtitles']:
-                    has_subtitles = True
-                elif 'automatic_captions' in info and info['automatic_captions']:
-                    has_subtitles = True
+                })
                 
             # Display title
             if download_subtitles and has_subtitles:
@@ -124,27 +290,42 @@ class VideoProcessor:
                 status.write(f"Vídeo encontrado: {video_title}")
                 status.write(f"Baixando o vídeo... (pode levar alguns minutos)")
             
-            # Download the video com tratamento robusto de erros
-            try:
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    ydl.download([youtube_url])
-            except Exception as e:
-                # Tentar novamente sem opções de legendas se falhar
-                st.warning(f"⚠️ Erro ao baixar o vídeo com legendas: {str(e)}. Tentando novamente sem legendas...")
+            # Reuse an earlier download of the same video and format
+            cache_key = None
+            if info:
+                cache_key = FileCache.make_key(info.get('extractor_key', ''), info.get('id', youtube_url), ydl_opts['format'])
+            cached_path = self.download_cache.get(cache_key) if self.download_cache and cache_key else None
+            if cached_path:
+                # A copy (or reflink), never a hardlink: editing the output must not change the cache
+                materialize(cached_path, output_path, allow_hardlink=False)
+                status.write(f"Vídeo encontrado no cache de downloads: {video_title}")
                 
-                # Remover opções de legendas que podem estar causando o erro
-                if 'writesubtitles' in ydl_opts:
-                    del ydl_opts['writesubtitles']
-                if 'writeautomaticsub' in ydl_opts:
-                    del ydl_opts['writeautomaticsub']
-                if 'subtitleslangs' in ydl_opts:
-                    del ydl_opts['subtitleslangs']
-                if 'subtitlesformat' in ydl_opts:
-                    del ydl_opts['subtitlesformat']
-                
-                # Tenta novamente apenas o vídeo
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    ydl.download([youtube_url])
+                # Only the subtitles still have to be fetched
+                ydl_opts['skip_download'] = True
+            
+            # Download the video com tratamento robusto de erros
+            if not cached_path or (download_subtitles and has_subtitles):
+                try:
+                    self._download_from_info(info, ydl_opts, youtube_url)
+                except Exception as e:
+                    # Tentar novamente sem opções de legendas se falhar
+                    self.reporter.warning(f"⚠️ Erro ao baixar o vídeo com legendas: {str(e)}. Tentando novamente sem legendas...")
+                    
+                    # Remover opções de legendas que podem estar causando o erro
+                    for key in ('writesubtitles', 'writeautomaticsub', 'subtitleslangs', 'subtitlesformat'):
+                        ydl_opts.pop(key, None)
+                    
+                    # Tenta novamente apenas o vídeo
+                    if not cached_path:
+                        self._download_from_info(info, ydl_opts, youtube_url)
+            
+            # Keep the new download for later requests of the same video
+            if not cached_path and self.download_cache and cache_key and os.path.exists(output_path):
+                self.download_cache.put(cache_key, output_path, metadata={
+                    'title': video_title,
+                    'url': youtube_url,
+                    'format': ydl_opts['format']
+                })
             
             # Check if file exists
             if not os.path.exists(output_path):
@@ -183,9 +364,169 @@ class VideoProcessor:
                 return output_path
             
         except Exception as e:
-            st.error(f"Erro ao baixar vídeo do YouTube: {str(e)}")
+            self.reporter.error(f"Erro ao baixar vídeo do YouTube: {str(e)}")
             raise Exception(f"Erro ao baixar vídeo do YouTube: {str(e)}")
             
+    def download_youtube_audio(self, youtube_url, output_dir, concurrent_fragments=None):
+        """Download only the best audio stream of a YouTube video.
+        
+        Meant for transcription-only jobs: the audio file can be passed directly
+        to SubtitleProcessor.transcribe_video(), skipping the video download.
+        
+        Args:
+            youtube_url (str): URL of the YouTube video.
+            output_dir (str): Directory to save the audio file.
+            concurrent_fragments (int, optional): Number of DASH/HLS fragments
+                downloaded at the same time. Defaults to DEFAULT_CONCURRENT_FRAGMENTS.
+            
+        Returns:
+            str: Path to the downloaded audio file (usually .m4a or .webm).
+        """
+        try:
+            status = self.reporter.status_line()
+            status.write("Obtendo informações do vídeo...")
+            
+            os.makedirs(output_dir, exist_ok=True)
+            
+            info = self._extract_youtube_info(youtube_url)
+            video_title = info.get('title') or 'Vídeo do YouTube'
+            audio_format = self.YOUTUBE_AUDIO_FORMAT
+            output_stem = os.path.join(output_dir, f"youtube_audio_{self._safe_video_id(info)}")
+            
+            # Reuse an earlier download of the same audio stream
+            cache_key = FileCache.make_key(info.get('extractor_key', ''), info.get('id', youtube_url), audio_format)
+            cached_path = self.download_cache.get(cache_key) if self.download_cache else None
+            if cached_path:
+                status.write(f"Áudio encontrado no cache de downloads: {video_title}")
+                return materialize(cached_path, output_stem + os.path.splitext(cached_path)[1], allow_hardlink=False)
+            
+            ydl_opts = {
+                'format': audio_format,
+                'outtmpl': output_stem + '.%(ext)s',
+                'quiet': True,
+                'no_warnings': True,
+                'progress': False,
+            }
+            ydl_opts.update(self._get_resumable_download_opts(concurrent_fragments))
+            
+            status.write(f"Baixando apenas o áudio de: {video_title}")
+            processed = self._download_from_info(info, ydl_opts)
+            
+            # The extension depends on the stream yt-dlp picked
+            downloads = processed.get('requested_downloads') or [{}]
+            audio_path = downloads[0].get('filepath')
+            if not audio_path or not os.path.exists(audio_path):
+                raise Exception("Falha ao baixar o áudio - arquivo não foi criado")
+            
+            if self.download_cache:
+                self.download_cache.put(cache_key, audio_path, metadata={
+                    'title': video_title,
+                    'url': youtube_url,
+                    'format': audio_format
+                })
+            
+            status.write("✅ Download do áudio concluído!")
+            return audio_path
+            
+        except Exception as e:
+            self.reporter.error(f"Erro ao baixar áudio do YouTube: {str(e)}")
+            raise Exception(f"Erro ao baixar áudio do YouTube: {str(e)}")
+    
+    def stream_youtube_transcription(self, youtube_url, output_path, model="tiny", quality_preset="fast",
+                                     chunk_seconds=10, concurrent_fragments=None, on_update=None):
+        """Transcribe a YouTube video while its audio is still downloading.
+        
+        yt-dlp streams the best audio to stdout, ffmpeg decodes it into WAV chunks
+        of chunk_seconds as bytes arrive, and the received audio is transcribed in
+        pieces cut at pauses in the speech, with a Whisper model loaded once (see
+        SubtitleProcessor.transcribe_chunk_stream). The first subtitles are ready
+        after the first pause past SubtitleProcessor.STREAM_MIN_PIECE_SECONDS, and
+        the total time approaches the longer of download and transcription instead
+        of their sum.
+        
+        Args:
+            youtube_url (str): URL of the YouTube video.
+            output_path (str): Path to save the SRT file; it is updated after every piece.
+            model (str): Whisper model to use ('tiny', 'base', 'small', 'medium').
+            quality_preset (str): Preset de qualidade ('fast', 'balanced', 'high').
+            chunk_seconds (float): Length of the chunks written by ffmpeg, i.e. how
+                often the received audio is checked for a pause to cut at.
+            concurrent_fragments (int, optional): Number of DASH/HLS fragments
+                downloaded at the same time. Defaults to DEFAULT_CONCURRENT_FRAGMENTS.
+            on_update (callable, optional): Called as on_update(cue_count, seconds_done)
+                after each transcribed piece.
+            
+        Returns:
+            str: Path to the generated SRT file.
+        """
+        output_dir = os.path.dirname(os.path.abspath(output_path))
+        os.makedirs(output_dir, exist_ok=True)
+        
+        downloader = None
+        decoder = None
+        scratch = contextlib.ExitStack()
+        try:
+            # Fail early (and warm the metadata cache) if the URL is invalid
+            info = self._extract_youtube_info(youtube_url)
+            
+            # Decoding runs ahead of transcription, so the chunks may add up to the whole audio
+            expected_bytes = int((info.get('duration') or 3600) * SubtitleProcessor.AUDIO_BYTES_PER_SECOND * 1.1)
+            work_dir = scratch.enter_context(
+                get_scratch_space().directory("stream_transcription_", expected_bytes, fallback_dir=output_dir)
+            )
+            
+            fragments = concurrent_fragments or self.DEFAULT_CONCURRENT_FRAGMENTS
+            download_cmd = [
+                sys.executable, "-m", "yt_dlp", "--quiet", "--no-warnings",
+                "-f", "bestaudio/best", "--concurrent-fragments", str(fragments),
+                "-o", "-", youtube_url
+            ]
+            
+            segment_list_path = os.path.join(work_dir, "chunks.csv")
+            decode_cmd = ["ffmpeg", "-i", "pipe:0"] + self.subtitle_processor.AUDIO_EXTRACTION_ARGS + [
+                "-f", "segment", "-segment_time", str(chunk_seconds),
+                "-segment_list", segment_list_path, "-segment_list_type", "csv",
+                "-y", os.path.join(work_dir, "chunk_%05d.wav")
+            ]
+            
+            with open(os.path.join(work_dir, "download.log"), 'w') as download_log, \
+                    open(os.path.join(work_dir, "decode.log"), 'w') as decode_log:
+                downloader = subprocess.Popen(download_cmd, stdout=subprocess.PIPE, stderr=download_log)
+                decoder = subprocess.Popen(decode_cmd, stdin=downloader.stdout,
+                                           stdout=subprocess.DEVNULL, stderr=decode_log)
+                # Let the downloader get SIGPIPE if the decoder exits early
+                downloader.stdout.close()
+                
+                try:
+                    self.subtitle_processor.transcribe_chunk_stream(
+                        work_dir, segment_list_path, output_path, decoder,
+                        model=model, quality_preset=quality_preset, on_update=on_update,
+                        producer_log=os.path.join(work_dir, "decode.log")
+                    )
+                except Exception:
+                    # A failed download also breaks the decoder: report the root cause
+                    if downloader.poll() not in (None, 0):
+                        self._raise_download_error(work_dir)
+                    raise
+            
+            if downloader.wait() != 0:
+                self._raise_download_error(work_dir)
+            
+            return output_path
+        except Exception as e:
+            raise Exception(f"Erro na transcrição em fluxo do YouTube: {str(e)}")
+        finally:
+            for process in (decoder, downloader):
+                if process is not None and process.poll() is None:
+                    process.kill()
+                    process.wait()
+            scratch.close()
+    
+    def _raise_download_error(self, work_dir):
+        """Raise the streaming downloader's error, from download.log in work_dir."""
+        with open(os.path.join(work_dir, "download.log"), 'r', errors='replace') as f:
+            raise Exception(f"Erro no download do áudio: {f.read().strip()}")
+    
     def download_youtube_subtitles(self, youtube_url, output_dir):
         """Download only subtitles from YouTube using yt-dlp.
         
@@ -198,16 +539,19 @@ class VideoProcessor:
         """
         try:
             # Create a progress message
-            status = st.empty()
+            status = self.reporter.status_line()
             status.write("Verificando legendas disponíveis...")
             
-            # Generate an output filename with timestamp to avoid conflicts
-            timestamp = int(time.time())
-            output_filename = f"youtube_subtitles_{timestamp}"
-            
             # Ensure output directory exists
             os.makedirs(output_dir, exist_ok=True)
             
+            # Metadata comes from the shared cache when the video was already looked up
+            info = self._extract_youtube_info(youtube_url)
+            video_title = info.get('title') or 'Vídeo do YouTube'
+            
+            # Stable filename per video
+            output_filename = f"youtube_subtitles_{self._safe_video_id(info)}"
+            
             # Configure yt-dlp options for subtitles only
             ydl_opts = {
                 'skip_download': True,       # Skip video download
@@ -219,39 +563,19 @@ class VideoProcessor:
                 'quiet': True,               # Less verbose output
                 'no_warnings': True          # No warnings
             }
-            
-            # First check if video has subtitles
-            info = None
-            video_title = 'Vídeo do YouTube'
-            
-            try:
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    info = ydl.extract_info(youtube_url, download=False)
-                    if info and isinstance(info, dict):
-                        video_title = info.get('title', 'Vídeo do YouTube')
-            except Exception:
-                status.write("Erro ao obter informações do vídeo, mas tentando baixar as legendas mesmo assim.")
                 
             # Check if video has available subtitles
-            has_subtitles = False
-            if info and isinstance(info, dict):
-                if 'subtitles' in info and info['subtitles']:
-                    has_subtitles = True
-                    status.write(f"Legendas oficiais encontradas para: {video_title}")
-                elif 'automatic_captions' in info and info['automatic_captions']:
-                    has_subtitles = True
-                    status.write(f"Legendas automáticas encontradas para: {video_title}")
-                else:
-                    status.write(f"❌ O vídeo '{video_title}' não possui legendas disponíveis.")
-                    return None
+            if info.get('subtitles'):
+                status.write(f"Legendas oficiais encontradas para: {video_title}")
+            elif info.get('automatic_captions'):
+                status.write(f"Legendas automáticas encontradas para: {video_title}")
             else:
-                # Sem informações suficientes, vamos tentar baixar mesmo assim
-                status.write("Tentando baixar legendas mesmo sem informações detalhadas...")
+                status.write(f"❌ O vídeo '{video_title}' não possui legendas disponíveis.")
+                return None
                 
             # Download the subtitles
             status.write("Baixando legendas...")
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                ydl.download([youtube_url])
+            self._download_from_info(info, ydl_opts)
             
             # Look for the downloaded subtitle file - yt-dlp will add language code extension
             pt_subtitle_path = os.path.join(output_dir, f"{output_filename}.pt.srt")
@@ -270,9 +594,301 @@ class VideoProcessor:
                 return None
                 
         except Exception as e:
-            st.error(f"Erro ao baixar legendas do YouTube: {str(e)}")
+            self.reporter.error(f"Erro ao baixar legendas do YouTube: {str(e)}")
             return None
     
+    def list_youtube_playlist(self, playlist_url):
+        """List the videos of a YouTube playlist or channel without resolving them.
+        
+        Uses yt-dlp flat extraction, so only the listing pages are fetched: no
+        per-video metadata or format lookups. Channel tabs (videos, shorts,
+        lives) are expanded into their videos.
+        
+        Args:
+            playlist_url (str): URL of the playlist or channel.
+            
+        Returns:
+            list: Dictionaries with 'index', 'id', 'url', 'title' and 'extractor_key'
+                for each video, in playlist order.
+        """
+        import yt_dlp
+        
+        ydl_opts = {'quiet': True, 'no_warnings': True, 'extract_flat': 'in_playlist'}
+        
+        entries = []
+        seen_ids = set()
+        pending = [playlist_url]
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            while pending:
+                info = ydl.extract_info(pending.pop(0), download=False)
+                if not info:
+                    continue
+                
+                # A single video URL is a playlist of one
+                if info.get('_type', 'video') == 'video':
+                    info = {'entries': [info]}
+                
+                for entry in info.get('entries') or []:
+                    if not entry:
+                        continue
+                    # Channel pages list their tabs, which are playlists themselves
+                    if entry.get('_type') == 'playlist' or entry.get('ie_key') == 'YoutubeTab':
+                        if entry.get('url'):
+                            pending.append(entry['url'])
+                        continue
+                    
+                    video_id = entry.get('id')
+                    if not video_id or video_id in seen_ids:
+                        continue
+                    seen_ids.add(video_id)
+                    
+                    entries.append({
+                        'index': len(entries) + 1,
+                        'id': video_id,
+                        'url': entry.get('webpage_url') or entry.get('url') or video_id,
+                        'title': entry.get('title') or video_id,
+                        'extractor_key': entry.get('ie_key') or entry.get('extractor_key') or 'Youtube'
+                    })
+        
+        if not entries:
+            raise Exception("Nenhum vídeo encontrado na playlist ou canal")
+        
+        return entries
+    
+    def process_youtube_playlist(self, playlist_url, output_dir, quality="medium", audio_only=False,
+                                 transcribe=False, model="tiny", download_workers=None,
+                                 transcribe_workers=None, concurrent_fragments=None, on_item_done=None):
+        """Download (and optionally transcribe) every video of a playlist or channel.
+        
+        The playlist is listed once with flat extraction, then items go through
+        two bounded pools: downloads run download_workers at a time, and each
+        finished download is queued for transcription, which runs
+        transcribe_workers at a time. Items already in the download cache are
+        linked instead of downloaded, and items whose SRT already exists in
+        output_dir are not transcribed again. A failing item doesn't stop the
+        others; its error is reported in the summary.
+        
+        Args:
+            playlist_url (str): URL of the playlist or channel.
+            output_dir (str): Directory to save the downloaded files and subtitles.
+            quality (str): Quality preset for video downloads ('low', 'medium', 'high').
+            audio_only (bool): Download only the audio (enough for transcription).
+            transcribe (bool): Whether to transcribe each downloaded item.
+            model (str): Whisper model to use ('tiny', 'base', 'small', 'medium').
+            download_workers (int, optional): Downloads running at the same time.
+                Defaults to DEFAULT_PLAYLIST_DOWNLOAD_WORKERS.
+            transcribe_workers (int, optional): Transcriptions running at the same
+                time. Defaults to DEFAULT_PLAYLIST_TRANSCRIBE_WORKERS.
+            concurrent_fragments (int, optional): Fragments downloaded at the same
+                time within each download.
+            on_item_done (callable, optional): Called with each item's summary
+                dictionary as soon as the item is finished.
+            
+        Returns:
+            list: One summary dictionary per video, in playlist order, with 'index',
+                'id', 'title', 'url', 'media_path', 'subtitle_path', 'downloaded'
+                ('cached', 'downloaded' or 'failed'), 'transcribed' ('cached',
+                'transcribed', 'failed' or None), 'error' and 'seconds'.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        items = self.list_youtube_playlist(playlist_url)
+        
+        media_format = self.YOUTUBE_AUDIO_FORMAT if audio_only else self.YOUTUBE_FORMATS.get(quality, self.YOUTUBE_FORMATS['medium'])
+        for item in items:
+            item.update({
+                'media_path': None,
+                'subtitle_path': None,
+                'downloaded': None,
+                'transcribed': None,
+                'error': None,
+                'seconds': 0.0
+            })
+        
+        def finish(item):
+            if on_item_done:
+                on_item_done(item)
+        
+        def download(item):
+            start_time = time.time()
+            try:
+                cache_key = FileCache.make_key(item['extractor_key'], item['id'], media_format)
+                was_cached = bool(self.download_cache and self.download_cache.get(cache_key))
+                
+                if audio_only:
+                    item['media_path'] = self.download_youtube_audio(
+                        item['url'], output_dir, concurrent_fragments=concurrent_fragments
+                    )
+                else:
+                    item['media_path'] = self.download_youtube_video(
+                        item['url'], output_dir, quality=quality, concurrent_fragments=concurrent_fragments
+                    )
+                item['downloaded'] = 'cached' if was_cached else 'downloaded'
+            except Exception as e:
+                item['downloaded'] = 'failed'
+                item['error'] = str(e)
+            item['seconds'] += time.time() - start_time
+            return item
+        
+        def transcribe_item(item):
+            start_time = time.time()
+            subtitle_path = os.path.splitext(item['media_path'])[0] + ".srt"
+            try:
+                if os.path.exists(subtitle_path) and os.path.getsize(subtitle_path) > 0:
+                    item['transcribed'] = 'cached'
+                else:
+                    self.subtitle_processor.transcribe_video(
+                        item['media_path'], subtitle_path, model=model, raise_on_error=True
+                    )
+                    item['transcribed'] = 'transcribed'
+                item['subtitle_path'] = subtitle_path
+            except Exception as e:
+                item['transcribed'] = 'failed'
+                item['error'] = str(e)
+            item['seconds'] += time.time() - start_time
+            finish(item)
+            return item
+        
+        download_workers = max(1, download_workers or self.DEFAULT_PLAYLIST_DOWNLOAD_WORKERS)
+        transcribe_workers = max(1, transcribe_workers or self.DEFAULT_PLAYLIST_TRANSCRIBE_WORKERS)
+        
+        with ThreadPoolExecutor(max_workers=download_workers) as download_pool, \
+                ThreadPoolExecutor(max_workers=transcribe_workers) as transcribe_pool:
+            download_futures = [download_pool.submit(download, item) for item in items]
+            transcribe_futures = []
+            
+            # Hand each download to the transcription pool as soon as it finishes
+            for future in as_completed(download_futures):
+                item = future.result()
+                if transcribe and item['downloaded'] != 'failed':
+                    transcribe_futures.append(transcribe_pool.submit(transcribe_item, item))
+                else:
+                    finish(item)
+            
+            for future in transcribe_futures:
+                future.result()
+        
+        return items
+    
+    def _extract_youtube_info(self, youtube_url):
+        """Extract yt-dlp metadata for a URL, reusing cached results.
+        
+        The extraction runs with process=False, so the result still holds every
+        available format and subtitle track and can be handed to
+        _download_from_info() with any format selection. Results are cached
+        per (extractor, video id) for INFO_CACHE_TTL seconds, since the media
+        URLs inside them expire.
+        
+        Args:
+            youtube_url (str): URL of the video.
+            
+        Returns:
+            dict: A private copy of the yt-dlp info dictionary.
+        """
+        now = time.time()
+        with _info_cache_lock:
+            key = _info_cache_urls.get(youtube_url)
+            entry = _info_cache.get(key) if key else None
+            if entry and now - entry[0] < INFO_CACHE_TTL:
+                _info_cache.move_to_end(key)
+                return copy.deepcopy(entry[1])
+        
+        import yt_dlp
+        
+        with yt_dlp.YoutubeDL({'quiet': True, 'no_warnings': True}) as ydl:
+            info = ydl.extract_info(youtube_url, download=False, process=False)
+        
+        if not info or not isinstance(info, dict):
+            raise Exception("Não foi possível obter informações do vídeo")
+        
+        key = f"{info.get('extractor_key', '')}:{info.get('id', youtube_url)}"
+        with _info_cache_lock:
+            _info_cache[key] = (now, info)
+            _info_cache.move_to_end(key)
+            _info_cache_urls[youtube_url] = key
+            while len(_info_cache) > INFO_CACHE_MAX_ENTRIES:
+                evicted_key, _ = _info_cache.popitem(last=False)
+                for url in [u for u, k in _info_cache_urls.items() if k == evicted_key]:
+                    del _info_cache_urls[url]
+        
+        return copy.deepcopy(info)
+    
+    def estimate_youtube_download_size(self, youtube_url, quality="medium", audio_only=False):
+        """Estimate the size of a YouTube download before starting it.
+
+        Uses the cached metadata from _extract_youtube_info(), so the download
+        that follows doesn't extract it again.
+
+        Args:
+            youtube_url (str): URL of the YouTube video.
+            quality (str): Quality preset ('low', 'medium', 'high').
+            audio_only (bool): Estimate the audio-only download instead.
+
+        Returns:
+            int: Estimated size in bytes (yt-dlp's filesize or filesize_approx
+                of the selected formats), or 0 when unknown.
+        """
+        try:
+            import yt_dlp
+
+            info = self._extract_youtube_info(youtube_url)
+            selector = self.YOUTUBE_AUDIO_FORMAT if audio_only else self.YOUTUBE_FORMATS.get(quality, self.YOUTUBE_FORMATS['medium'])
+            with yt_dlp.YoutubeDL({'format': selector, 'quiet': True, 'no_warnings': True}) as ydl:
+                selected = ydl.process_ie_result(info, download=False)
+
+            formats = selected.get('requested_formats') or [selected]
+            return sum(int(f.get('filesize') or f.get('filesize_approx') or 0) for f in formats)
+        except Exception:
+            # A estimativa é só para a cota; o download mostra o erro real
+            return 0
+
+    def _safe_video_id(self, info):
+        """Get a filesystem-safe version of the video id from yt-dlp metadata."""
+        video_id = str(info.get('id') or 'video')
+        return re.sub(r'[^A-Za-z0-9_-]', '_', video_id)
+    
+    def _get_resumable_download_opts(self, concurrent_fragments=None):
+        """Get yt-dlp options for parallel fragment downloads and resuming.
+        
+        Args:
+            concurrent_fragments (int, optional): Number of DASH/HLS fragments
+                downloaded at the same time. Defaults to DEFAULT_CONCURRENT_FRAGMENTS.
+            
+        Returns:
+            dict: yt-dlp options.
+        """
+        if not concurrent_fragments:
+            concurrent_fragments = self.DEFAULT_CONCURRENT_FRAGMENTS
+        
+        return {
+            'concurrent_fragment_downloads': max(1, int(concurrent_fragments)),
+            'continuedl': True,         # Resume partially downloaded files
+            'nopart': False,            # Keep .part files so interrupted downloads can resume
+            'retries': 10,
+            'fragment_retries': 10,
+        }
+    
+    def _download_from_info(self, info, ydl_opts, youtube_url=None):
+        """Run format selection and download for already extracted metadata.
+        
+        Args:
+            info (dict): Info dictionary from _extract_youtube_info(), or None
+                to extract and download youtube_url in one go.
+            ydl_opts (dict): yt-dlp options (format, outtmpl, subtitles...).
+            youtube_url (str, optional): URL used when info is None.
+            
+        Returns:
+            dict: The processed info dictionary (None when info is None).
+        """
+        import yt_dlp
+        
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            if info is None:
+                ydl.download([youtube_url])
+                return None
+
+            # process_ie_result mutates the dictionary, so keep the caller's copy intact
+            return ydl.process_ie_result(copy.deepcopy(info), download=True)
+    
     def get_video_duration(self, video_path):
         """Get the duration of a video file in seconds.
         
@@ -283,6 +899,14 @@ class VideoProcessor:
             float: Duration of the video in seconds.
         """
         try:
+            # Reuse the result for files that haven't changed since the last probe
+            stat = os.stat(video_path)
+            probe_key = (stat.st_dev, stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            with _probe_cache_lock:
+                if probe_key in _probe_cache:
+                    _probe_cache.move_to_end(probe_key)
+                    return _probe_cache[probe_key]
+            
             # Use ffprobe to get duration
             ffprobe_cmd = [
                 "ffprobe", "-v", "error", "-show_entries", "format=duration",
@@ -297,6 +921,12 @@ class VideoProcessor:
             # Parse JSON output
             output = json.loads(result.stdout)
             duration = float(output['format']['duration'])
+            
+            with _probe_cache_lock:
+                _probe_cache[probe_key] = duration
+                while len(_probe_cache) > PROBE_CACHE_MAX_ENTRIES:
+                    _probe_cache.popitem(last=False)
+            
             return duration
         except Exception as e:
             raise Exception(f"Erro ao obter duração do vídeo: {str(e)}")
@@ -358,14 +988,38 @@ class VideoProcessor:
         segments_dir = os.path.join(output_dir, "segments")
         os.makedirs(segments_dir, exist_ok=True)
         
+        # Segments left in place by the previous split of the same video
+        source = self._source_identity(video_path)
+        manifest = self._read_segment_manifest(segments_dir)
+        previous = {}
+        if manifest.get('source') == source and manifest.get('quality') == quality \
+                and manifest.get('encoder') == self.encoder:
+            previous = {entry['filename']: entry for entry in manifest.get('segments', [])}
+        
         # Process each segment
+        reused = 0
+        manifest_entries = []
         for i, (start, end) in enumerate(zip(start_times, end_times)):
             # Define output paths
             segment_video_path = os.path.join(segments_dir, f"segment_{i+1}.mp4")
             segment_subtitle_path = os.path.join(segments_dir, f"segment_{i+1}.srt")
             
-            # Extract video segment with specified quality
-            self._extract_video_segment(video_path, segment_video_path, start, end - start, quality=quality)
+            # Keep the video file when its bounds didn't change (e.g. only the subtitles are new),
+            # otherwise extract it with specified quality unless an identical one was cut before
+            entry = previous.get(os.path.basename(segment_video_path))
+            if self._segment_unchanged(entry, segment_video_path, start, end):
+                reused += 1
+            elif self._extract_cached_segment(video_path, segment_video_path, start, end, quality):
+                reused += 1
+            
+            stat = os.stat(segment_video_path)
+            manifest_entries.append({
+                'filename': os.path.basename(segment_video_path),
+                'start': round(start, 3),
+                'end': round(end, 3),
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns
+            })
             
             # Extract subtitle segment
             self.subtitle_processor.extract_subtitle_segment(subtitle_path, segment_subtitle_path, start, end)
@@ -378,8 +1032,127 @@ class VideoProcessor:
                 'end_time': end
             })
         
+        self._write_segment_manifest(segments_dir, {
+            'source': source,
+            'quality': quality,
+            'encoder': self.encoder,
+            'segments': manifest_entries
+        })
+        
+        if reused:
+            self.reporter.info(f"{reused} de {len(segments)} segmentos reaproveitados de uma divisão anterior.")
+        
         return segments
     
+    def resplit_subtitles(self, segments, subtitle_path):
+        """Regenerate the subtitles of already split segments from a new SRT file.
+        
+        Use this after re-transcribing or editing the subtitles: the video
+        segments stay as they are and only each segment's SRT is rewritten.
+        Videos burned from the old subtitles (see embed_subtitles_segments())
+        are deleted and their 'embedded_path' key is removed.
+        
+        Args:
+            segments (list): Segments returned by split_video_custom_timestamps()
+                or split_video_equal_parts().
+            subtitle_path (str): Path to the new subtitle file.
+            
+        Returns:
+            list: The same segments, now with subtitles from subtitle_path.
+        """
+        for segment in segments:
+            self.subtitle_processor.extract_subtitle_segment(
+                subtitle_path, segment['subtitle_path'], segment['start_time'], segment['end_time']
+            )
+            
+            # O vídeo com as legendas antigas gravadas não corresponde mais ao SRT
+            stale_path = segment.pop('embedded_path', None)
+            if stale_path:
+                try:
+                    os.remove(stale_path)
+                except OSError:
+                    pass
+        return segments
+    
+    def _source_identity(self, video_path):
+        """Identify a source video by path, inode, modification time and size."""
+        stat = os.stat(video_path)
+        return {
+            'path': os.path.abspath(video_path),
+            'inode': stat.st_ino,
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size
+        }
+    
+    def _read_segment_manifest(self, segments_dir):
+        """Read the manifest of the last split into segments_dir (empty if missing)."""
+        try:
+            with open(os.path.join(segments_dir, self.SEGMENT_MANIFEST), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def _write_segment_manifest(self, segments_dir, manifest):
+        """Write the segment manifest atomically."""
+        manifest_path = os.path.join(segments_dir, self.SEGMENT_MANIFEST)
+        temp_path = f"{manifest_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+        os.replace(temp_path, manifest_path)
+    
+    def _segment_unchanged(self, entry, segment_video_path, start, end):
+        """Check whether a segment file from the previous split can be kept as is."""
+        if not entry or entry['start'] != round(start, 3) or entry['end'] != round(end, 3):
+            return False
+        try:
+            stat = os.stat(segment_video_path)
+        except OSError:
+            return False
+        return stat.st_size == entry['size'] and stat.st_mtime_ns == entry['mtime_ns']
+    
+    def _extract_cached_segment(self, video_path, output_path, start, end, quality="medium"):
+        """Extract a video segment, reusing an identical segment cut before.
+        
+        Segments are cached by the source content, the bounds, the quality
+        and the encoder, so re-splitting after moving a few timestamps only
+        re-extracts the segments whose bounds changed. The segment and its
+        cache entry share their bytes (reflink, or a hardlink), so the cache
+        doesn't double the disk used by a split.
+        
+        Args:
+            video_path (str): Path to the input video file.
+            output_path (str): Path to save the segment.
+            start (float): Start time of the segment in seconds.
+            end (float): End time of the segment in seconds.
+            quality (str): Quality preset ('low', 'medium', 'high').
+            
+        Returns:
+            bool: True if the segment came from the cache.
+        """
+        # The previous segment may be linked to a cache entry: never write through it
+        if os.path.lexists(output_path):
+            os.remove(output_path)
+        
+        if not self.segment_cache:
+            self._extract_video_segment(video_path, output_path, start, end - start, quality=quality)
+            return False
+        
+        cache_key = FileCache.make_key(
+            'segment', content_hash(video_path), f"{start:.3f}", f"{end:.3f}", quality, self.encoder
+        )
+        # Segments are replaced (removed above), never edited in place, so they may be
+        # hardlinked; a write through the link would be caught by segment_cache.get()
+        cached_path = self.segment_cache.get(cache_key)
+        if cached_path:
+            materialize(cached_path, output_path, allow_hardlink=True)
+            return True
+        
+        self._extract_video_segment(video_path, output_path, start, end - start, quality=quality)
+        self.segment_cache.put(
+            cache_key, output_path, metadata={'start': start, 'end': end, 'quality': quality}, allow_hardlink=True
+        )
+        return False
+    
     def _extract_video_segment(self, input_path, output_path, start_time, duration, quality="medium"):
         """Extract a segment from a video file with improved quality.
         
@@ -392,18 +1165,7 @@ class VideoProcessor:
         """
         try:
             # Configure quality settings
-            if quality == "low":
-                # Fast compression, lower quality
-                video_codec = ["-c:v", "libx264", "-preset", "ultrafast", "-crf", "28"]
-                audio_codec = ["-c:a", "aac", "-b:a", "128k"]
-            elif quality == "high":
-                # Slow compression, high quality
-                video_codec = ["-c:v", "libx264", "-preset", "slow", "-crf", "18", "-profile:v", "high"]
-                audio_codec = ["-c:a", "aac", "-b:a", "192k"]
-            else:  # medium (default)
-                # Balanced settings
-                video_codec = ["-c:v", "libx264", "-preset", "medium", "-crf", "23"]
-                audio_codec = ["-c:a", "aac", "-b:a", "160k"]
+            video_codec, audio_codec = self._get_codec_settings(quality)
                 
             # Check if we can directly copy the stream (much faster)
             # This works when segment boundaries align with keyframes
@@ -442,7 +1204,76 @@ class VideoProcessor:
         except Exception as e:
             raise Exception(f"Erro ao extrair segmento de vídeo: {str(e)}")
     
-    def embed_subtitles(self, video_path, subtitle_path, output_path, quality="medium", subtitle_style=None):
+    def _get_codec_settings(self, quality="medium", threads=None, encoder=None):
+        """Get the ffmpeg codec arguments for a quality preset.
+        
+        Args:
+            quality (str): Quality preset ('low', 'medium', 'high').
+            threads (int, optional): Number of encoder threads. Defaults to ffmpeg's choice.
+            encoder (str, optional): Encoder to use instead of self.encoder.
+            
+        Returns:
+            tuple: (video_codec, audio_codec) argument lists.
+        """
+        return get_encoder_args(quality, encoder or self.encoder, threads=threads)
+    
+    def _build_subtitle_filter(self, subtitle_path, subtitle_style=None):
+        """Build the ffmpeg subtitles filter used to burn subtitles into a video.
+        
+        Args:
+            subtitle_path (str): Path to the subtitle file.
+            subtitle_style (dict, optional): Custom styling for subtitles.
+            
+        Returns:
+            str: Value for the ffmpeg -vf option.
+        """
+        # Escape subtitle path for use in filter
+        subtitle_path_esc = _escape_filter_value(subtitle_path)
+        
+        # Configure subtitle style
+        if subtitle_style is None:
+            # Default style - good readability with shadow
+            subtitle_style = {
+                'fontsize': 24,
+                'fontcolor': 'white',
+                'bordercolor': 'black',
+                'borderw': 1.5,
+                'shadowcolor': 'black',
+                'shadowx': 2,
+                'shadowy': 2
+            }
+        
+        # Build style string; only allowed keys and plain values get here, and
+        # they are escaped anyway, so a style can never add filters of its own
+        style_parts = []
+        for key, value in validate_subtitle_style(subtitle_style):
+            style_parts.append(f"{key}={value}")
+        style_string = _escape_filter_value(",".join(style_parts))
+        
+        return f"subtitles='{subtitle_path_esc}':force_style='{style_string}'"
+    
+    def _resolve_workers(self, max_workers=None):
+        """Get the number of parallel ffmpeg jobs to run (at most one per CPU)."""
+        cpu_count = max(1, os.cpu_count() or 1)
+        if max_workers:
+            return min(max(1, int(max_workers)), cpu_count)
+        return cpu_count
+    
+    def _run_in_pool(self, func, items, max_workers):
+        """Run func over items with a bounded thread pool, preserving order.
+        
+        ffmpeg does the heavy work in its own process, so threads are enough
+        to keep several encoders busy at once.
+        
+        Raises:
+            Exception: The first error raised by any of the jobs.
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(func, item) for item in items]
+            return [future.result() for future in futures]
+    
+    def embed_subtitles(self, video_path, subtitle_path, output_path, quality="medium", subtitle_style=None,
+                        mode="hard", max_workers=None):
         """Embed subtitles into a video file with improved quality and styling.
         
         Args:
@@ -451,65 +1282,540 @@ class VideoProcessor:
             output_path (str): Path to save the output video with embedded subtitles.
             quality (str): Quality preset ('low', 'medium', 'high').
             subtitle_style (dict, optional): Custom styling for subtitles.
+            mode (str): Embedding mode ('hard', 'parallel', 'sparse', 'soft').
+                - hard: Re-encoda o vídeo inteiro em um único processo ffmpeg
+                - parallel: Divide o vídeo nos keyframes, incorpora as legendas
+                  nos blocos em paralelo e concatena o resultado sem perdas
+                - sparse: Re-encoda apenas os trechos que têm legendas e copia o
+                  restante sem re-encodar (requer vídeo H.264; caso contrário
+                  usa o modo parallel)
+                - soft: Adiciona as legendas como uma faixa selecionável no player,
+                  sem re-encodar o vídeo (quality e subtitle_style são ignorados)
+            max_workers (int, optional): Maximum number of parallel ffmpeg jobs
+                for the 'parallel' and 'sparse' modes. Defaults to the number of CPUs.
             
         Returns:
             str: Path to the output video with embedded subtitles.
         """
         try:
-            # Configure quality settings
-            if quality == "low":
-                # Fast compression, lower quality
-                video_codec = ["-c:v", "libx264", "-preset", "ultrafast", "-crf", "28"]
-                audio_codec = ["-c:a", "aac", "-b:a", "128k"]
-            elif quality == "high":
-                # Slow compression, high quality
-                video_codec = ["-c:v", "libx264", "-preset", "slow", "-crf", "18", "-profile:v", "high"]
-                audio_codec = ["-c:a", "aac", "-b:a", "192k"]
-            else:  # medium (default)
-                # Balanced settings
-                video_codec = ["-c:v", "libx264", "-preset", "medium", "-crf", "23"]
-                audio_codec = ["-c:a", "aac", "-b:a", "160k"]
-                
-            # Escape subtitle path for use in filter
-            subtitle_path_esc = subtitle_path.replace("'", "'\\''")  # Escape single quotes
-            
-            # Configure subtitle style
-            if subtitle_style is None:
-                # Default style - good readability with shadow
-                subtitle_style = {
-                    'fontsize': 24,
-                    'fontcolor': 'white',
-                    'bordercolor': 'black',
-                    'borderw': 1.5,
-                    'shadowcolor': 'black',
-                    'shadowx': 2,
-                    'shadowy': 2
-                }
+            if mode == "soft":
+                return self._mux_soft_subtitles(video_path, subtitle_path, output_path)
             
-            # Build style string
-            style_parts = []
-            for key, value in subtitle_style.items():
-                style_parts.append(f"{key}={value}")
-            style_string = ":".join(style_parts)
+            if mode == "sparse":
+                return self._embed_subtitles_sparse(
+                    video_path, subtitle_path, output_path, quality, subtitle_style, max_workers
+                )
             
-            # Build ffmpeg command
-            ffmpeg_cmd = [
-                "ffmpeg", "-i", video_path,
-                "-vf", f"subtitles='{subtitle_path_esc}':force_style='{style_string}'"
-            ]
+            if mode == "parallel":
+                return self._embed_subtitles_parallel(
+                    video_path, subtitle_path, output_path, quality, subtitle_style, max_workers
+                )
             
-            # Add codec settings
-            ffmpeg_cmd.extend(video_codec)
+            return self._burn_subtitles(video_path, subtitle_path, output_path, quality, subtitle_style)
+        except Exception as e:
+            raise Exception(f"Erro ao incorporar legendas: {str(e)}")
+    
+    def _mux_soft_subtitles(self, video_path, subtitle_path, output_path):
+        """Add the subtitles as a separate stream, copying audio and video as-is.
+        
+        The subtitle codec follows the output container: mov_text for MP4/MOV,
+        WebVTT for WebM and SRT for everything else (e.g. MKV).
+        
+        Args:
+            video_path (str): Path to the video file.
+            subtitle_path (str): Path to the subtitle file.
+            output_path (str): Path to save the output video.
+            
+        Returns:
+            str: Path to the output video.
+        """
+        extension = os.path.splitext(output_path)[1].lower()
+        subtitle_codecs = {
+            '.mp4': 'mov_text',
+            '.m4v': 'mov_text',
+            '.mov': 'mov_text',
+            '.webm': 'webvtt',
+        }
+        subtitle_codec = subtitle_codecs.get(extension, 'srt')
+        
+        ffmpeg_cmd = [
+            "ffmpeg", "-i", video_path, "-i", subtitle_path,
+            "-map", "0:v?", "-map", "0:a?", "-map", "1:0",
+            "-c", "copy", "-c:s", subtitle_codec,
+            "-disposition:s:0", "default"
+        ]
+        if subtitle_codec == 'mov_text':
+            ffmpeg_cmd.extend(["-movflags", "+faststart"])
+        ffmpeg_cmd.extend(["-y", output_path])
+        
+        result = subprocess.run(ffmpeg_cmd, capture_output=True, text=True)
+        
+        if result.returncode != 0:
+            raise Exception(f"Erro ao adicionar faixa de legendas: {result.stderr}")
+        
+        return output_path
+    
+    def embed_subtitles_segments(self, segments, output_dir, quality="medium", subtitle_style=None, max_workers=None):
+        """Embed subtitles into several video segments in parallel.
+        
+        Args:
+            segments (list): Segment dictionaries as returned by the split methods.
+            output_dir (str): Directory to save the embedded segments.
+            quality (str): Quality preset ('low', 'medium', 'high').
+            subtitle_style (dict, optional): Custom styling for subtitles.
+            max_workers (int, optional): Maximum number of parallel ffmpeg jobs.
+                Defaults to the number of CPUs.
+            
+        Returns:
+            list: Paths to the embedded segments, in the same order as segments.
+                Each segment dictionary also gets an 'embedded_path' key.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        workers = min(self._resolve_workers(max_workers), max(1, len(segments)))
+        
+        # Split the CPUs between the encoders running at the same time
+        threads = max(1, (os.cpu_count() or 1) // workers)
+        
+        def burn(item):
+            i, segment = item
+            embedded_path = os.path.join(output_dir, f"embedded_segment_{i+1}.mp4")
+            self._burn_subtitles(
+                segment['video_path'], segment['subtitle_path'], embedded_path,
+                quality, subtitle_style, threads=threads
+            )
+            segment['embedded_path'] = embedded_path
+            return embedded_path
+        
+        try:
+            return self._run_in_pool(burn, list(enumerate(segments)), workers)
+        except Exception as e:
+            raise Exception(f"Erro ao incorporar legendas nos segmentos: {str(e)}")
+    
+    def _burn_subtitles(self, video_path, subtitle_path, output_path, quality="medium", subtitle_style=None,
+                        threads=None, include_audio=True, extra_args=None, encoder=None):
+        """Re-encode a video with the subtitles burned into the frames.
+        
+        Args:
+            video_path (str): Path to the video file.
+            subtitle_path (str): Path to the subtitle file, or None to re-encode without subtitles.
+            output_path (str): Path to save the output video.
+            quality (str): Quality preset ('low', 'medium', 'high').
+            subtitle_style (dict, optional): Custom styling for subtitles.
+            threads (int, optional): Number of encoder threads.
+            include_audio (bool): Whether to keep the audio stream.
+            extra_args (list, optional): Extra output arguments for ffmpeg.
+            encoder (str, optional): Encoder to use instead of self.encoder.
+            
+        Returns:
+            str: Path to the output video.
+        """
+        video_codec, audio_codec = self._get_codec_settings(quality, threads=threads, encoder=encoder)
+        
+        # Build ffmpeg command
+        ffmpeg_cmd = ["ffmpeg", "-i", video_path]
+        if subtitle_path:
+            ffmpeg_cmd.extend(["-vf", self._build_subtitle_filter(subtitle_path, subtitle_style)])
+        
+        # Add codec settings
+        ffmpeg_cmd.extend(video_codec)
+        if include_audio:
             ffmpeg_cmd.extend(audio_codec)
+        else:
+            ffmpeg_cmd.append("-an")
+        if extra_args:
+            ffmpeg_cmd.extend(extra_args)
+        
+        # Add output
+        if os.path.splitext(output_path)[1].lower() in ('.mp4', '.m4v', '.mov'):
+            ffmpeg_cmd.extend(["-movflags", "+faststart"])
+        ffmpeg_cmd.extend(["-y", output_path])
+        
+        result = subprocess.run(ffmpeg_cmd, capture_output=True, text=True)
+        
+        if result.returncode != 0:
+            raise Exception(f"Erro ao incorporar legendas: {result.stderr}")
+        
+        return output_path
+    
+    def _embed_subtitles_parallel(self, video_path, subtitle_path, output_path, quality="medium",
+                                  subtitle_style=None, max_workers=None):
+        """Burn subtitles into keyframe-aligned chunks in parallel and join them.
+        
+        The video stream is cut at keyframes with stream copy, each chunk gets its
+        own re-timed SRT and is re-encoded by a separate ffmpeg process, and the
+        encoded chunks are concatenated with stream copy. The audio is taken once
+        from the original file when the chunks are joined.
+        """
+        workers = self._resolve_workers(max_workers)
+        duration = self.get_video_duration(video_path)
+        
+        # Source chunks plus their re-encoded copies
+        with get_scratch_space().directory("embed_chunks_", 2 * os.path.getsize(video_path),
+                                           fallback_dir=os.path.dirname(os.path.abspath(output_path))) as work_dir:
+            # Two chunks per worker keep the pool busy when chunks encode at different speeds
+            chunk_seconds = max(self.MIN_CHUNK_SECONDS, duration / (workers * 2))
+            chunks = self._split_at_keyframes(video_path, work_dir, chunk_seconds)
             
-            # Add output
-            ffmpeg_cmd.extend(["-movflags", "+faststart", "-y", output_path])
+            jobs = []
+            for i, chunk in enumerate(chunks):
+                chunk_subtitle_path = os.path.join(work_dir, f"chunk_{i:04d}.srt")
+                self.subtitle_processor.extract_subtitle_segment(
+                    subtitle_path, chunk_subtitle_path, chunk['start_time'], chunk['end_time']
+                )
+                
+                # Empty SRT files can't be opened by the subtitles filter; re-encode those chunks plainly
+                if os.path.getsize(chunk_subtitle_path) == 0:
+                    chunk_subtitle_path = None
+                
+                jobs.append((chunk['path'], chunk_subtitle_path, os.path.join(work_dir, f"burned_{i:04d}.mp4")))
             
-            result = subprocess.run(ffmpeg_cmd, capture_output=True, text=True)
+            workers = min(workers, len(jobs))
+            threads = max(1, (os.cpu_count() or 1) // workers)
+            
+            def burn(job):
+                chunk_path, chunk_subtitle_path, burned_path = job
+                return self._burn_subtitles(
+                    chunk_path, chunk_subtitle_path, burned_path, quality, subtitle_style,
+                    threads=threads, include_audio=False
+                )
             
+            burned_paths = self._run_in_pool(burn, jobs, workers)
+            
+            self._concat_video_chunks(burned_paths, video_path, output_path, quality, work_dir)
+            return output_path
+    
+    def _embed_subtitles_sparse(self, video_path, subtitle_path, output_path, quality="medium",
+                                subtitle_style=None, max_workers=None):
+        """Burn subtitles only into the stretches of the video that have cues.
+        
+        The cue intervals are widened to the surrounding keyframes, the video
+        stream is cut at those keyframes with stream copy, and only the chunks
+        that contain cues are re-encoded. Chunks are kept as MPEG-TS with in-band
+        H.264 parameter sets so copied and re-encoded chunks can be joined with
+        stream copy; the re-encoded chunks copy the source's profile, level,
+        reference frames, size and aspect ratio (see _sparse_encoder_args()).
+        Falls back to the 'parallel' mode when the source isn't H.264, when
+        its settings can't be reproduced by libx264, when a re-encoded chunk
+        still doesn't match the source, or when cues cover nearly the whole
+        video.
+        """
+        stream_info = self._probe_video_stream(video_path)
+        encoder_args = self._sparse_encoder_args(stream_info)
+        if encoder_args is None:
+            return self._embed_subtitles_parallel(
+                video_path, subtitle_path, output_path, quality, subtitle_style, max_workers
+            )
+        
+        duration = self.get_video_duration(video_path)
+        keyframes = self._get_keyframe_times(video_path, start_time=float(stream_info.get('start_time') or 0))
+        burn_spans = self._get_burn_spans(load_cue_index(subtitle_path), keyframes, duration)
+        
+        # No cues at all: nothing to burn, the source is just remuxed
+        if not burn_spans:
+            ffmpeg_cmd = [
+                "ffmpeg", "-i", video_path,
+                "-map", "0:v:0", "-map", "0:a?",
+                "-c", "copy", "-movflags", "+faststart", "-y", output_path
+            ]
+            result = subprocess.run(ffmpeg_cmd, capture_output=True, text=True)
             if result.returncode != 0:
-                raise Exception(f"Erro ao incorporar legendas: {result.stderr}")
+                raise Exception(f"Erro ao copiar o vídeo sem legendas: {result.stderr}")
+            return output_path
+        
+        burned_seconds = sum(end - start for start, end in burn_spans)
+        if burned_seconds >= duration * self.MAX_SPARSE_COVERAGE:
+            return self._embed_subtitles_parallel(
+                video_path, subtitle_path, output_path, quality, subtitle_style, max_workers
+            )
+        
+        # Source chunks plus their re-encoded copies
+        with get_scratch_space().directory("embed_sparse_", 2 * os.path.getsize(video_path),
+                                           fallback_dir=os.path.dirname(os.path.abspath(output_path))) as work_dir:
+            split_times = sorted({t for span in burn_spans for t in span if 0 < t < duration})
+            chunks = self._split_at_keyframes(video_path, work_dir, split_times=split_times, extension="ts")
+            
+            jobs = []
+            chunk_paths = []
+            for i, chunk in enumerate(chunks):
+                # Chunk boundaries are the span edges, so a chunk either lies in a span or not at all
+                middle = (chunk['start_time'] + chunk['end_time']) / 2
+                if not any(start <= middle < end for start, end in burn_spans):
+                    chunk_paths.append(chunk['path'])
+                    continue
                 
+                chunk_subtitle_path = os.path.join(work_dir, f"chunk_{i:04d}.srt")
+                self.subtitle_processor.extract_subtitle_segment(
+                    subtitle_path, chunk_subtitle_path, chunk['start_time'], chunk['end_time']
+                )
+                burned_path = os.path.join(work_dir, f"burned_{i:04d}.ts")
+                jobs.append((chunk['path'], chunk_subtitle_path, burned_path))
+                chunk_paths.append(burned_path)
+            
+            if jobs:
+                workers = min(self._resolve_workers(max_workers), len(jobs))
+                threads = max(1, (os.cpu_count() or 1) // workers)
+                
+                def burn(job):
+                    chunk_path, chunk_subtitle_path, burned_path = job
+                    # Re-encoded chunks must be H.264 like the copied ones, whatever self.encoder is
+                    return self._burn_subtitles(
+                        chunk_path, chunk_subtitle_path, burned_path, quality, subtitle_style,
+                        threads=threads, include_audio=False, extra_args=encoder_args, encoder="libx264"
+                    )
+                
+                self._run_in_pool(burn, jobs, workers)
+                
+                # A single avcC describes the whole output: every chunk must match the source
+                if not all(self._chunk_matches_source(self._probe_video_stream(burned_path), stream_info)
+                           for _, _, burned_path in jobs):
+                    return self._embed_subtitles_parallel(
+                        video_path, subtitle_path, output_path, quality, subtitle_style, max_workers
+                    )
+            
+            self._concat_video_chunks(chunk_paths, video_path, output_path, quality, work_dir,
+                                      timescale=self._time_base_timescale(stream_info))
             return output_path
-        except Exception as e:
-            raise Exception(f"Erro ao incorporar legendas: {str(e)}")
+    
+    def _sparse_encoder_args(self, stream_info):
+        """Get the libx264 arguments that make re-encoded chunks match the source.
+        
+        Args:
+            stream_info (dict): Fields from _probe_video_stream().
+            
+        Returns:
+            list: Extra output arguments for _burn_subtitles(), or None when the
+                source isn't H.264 or its settings can't be reproduced.
+        """
+        if stream_info.get('codec_name') != 'h264':
+            return None
+        
+        profile = self.X264_PROFILES.get(stream_info.get('profile'))
+        level = int(stream_info.get('level') or 0)
+        width, height = int(stream_info.get('width') or 0), int(stream_info.get('height') or 0)
+        if not profile or level < 10 or not width or not height or not stream_info.get('pix_fmt'):
+            return None
+        
+        args = [
+            "-profile:v", profile,
+            "-level", f"{level // 10}.{level % 10}",
+            "-pix_fmt", stream_info['pix_fmt'],
+            "-s", f"{width}x{height}",
+        ]
+        if int(stream_info.get('refs') or 0) > 0:
+            args.extend(["-refs", str(stream_info['refs'])])
+        
+        # Mesma proporção de pixel (SAR) da origem, informada como proporção da imagem
+        sar = re.match(r"^(\d+):(\d+)$", stream_info.get('sample_aspect_ratio') or '')
+        if sar and int(sar.group(1)) > 0 and int(sar.group(2)) > 0:
+            args.extend(["-aspect", f"{width * int(sar.group(1))}:{height * int(sar.group(2))}"])
+        
+        # SPS/PPS repetidos em cada keyframe, como nos blocos copiados. O x264 sinaliza
+        # o menor perfil que cobre as ferramentas usadas (o preset ultrafast desliga o
+        # CABAC), então as ferramentas do perfil da origem são forçadas
+        x264_params = ["repeat-headers=1"]
+        if profile != 'baseline':
+            x264_params.append("cabac=1")
+        if profile.startswith('high'):
+            x264_params.append("8x8dct=1")
+        args.extend(["-bsf:v", "h264_mp4toannexb", "-x264-params", ":".join(x264_params)])
+        return args
+    
+    def _chunk_matches_source(self, chunk_info, stream_info):
+        """Check that a re-encoded chunk can be joined with the source's copied chunks."""
+        fields = ('codec_name', 'profile', 'level', 'width', 'height', 'pix_fmt')
+        if any(chunk_info.get(field) != stream_info.get(field) for field in fields):
+            return False
+        
+        def sar(info):
+            # Sem SAR declarado, os pixels são quadrados
+            return info.get('sample_aspect_ratio') if info.get('sample_aspect_ratio') not in (None, '0:1') else '1:1'
+        return sar(chunk_info) == sar(stream_info)
+    
+    def _time_base_timescale(self, stream_info):
+        """Get the MP4 track timescale matching a stream's time base (None if unknown)."""
+        match = re.match(r"^1/(\d+)$", stream_info.get('time_base') or '')
+        return int(match.group(1)) if match else None
+    
+    def _get_burn_spans(self, cues, keyframes, duration):
+        """Get the keyframe-aligned time spans that need subtitles burned in.
+        
+        Args:
+            cues (iterable): srt.Subtitle cues.
+            keyframes (list): Sorted keyframe timestamps in seconds.
+            duration (float): Video duration in seconds.
+            
+        Returns:
+            list: Sorted, non-overlapping (start, end) tuples in seconds.
+        """
+        # Merge cue intervals, absorbing gaps too short to be worth copying
+        intervals = []
+        for start, end in sorted((cue.start.total_seconds(), cue.end.total_seconds()) for cue in cues):
+            start, end = max(0.0, start), min(duration, end)
+            if end <= start:
+                continue
+            if intervals and start - intervals[-1][1] < self.MIN_COPY_SECONDS:
+                intervals[-1][1] = max(intervals[-1][1], end)
+            else:
+                intervals.append([start, end])
+        
+        # Widen each interval to the keyframe before its start and after its end
+        spans = []
+        for start, end in intervals:
+            before = bisect.bisect_right(keyframes, start)
+            after = bisect.bisect_left(keyframes, end)
+            span_start = keyframes[before - 1] if before > 0 else 0.0
+            span_end = keyframes[after] if after < len(keyframes) else duration
+            if spans and span_start <= spans[-1][1]:
+                spans[-1] = (spans[-1][0], max(spans[-1][1], span_end))
+            else:
+                spans.append((span_start, span_end))
+        
+        return spans
+    
+    def _get_keyframe_times(self, video_path, start_time=0.0):
+        """Get the keyframe timestamps (in seconds) of the first video stream.
+        
+        Reads packet flags only, so no frames are decoded.
+        
+        Args:
+            video_path (str): Path to the video file.
+            start_time (float): The stream's start_time. It is subtracted, so the
+                times are relative to the start of the video like cue times and
+                cut points (files from TS, MKV or remuxes often start above 0).
+            
+        Returns:
+            list: Sorted keyframe times in seconds.
+        """
+        ffprobe_cmd = [
+            "ffprobe", "-v", "error", "-select_streams", "v:0",
+            "-show_entries", "packet=pts_time,flags", "-of", "csv=p=0", video_path
+        ]
+        
+        result = subprocess.run(ffprobe_cmd, capture_output=True, text=True)
+        
+        if result.returncode != 0:
+            raise Exception(f"Erro ao obter keyframes do vídeo: {result.stderr}")
+        
+        keyframes = []
+        for line in result.stdout.splitlines():
+            parts = line.strip().split(',')
+            if len(parts) >= 2 and 'K' in parts[1] and parts[0] not in ('', 'N/A'):
+                keyframes.append(max(0.0, round(float(parts[0]) - start_time, 6)))
+        
+        return sorted(keyframes)
+    
+    def _probe_video_stream(self, video_path):
+        """Get codec information about the first video stream.
+        
+        Returns:
+            dict: ffprobe stream fields ('codec_name', 'profile', 'level', 'refs',
+                'pix_fmt', 'width', 'height', 'sample_aspect_ratio', 'time_base',
+                'start_time'), or an empty dict if the file has no video stream.
+        """
+        ffprobe_cmd = [
+            "ffprobe", "-v", "error", "-select_streams", "v:0",
+            "-show_entries",
+            "stream=codec_name,profile,level,refs,pix_fmt,width,height,sample_aspect_ratio,time_base,start_time",
+            "-of", "json", video_path
+        ]
+        
+        result = subprocess.run(ffprobe_cmd, capture_output=True, text=True)
+        
+        if result.returncode != 0:
+            raise Exception(f"Erro ao analisar o vídeo: {result.stderr}")
+        
+        streams = json.loads(result.stdout).get('streams', [])
+        return streams[0] if streams else {}
+    
+    def _split_at_keyframes(self, video_path, output_dir, chunk_seconds=None, split_times=None, extension="mp4"):
+        """Cut the video stream into keyframe-aligned chunks without re-encoding.
+        
+        Args:
+            video_path (str): Path to the video file.
+            output_dir (str): Directory to save the chunks.
+            chunk_seconds (float, optional): Target chunk duration; chunks end at the next keyframe.
+            split_times (list, optional): Explicit split points in seconds, used instead
+                of chunk_seconds. Points that aren't keyframes move to the next keyframe.
+            extension (str): Chunk container ('mp4', or 'ts' for Annex B H.264 chunks).
+            
+        Returns:
+            list: Dictionaries with 'path', 'start_time' and 'end_time' of each chunk.
+        """
+        list_path = os.path.join(output_dir, "chunks.csv")
+        ffmpeg_cmd = ["ffmpeg", "-i", video_path, "-map", "0:v:0", "-c", "copy"]
+        if extension == "ts":
+            # Parameter sets in-band, so chunks from different encoders can be joined
+            ffmpeg_cmd.extend(["-bsf:v", "h264_mp4toannexb"])
+        ffmpeg_cmd.extend(["-f", "segment"])
+        if split_times:
+            ffmpeg_cmd.extend(["-segment_times", ",".join(f"{t:.6f}" for t in split_times)])
+        elif split_times is not None:
+            # No split points: the whole stream in a single chunk
+            ffmpeg_cmd.extend(["-segment_time", "86400"])
+        else:
+            ffmpeg_cmd.extend(["-segment_time", f"{chunk_seconds:.3f}"])
+        if extension == "ts":
+            ffmpeg_cmd.extend(["-segment_format", "mpegts"])
+        ffmpeg_cmd.extend([
+            "-reset_timestamps", "1",
+            "-segment_list", list_path, "-segment_list_type", "csv",
+            "-y", os.path.join(output_dir, f"chunk_%04d.{extension}")
+        ])
+        
+        result = subprocess.run(ffmpeg_cmd, capture_output=True, text=True)
+        
+        if result.returncode != 0:
+            raise Exception(f"Erro ao dividir o vídeo em blocos: {result.stderr}")
+        
+        chunks = []
+        with open(list_path, 'r', encoding='utf-8', newline='') as f:
+            for row in csv.reader(f):
+                if len(row) < 3:
+                    continue
+                chunks.append({
+                    'path': os.path.join(output_dir, row[0]),
+                    'start_time': float(row[1]),
+                    'end_time': float(row[2])
+                })
+        
+        if not chunks:
+            raise Exception("Nenhum bloco de vídeo foi gerado.")
+        
+        return chunks
+    
+    def _concat_video_chunks(self, chunk_paths, audio_source_path, output_path, quality, work_dir,
+                             timescale=None):
+        """Concatenate encoded video chunks losslessly and add the original audio.
+        
+        Args:
+            chunk_paths (list): Paths of the video-only chunks, in order.
+            audio_source_path (str): File to take the audio stream from.
+            output_path (str): Path to save the joined video.
+            quality (str): Quality preset used to encode the audio.
+            work_dir (str): Directory for the concat list file.
+            timescale (int, optional): MP4 video track timescale, e.g. the
+                source's, instead of the muxer's default.
+        """
+        list_path = os.path.join(work_dir, "concat.txt")
+        with open(list_path, 'w', encoding='utf-8') as f:
+            for chunk_path in chunk_paths:
+                chunk_path_esc = os.path.abspath(chunk_path).replace("'", "'\\''")
+                f.write(f"file '{chunk_path_esc}'\n")
+        
+        _, audio_codec = self._get_codec_settings(quality)
+        
+        ffmpeg_cmd = [
+            "ffmpeg", "-f", "concat", "-safe", "0", "-i", list_path,
+            "-i", audio_source_path,
+            "-map", "0:v:0", "-map", "1:a?",
+            "-c:v", "copy"
+        ]
+        ffmpeg_cmd.extend(audio_codec)
+        if timescale:
+            ffmpeg_cmd.extend(["-video_track_timescale", str(timescale)])
+        ffmpeg_cmd.extend(["-movflags", "+faststart", "-y", output_path])
+        
+        result = subprocess.run(ffmpeg_cmd, capture_output=True, text=True)
+        
+        if result.returncode != 0:
+            raise Exception(f"Erro ao concatenar os blocos de vídeo: {result.stderr}")
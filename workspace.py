@@ -0,0 +1,300 @@
+"""
+Pastas de trabalho por sessão, com cotas de disco e coleta por inatividade.
+
+Cada sessão (uma aba do Streamlit, por exemplo) recebe uma pasta própria para
+uploads, áudio extraído, saída do Whisper, segmentos e vídeos gerados. Essas
+pastas são efêmeras: sessões sem atividade por mais que o TTL são apagadas por
+uma coleta periódica, e cotas limitam o espaço de cada sessão e do total.
+
+Os caches compartilhados (downloads, transcrições) não ficam aqui: eles são
+endereçados por conteúdo e vivem em file_cache.default_cache_root(), com seus
+próprios limites de tamanho, de modo que sobrevivem ao fim das sessões.
+"""
+import os
+import time
+import uuid
+import shutil
+import hashlib
+import tempfile
+import functools
+import threading
+
+
+class QuotaExceededError(Exception):
+    """A session or the whole workspace would exceed its disk quota."""
+
+
+# Hashes de conteúdo já calculados: (dispositivo, inode, mtime, tamanho) -> hash
+_content_hashes = {}
+_content_hashes_lock = threading.Lock()
+
+
+def content_hash(path):
+    """Get the SHA-256 of a file's content.
+
+    The hash is remembered for the file's current inode, mtime and size, so
+    repeated calls for an unchanged file don't read it again.
+
+    Args:
+        path (str): Path to the file.
+
+    Returns:
+        str: Hex digest of the file content.
+    """
+    stat = os.stat(path)
+    key = (stat.st_dev, stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    with _content_hashes_lock:
+        cached = _content_hashes.get(key)
+    if cached:
+        return cached
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+
+    with _content_hashes_lock:
+        _content_hashes[key] = digest.hexdigest()
+    return digest.hexdigest()
+
+
+def directory_size(path):
+    """Get the total size of the files under a directory, in bytes."""
+    total = 0
+    for root, _, files in os.walk(path):
+        for filename in files:
+            try:
+                total += os.lstat(os.path.join(root, filename)).st_size
+            except OSError:
+                # Removed while walking
+                pass
+    return total
+
+
+def default_workspace_root():
+    """Get the root directory for session workspaces.
+
+    Returns:
+        str: VIDEO_WORKSPACE_DIR from the environment, or a folder in the
+            temporary directory.
+    """
+    return os.getenv(
+        "VIDEO_WORKSPACE_DIR",
+        os.path.join(tempfile.gettempdir(), "transcricao_video_sessions")
+    )
+
+
+class WorkspaceManager:
+    """Per-session working directories with disk quotas and TTL expiry."""
+
+    # Arquivo cuja data de modificação marca o último acesso da sessão
+    ACCESS_MARKER = ".last_access"
+
+    def __init__(self, root_dir, session_quota_bytes, total_quota_bytes, ttl_seconds):
+        """Initialize the manager.
+
+        Args:
+            root_dir (str): Directory holding one folder per session.
+            session_quota_bytes (int): Maximum size of one session's files.
+            total_quota_bytes (int): Maximum size of all sessions together.
+            ttl_seconds (float): Sessions idle for longer than this are deleted
+                by collect_garbage().
+        """
+        self.root_dir = root_dir
+        self.session_quota_bytes = session_quota_bytes
+        self.total_quota_bytes = total_quota_bytes
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._gc_thread = None
+        os.makedirs(root_dir, exist_ok=True)
+
+    def session_path(self, session_id):
+        """Get the directory of a session (which may not exist)."""
+        if not session_id or os.sep in session_id or session_id.startswith('.'):
+            raise Exception(f"Identificador de sessão inválido: {session_id}")
+        return os.path.join(self.root_dir, session_id)
+
+    def create_session(self):
+        """Create a new, empty session.
+
+        Returns:
+            tuple: (session_id, session_dir)
+        """
+        session_id = uuid.uuid4().hex
+        session_dir = self.session_path(session_id)
+        os.makedirs(session_dir)
+        self.touch(session_id)
+        return session_id, session_dir
+
+    def touch(self, session_id):
+        """Mark a session as used now, postponing its expiry.
+
+        Returns:
+            str: The session directory (recreated if it had expired).
+        """
+        session_dir = self.session_path(session_id)
+        os.makedirs(session_dir, exist_ok=True)
+        marker = os.path.join(session_dir, self.ACCESS_MARKER)
+        with open(marker, 'a'):
+            pass
+        os.utime(marker)
+        return session_dir
+
+    def resume_session(self, session_id):
+        """Touch an existing session, telling whether it had been collected.
+
+        Returns:
+            tuple: (session_dir, expired), where expired is True when the
+                session's files had been deleted (by collect_garbage()) and its
+                folder was recreated empty.
+        """
+        session_dir = self.session_path(session_id)
+        # Toda sessão criada por create_session() tem o marcador de acesso
+        expired = not os.path.exists(os.path.join(session_dir, self.ACCESS_MARKER))
+        return self.touch(session_id), expired
+
+    def last_access(self, session_id):
+        """Get the time a session was last used (None if unknown)."""
+        session_dir = self.session_path(session_id)
+        try:
+            return os.path.getmtime(os.path.join(session_dir, self.ACCESS_MARKER))
+        except OSError:
+            try:
+                return os.path.getmtime(session_dir)
+            except OSError:
+                return None
+
+    def sessions(self):
+        """List the existing session ids."""
+        try:
+            return [
+                name for name in os.listdir(self.root_dir)
+                if not name.startswith('.') and os.path.isdir(os.path.join(self.root_dir, name))
+            ]
+        except OSError:
+            return []
+
+    def session_usage(self, session_id):
+        """Get the disk space used by a session, in bytes."""
+        return directory_size(self.session_path(session_id))
+
+    def total_usage(self):
+        """Get the disk space used by all sessions, in bytes."""
+        return directory_size(self.root_dir)
+
+    def check_quota(self, session_id, extra_bytes=0):
+        """Check that a session can store extra_bytes more.
+
+        When the total quota would be exceeded, expired sessions are collected
+        first.
+
+        Args:
+            session_id (str): The session.
+            extra_bytes (int): Size of the file about to be written (0 when unknown).
+
+        Raises:
+            QuotaExceededError: If the session or the whole workspace is full.
+        """
+        session_usage = self.session_usage(session_id)
+        if session_usage + extra_bytes > self.session_quota_bytes:
+            raise QuotaExceededError(
+                f"Espaço da sessão esgotado: {_format_mb(session_usage)} usados de "
+                f"{_format_mb(self.session_quota_bytes)}. Remova arquivos ou inicie uma nova sessão."
+            )
+
+        if self.total_usage() + extra_bytes > self.total_quota_bytes:
+            self.collect_garbage()
+            if self.total_usage() + extra_bytes > self.total_quota_bytes:
+                raise QuotaExceededError(
+                    "O servidor está sem espaço para novos arquivos no momento. Tente novamente mais tarde."
+                )
+
+    def remove_session(self, session_id):
+        """Delete a session and all of its files.
+
+        Returns:
+            int: Bytes freed.
+        """
+        session_dir = self.session_path(session_id)
+        freed = directory_size(session_dir)
+        shutil.rmtree(session_dir, ignore_errors=True)
+        return freed
+
+    def collect_garbage(self, now=None):
+        """Delete the sessions idle for longer than the TTL.
+
+        Returns:
+            dict: 'sessions' removed and 'bytes' freed.
+        """
+        now = now or time.time()
+        removed = 0
+        freed = 0
+
+        with self._lock:
+            for session_id in self.sessions():
+                last_access = self.last_access(session_id)
+                if last_access is not None and now - last_access > self.ttl_seconds:
+                    freed += self.remove_session(session_id)
+                    removed += 1
+
+        return {'sessions': removed, 'bytes': freed}
+
+    def start_collector(self, interval_seconds=600):
+        """Run collect_garbage() every interval_seconds in a background thread.
+
+        Calling it again while the collector is running does nothing.
+        """
+        with self._lock:
+            if self._gc_thread is not None:
+                return
+
+            def collect_forever():
+                while True:
+                    try:
+                        self.collect_garbage()
+                    except Exception:
+                        # A failed pass (e.g. a file in use) is retried next time
+                        pass
+                    time.sleep(interval_seconds)
+
+            self._gc_thread = threading.Thread(target=collect_forever, name="workspace-gc", daemon=True)
+            self._gc_thread.start()
+
+    def stats(self):
+        """Get the workspace usage.
+
+        Returns:
+            dict: 'sessions' (count), 'bytes' used, and the configured quotas and TTL.
+        """
+        return {
+            'sessions': len(self.sessions()),
+            'bytes': self.total_usage(),
+            'session_quota_bytes': self.session_quota_bytes,
+            'total_quota_bytes': self.total_quota_bytes,
+            'ttl_seconds': self.ttl_seconds
+        }
+
+
+def _format_mb(size_bytes):
+    return f"{size_bytes / (1024 * 1024):.0f} MB"
+
+
+@functools.lru_cache(maxsize=1)
+def get_workspace_manager():
+    """Get the shared workspace manager, with its garbage collector running.
+
+    Limits come from the environment: VIDEO_SESSION_QUOTA_MB (default 5120),
+    VIDEO_WORKSPACE_QUOTA_MB (default 51200), VIDEO_SESSION_TTL_HOURS
+    (default 24) and VIDEO_WORKSPACE_GC_MINUTES (default 10).
+
+    Returns:
+        WorkspaceManager: The workspace manager.
+    """
+    manager = WorkspaceManager(
+        default_workspace_root(),
+        session_quota_bytes=int(os.getenv("VIDEO_SESSION_QUOTA_MB", "5120")) * 1024 * 1024,
+        total_quota_bytes=int(os.getenv("VIDEO_WORKSPACE_QUOTA_MB", "51200")) * 1024 * 1024,
+        ttl_seconds=float(os.getenv("VIDEO_SESSION_TTL_HOURS", "24")) * 3600
+    )
+    manager.start_collector(float(os.getenv("VIDEO_WORKSPACE_GC_MINUTES", "10")) * 60)
+    return manager